@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.core import config
+from app.core.storage import open_database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    key TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    result TEXT NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_last_access ON analyses (last_access);
+"""
+
+def normalize_text(text: str) -> str:
+    """
+    Normalization applied before hashing. Only surrounding whitespace is dropped:
+    it is never counted as a token, so it can't change the result.
+    """
+    return text.strip()
+
+def content_key(text: str, version: str) -> str:
+    """Content address of an analysis: hash of the vocabulary version and the normalized text."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(version.encode("ascii"))
+    digest.update(b"\0")
+    # Lone surrogates are valid in JSON strings but not in UTF-8
+    digest.update(normalize_text(text).encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+class AnalysisCache:
+    """
+    Memoizes TextAnalyzer results by content hash.
+
+    An in-process LRU sits in front of a SQLite file that every worker on the host
+    shares, so a passage analyzed by one uvicorn worker is a hit for all of them.
+    Keys include the vocabulary version, so entries written under another version are
+    never served. They are not deleted either: during a reload or a rolling restart other
+    workers may still run that version, and LRU eviction ages them out. Results of
+    the same text computed differently (another segmenter) are told apart by `variant`.
+    """
+
+    ACCESS_RESOLUTION = 60
+
+    def __init__(self, path: Optional[str] = None, memory_entries: Optional[int] = None,
+                 max_entries: Optional[int] = None, clock=time.time):
+        self.path = path or os.path.join(config.CACHE_DIR, "analysis_cache.sqlite3")
+        self.memory_entries = config.ANALYSIS_CACHE_MEMORY_ENTRIES if memory_entries is None else memory_entries
+        self.max_entries = config.ANALYSIS_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.clock = clock
+        self.version: Optional[str] = None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes_since_evict = 0
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = open_database(self.path, SCHEMA)
+        return self._db
+
+    def set_version(self, version: str):
+        """Binds the cache to a vocabulary version: lookups and stores use its keys from now on."""
+        with self._lock:
+            if version == self.version:
+                return
+            self.version = version
+            # Keyed by version as well: entries of the previous one would only take up room
+            self._memory.clear()
+
+    def _key(self, text: str, variant: str) -> str:
+        version = self.version or ""
+        return content_key(text, f"{version}/{variant}" if variant else version)
+
+    def get(self, text: str, variant: str = "", disk: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Cached result for `text`, or None. With disk=False only the in-process tier is
+        looked at: that never waits on SQLite, so it is safe on the event loop.
+        """
+        key = self._key(text, variant)
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return result
+            if not disk:
+                return None
+
+            row = self.db.execute("SELECT result, last_access FROM analyses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+
+            now = self.clock()
+            if now - row[1] > self.ACCESS_RESOLUTION:
+                self.db.execute("UPDATE analyses SET last_access = ? WHERE key = ?", (now, key))
+            result = json.loads(row[0])
+            self._remember(key, result)
+            self.stats["disk_hits"] += 1
+            return result
+
+    def put(self, text: str, result: Dict[str, Any], version: Optional[str] = None, variant: str = ""):
+        """Stores `result`; skipped if it was computed under a `version` other than the current one."""
+        if version is not None and version != self.version:
+            return
+        key = self._key(text, variant)
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?)",
+                (key, self.version or "", json.dumps(result, ensure_ascii=False), self.clock()),
+            )
+            self._remember(key, result)
+            # Counting rows is a table scan; only check the bound every so often.
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= 1000:
+                self._writes_since_evict = 0
+                self._evict()
+
+    def _remember(self, key: str, result: Dict[str, Any]):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        count = self.db.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+        self.db.execute(
+            "DELETE FROM analyses WHERE key IN (SELECT key FROM analyses ORDER BY last_access LIMIT ?)", (excess,)
+        )
+        self.stats["evictions"] += excess
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self.db.execute("DELETE FROM analyses")
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
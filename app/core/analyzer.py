@@ -1,115 +1,256 @@
-import jieba
-import pandas as pd
-import re
-from typing import Dict, Any
-from app.core.reference_loader import get_hsk_dataframe
+import threading
+import numpy as np
+from typing import Dict, Any, List, Optional, Set, Tuple
+from app.core import config, metrics
+from app.core.analysis_cache import AnalysisCache
+from app.core.reference_loader import (
+    get_hsk_dataframe, get_hsk_words, get_vocabulary_store, load_vocabulary_store, set_vocabulary_store,
+)
+from app.core.segmenters import Segmenter, build_segmenters, check_segmenter
+from app.core.storage import file_lock
+from app.core.tokenizer import get_tokenizer, snapshot_fingerprint
+from app.core.vocabulary import VocabularyIndex
+
+# Bump whenever the shape or meaning of analyze() results changes, so cached
+# results computed by older code are not served.
+RESULT_VERSION = 3
+
+def cache_version(vocabulary_version: str) -> str:
+    """Analysis-cache version of results computed with a given vocabulary (and its tokenizer)."""
+    return f"{RESULT_VERSION}-{snapshot_fingerprint(vocabulary_version)}"
+
+def segmenter_variant(name: str) -> str:
+    """Analysis-cache variant of a segmenter; jieba results keep the keys they always had."""
+    return "" if name == "jieba" else name
+
+class AnalyzerState:
+    """
+    A vocabulary index, the tokenizer tuned for it and the segmenter backends built on
+    that tokenizer. Never mutated after construction: a reload builds a new state and
+    swaps the reference, so an analysis that picked up the old state finishes on it.
+    """
+
+    def __init__(self, vocabulary: VocabularyIndex, tokenizer):
+        self.vocabulary = vocabulary
+        self.tokenizer = tokenizer
+        self.segmenters = build_segmenters(tokenizer)
+        self.version = vocabulary.version
+
+    def segmenter(self, name: Optional[str] = None) -> Segmenter:
+        """Backend by name (default HANZ_SEGMENTER); ValueError for unknown names."""
+        return self.segmenters[check_segmenter(name or config.SEGMENTER)]
 
 class TextAnalyzer:
-    def __init__(self):
-        # Pre-load data to ensure fast first request
-        self.hsk_df = get_hsk_dataframe()
-        self._initialize_tokenizer()
+    def __init__(self, cache: Optional[AnalysisCache] = None):
+        check_segmenter(config.SEGMENTER)
+        # Vocabulary and tokenizer are loaded on first use (warmup() at startup), not here,
+        # so importing a module that creates an analyzer stays cheap
+        self._state: Optional[AnalyzerState] = None
+        self._load_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+        # Optional result memoization, keyed by text hash + vocabulary/tokenizer version
+        self.cache = cache
+
+    @property
+    def state(self) -> AnalyzerState:
+        return self._ensure_loaded()
+
+    def _ensure_loaded(self) -> AnalyzerState:
+        """The current state, loading the data first if it wasn't yet."""
+        state = self._state
+        if state is None:
+            with self._load_lock:
+                if self._state is None:
+                    # Only word -> level is needed here, straight from the compiled vocabulary
+                    with file_lock(config.REFERENCE_BUILD_LOCK):
+                        self._swap(self._load_state(get_vocabulary_store()))
+                state = self._state
+        return state
+
+    def _swap(self, state: AnalyzerState):
+        self._state = state
+        if self.cache is not None:
+            self.cache.set_version(cache_version(state.version))
+
+    @property
+    def vocabulary(self) -> VocabularyIndex:
+        return self.state.vocabulary
+
+    @property
+    def tokenizer(self):
+        return self.state.tokenizer
+
+    @property
+    def version(self) -> str:
+        """Version of the HSK data results are currently computed with (reported on every result)."""
+        return self.state.version
 
-    def _initialize_tokenizer(self):
+    @property
+    def hsk_df(self):
+        """Full reference table (with pinyin/meaning); not used by analyze(), built on first access."""
+        return get_hsk_dataframe()
+
+    @staticmethod
+    def _load_state(store) -> AnalyzerState:
         """
-        Syncs HSK vocabulary with Jieba's dictionary.
-        This provides a 'nudge' to the probabilistic tokenizer to prefer our known words.
+        Builds the vocabulary index and a dedicated jieba tokenizer with the HSK vocabulary merged in.
+        The merged dictionary comes from a prebuilt snapshot (scripts/build_dictionary.py),
+        so startup skips both the ~5000 add_word calls and jieba's lazy prefix-dict build.
+        The global jieba tokenizer is left untouched.
         """
-        # 1. Boost frequency of all HSK words
-        # Note: This loops ~5000 times (HSK 6). inexpensive.
-        for word in self.hsk_df.index:
-            # We don't specify freq, let Jieba calculate a high default or use existing
-            jieba.add_word(word)
-            
-        # 2. Handle specific "Sticky Words"
-        # "这是" (This is) is extremely common in Jieba's default corpus and often wins 
-        # against "这" + "是" even if we add them. We explicitly force the split.
-        jieba.suggest_freq(('这', '是'), True)
+        vocabulary = VocabularyIndex.from_store(store)
+        return AnalyzerState(vocabulary, get_tokenizer(get_hsk_words, vocabulary.version))
+
+    def reload(self) -> bool:
+        """
+        Re-reads the HSK CSVs and, if they changed, builds a new vocabulary and tokenizer
+        and swaps them in. Slow (seconds when the tokenizer snapshot has to be rebuilt);
+        call it off the event loop. Requests keep being served on the current state
+        until the swap, but a rebuild competes with them for this process's GIL. Every
+        worker notices a change at about the same time; the host-wide build lock lets
+        one of them compile the artifact and snapshot while the others wait and then
+        just load them. Returns True if the data changed.
+        """
+        with self._reload_lock:
+            # Loads the data first if it wasn't yet (taking the build lock itself)
+            current = self.version
+            with file_lock(config.REFERENCE_BUILD_LOCK):
+                store = load_vocabulary_store()
+                version = store.version if store is not None else VocabularyIndex({}).version
+                if version == current:
+                    return False
+                state = self._load_state(store)
+            state.tokenizer.lcut("我是学生")  # warm before it takes traffic
+
+            set_vocabulary_store(store)
+            self._swap(state)
+            return True
+
+    def warmup(self):
+        """Loads the data and runs one segmentation so the first real request pays no lazy initialization."""
+        self.state.tokenizer.lcut("我是学生")
     
-    def analyze(self, text: str) -> Dict[str, Any]:
+    def analyze(self, text: str, segmenter: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyzes the input text for HSK difficulty.
         
         Args:
             text (str): The raw Chinese text.
+            segmenter (str): Segmenter backend (see app/core/segmenters.py); default HANZ_SEGMENTER.
             
         Returns:
             Dict: Analysis results including total tokens, coverage per level, and overall score.
         """
+        check_segmenter(segmenter)
         if not text:
-             return {"total_tokens": 0, "difficulty_score": "Unknown"}
+             return self.result_from_counts([0] * 7, 0, char_counts=[0] * 7)
+
+        result = self.cached(text, segmenter)
+        if result is None:
+            result = self.analyze_uncached(text, segmenter)
+        return result
+
+    def analyze_uncached(self, text: str, segmenter: Optional[str] = None) -> Dict[str, Any]:
+        """Computes the result without a cache lookup and stores it, for callers that already missed."""
+        return self.analyze_counted(text, segmenter)[0]
+
+    def analyze_counted(self, text: str, segmenter: Optional[str] = None) -> Tuple[Dict[str, Any], List[int], Set[str]]:
+        """analyze_uncached(), plus the per-level word counts and distinct words behind the result (for indexing)."""
+        result, counts, unique = self._analyze(text, segmenter)
+        self.remember(text, result, segmenter)
+        return result, counts, unique
+
+    def cached(self, text: str, segmenter: Optional[str] = None, disk: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Memoized result for `text`, or None (also when caching is off). disk=False looks
+        at the in-process tier only (no SQLite; see AnalysisCache.get).
+        """
+        if self.cache is None:
+            return None
+        # The cache serves the version of the loaded data; load it before the first lookup
+        self._ensure_loaded()
+        with metrics.stage("analysis_cache"):
+            result = self.cache.get(text, variant=segmenter_variant(segmenter or config.SEGMENTER), disk=disk)
+        # Callers may mutate the dict; never hand out the cached one
+        return dict(result) if result is not None else None
+
+    def remember(self, text: str, result: Dict[str, Any], segmenter: Optional[str] = None):
+        """Stores a result computed outside analyze() (e.g. by the parallel path)."""
+        if self.cache is not None:
+            # A result computed on data replaced since is not stored under the new version
+            self.cache.put(text, dict(result), version=cache_version(result["vocabulary_version"]),
+                           variant=segmenter_variant(segmenter or config.SEGMENTER))
+
+    def _analyze(self, text: str, segmenter: Optional[str] = None) -> Tuple[Dict[str, Any], List[int], Set[str]]:
+        # One state for the whole analysis, even if a reload swaps it meanwhile
+        state = self.state
 
         # 1. Segmentation
-        tokens = jieba.lcut(text)
-        
-        # 2. Vectorized Analysis
-        # Create a Series from tokens
-        token_series = pd.Series(tokens, name='token')
-        
-        # Filter Punctuation/Spaces (simple regex for non-word chars, keeping it simple for now)
-        # Assuming we want to keep Chinese characters mainly.
-        # A common regex for Chinese is [\u4e00-\u9fff], but we might also want to match English words if they were in HSK (unlikely).
-        # The prompt says: "Filter out punctuation/special characters."
-        # Let's filter out anything that doesn't look like a word.
-        # Actually, simpler is: we only care about what matches the HSK database?
-        # No, "Lexical Density: Total words vs Unique words" implies we need a clean word list.
-        
-        # Let's remove punctuation using regex
-        # This regex removes tokens that are purely punctuation/whitespace
-        clean_tokens_mask = token_series.astype(str).str.match(r'^\w+$')
-        # Note: \w in Python regex matches alphanumeric + underscore, including Chinese chars.
-        # But commonly punctuation like '，' or '。' might not match \w depending on locale/implementation.
-        # A safer check for Chinese punctuation:
-        # Instead of strict filtering, let's keep everything that IS NOT purely punctuation.
-        
-        # Optimization: We can just use the HSK dataframe to find matches first.
-        # But we need total count of "words" (meaningful tokens) for percentage.
+        with metrics.stage("segment"):
+            tokens = state.segmenter(segmenter).lcut(text)
         
-        # Let's refine the mask to exclude common punctuation.
-        # Or iterate over tokens and check? No, vectorized.
-        # clean_tokens = token_series[token_series.str.isalnum()] # This usually works for Chinese chars too.
-        # Let's try str.isalnum()
-        
-        # Wait, jieba.lcut returns a list.
-        
-        clean_tokens = token_series[token_series.str.strip().str.match(r'^[^\s\W]+$')]
-        # This regex ^[^\s\W]+$ means: start, one or more chars that are NOT (whitespace or non-word), end.
-        # Effectively alphanumeric.
-        
-        if clean_tokens.empty:
-            return {"total_tokens": 0, "difficulty_score": "Unknown"}
+        # 2. Single-pass lookup
+        # Each token is classified (punctuation / unknown / HSK level) by the
+        # precompiled vocabulary index and counted in the same loop.
+        # Characters are counted straight from the text, without segmentation.
+        with metrics.stage("lookup"):
+            counts, unique = state.vocabulary.count_levels(tokens)
+            char_counts = state.vocabulary.count_characters(text)
+            return self.result_from_counts(counts, len(unique), state.version, char_counts), counts, unique
+
+    @staticmethod
+    def coverage_from_counts(counts) -> Dict[str, float]:
+        """hsk_1_coverage .. hsk_6_coverage and unknown_coverage of per-level counts (counts[0] = unknown)."""
+        total = sum(counts)
+        # Same float64 division and rounding the previous pandas
+        # `value_counts(normalize=True)` path produced.
+        ratios = np.round(np.asarray(counts, dtype=np.float64) / total, 4) if total else np.zeros(len(counts))
 
-        total_words = len(clean_tokens)
-        unique_words = clean_tokens.nunique()
-        
-        # 3. Match against HSK Reference
-        # We merge the clean tokens with the HSK dataframe.
-        # token_series is the left side, hsk_df is the right side (index=word)
-        
-        # "Senior Data Engineer way": Convert input to DF/Series and join.
-        token_df = pd.DataFrame(clean_tokens, columns=['token'])
-        
-        # Left join to preserve all words in text, but find HSK info where available
-        merged_df = token_df.join(self.hsk_df, on='token', how='left')
-        
-        # Fill NaN levels with 0 (Unknown)
-        merged_df['level'] = merged_df['level'].fillna(0).astype(int)
-        
-        # 4. Calculate Coverage
-        # Value counts of 'level'
-        level_counts = merged_df['level'].value_counts(normalize=True).sort_index()
-        
-        # Build counting dictionary
         coverage: Dict[str, float] = {}
         for level in range(1, 7):
-            if level in level_counts:
-                coverage[f"hsk_{level}_coverage"] = round(level_counts[level], 4)
-            else:
-                coverage[f"hsk_{level}_coverage"] = 0.0
-                
-        coverage["unknown_coverage"] = round(level_counts.get(0, 0.0), 4)
-
-        # 5. Determine Difficulty Score
+            coverage[f"hsk_{level}_coverage"] = float(ratios[level])
+
+        coverage["unknown_coverage"] = float(ratios[0])
+        return coverage
+
+    def token_counts(self, text: str, segmenter: Optional[str] = None) -> Dict[str, int]:
+        """Occurrences of every word token of `text` (punctuation left out), for personal coverage."""
+        state = self.state
+        counts: Dict[str, int] = {}
+        classify = state.vocabulary.classify
+        for token in state.segmenter(segmenter).cut(text):
+            if classify(token) >= 0:
+                counts[token] = counts.get(token, 0) + 1
+        return counts
+
+    def result_from_counts(self, counts, unique_words: int, version: Optional[str] = None,
+                           char_counts=None) -> Dict[str, Any]:
+        """
+        Builds the analyze() result from per-level token counts (counts[0] = unknown,
+        counts[1..6] = HSK levels). Shared by every path that counts tokens itself.
+        `version` is the vocabulary version the counts were made with (default: current);
+        `char_counts` are the same per-level counts of Chinese characters, if known.
+        """
+        total_words = sum(counts)
+        version = version or self.version
+
+        characters = {}
+        if char_counts is not None:
+            characters = {
+                "total_characters": int(sum(char_counts)),
+                "character_coverage": self.coverage_from_counts(char_counts),
+            }
+
+        if total_words == 0:
+            result = {"total_tokens": 0, "difficulty_score": "Unknown", "vocabulary_version": version}
+            result.update(characters)
+            return result
+
+        # 3. Calculate Coverage
+        coverage = self.coverage_from_counts(counts)
+
+        # 4. Determine Difficulty Score
         # Simple heuristic: heavily weighted towards the highest level present? 
         # Or the level with majority? 
         # The prompt says: Returns difficulty score 'A1' etc.
@@ -181,8 +322,10 @@ class TextAnalyzer:
         result = {
             "total_tokens": int(total_words),
             "unique_words": int(unique_words),
-            "difficulty_score": final_score
+            "difficulty_score": final_score,
+            "vocabulary_version": version,
         }
         result.update(coverage)
+        result.update(characters)
         
         return result
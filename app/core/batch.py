@@ -0,0 +1,201 @@
+import asyncio
+import math
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core import config
+from app.core.boundaries import split_text
+
+# Per-process analyzer, created by the pool initializer.
+_worker_analyzer = None
+
+def _init_worker():
+    """Builds and warms a TextAnalyzer once per worker process."""
+    global _worker_analyzer
+    from app.core.analyzer import TextAnalyzer
+    from app.core.analysis_cache import AnalysisCache
+
+    # Workers share the host-wide analysis cache with the API processes
+    _worker_analyzer = TextAnalyzer(cache=AnalysisCache() if config.ANALYSIS_CACHE_ENABLED else None)
+    # First lcut builds jieba's prefix dictionary; pay it here, not on a request.
+    _worker_analyzer.analyze("我是学生")
+
+def _analyze_chunk(texts: List[str], segmenter: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Runs in a worker process. Errors are captured per item so one bad text doesn't fail the chunk."""
+    items = []
+    for text in texts:
+        try:
+            items.append({"result": _worker_analyzer.analyze(text, segmenter), "error": None})
+        except Exception as e:
+            items.append({"result": None, "error": str(e)})
+    return items
+
+def _count_piece(text: str, segmenter: Optional[str] = None) -> Tuple[List[int], Set[str], List[int], str]:
+    """
+    Runs in a worker process: per-level word counts, distinct words and per-level character
+    counts of one piece of a long document, plus the vocabulary version they were counted with.
+    """
+    state = _worker_analyzer.state
+    counts, unique = state.vocabulary.count_levels(state.segmenter(segmenter).cut(text))
+    return counts, unique, state.vocabulary.count_characters(text), state.version
+
+class BatchAnalyzer:
+    """
+    Spreads many texts over a pool of worker processes, each with its own warmed TextAnalyzer.
+    jieba holds the GIL while segmenting, so processes (not threads) are what scales with cores.
+    """
+
+    # Aim for a few chunks per worker: big enough to amortize pickling,
+    # small enough that one long text doesn't leave other cores idle.
+    CHUNKS_PER_WORKER = 4
+    # Attempts at counting a long document's pieces under a single vocabulary version
+    MAX_VERSION_RETRIES = 3
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or config.BATCH_WORKERS
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker)
+        return self._pool
+
+    def _chunks(self, texts: List[str]) -> List[List[str]]:
+        n_chunks = max(1, min(len(texts), self.max_workers * self.CHUNKS_PER_WORKER))
+        size = math.ceil(len(texts) / n_chunks)
+        return [texts[i:i + size] for i in range(0, len(texts), size)]
+
+    def analyze_many(self, texts: List[str], segmenter: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Analyzes texts in parallel.
+
+        Returns:
+            List of {"index", "result", "error"} dicts in input order.
+        """
+        if not texts:
+            return []
+        try:
+            chunks = self._chunks(texts)
+            chunk_results = list(self.pool.map(_analyze_chunk, chunks, [segmenter] * len(chunks)))
+        except BrokenProcessPool:
+            self._pool = None
+            raise
+        return self._flatten(chunk_results)
+
+    async def analyze_many_async(self, texts: List[str], segmenter: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Same as analyze_many, but awaits the pool without blocking the event loop."""
+        if not texts:
+            return []
+        try:
+            futures = self._submit(_analyze_chunk, [(chunk, segmenter) for chunk in self._chunks(texts)])
+            chunk_results = await asyncio.gather(*futures)
+        except BrokenProcessPool:
+            # A worker died (OOM, segfault). Drop the pool so the next batch gets a fresh one.
+            self._pool = None
+            raise
+        return self._flatten(chunk_results)
+
+    def _submit(self, fn, calls: List[Tuple]) -> List[asyncio.Future]:
+        """
+        Submits fn(*args) for every args of `calls`. A pool broken by an earlier crash makes
+        submit() itself raise BrokenProcessPool: it is then replaced and everything
+        submitted once more, to the fresh pool.
+        """
+        for attempt in range(2):
+            futures = []
+            try:
+                for args in calls:
+                    futures.append(asyncio.wrap_future(self.pool.submit(fn, *args)))
+                return futures
+            except BrokenProcessPool:
+                for future in futures:
+                    future.cancel()
+                self.recycle()
+                if attempt:
+                    raise
+
+    def should_split(self, text: str) -> bool:
+        """Whether `text` is long enough for intra-document parallel segmentation."""
+        return (
+            config.PARALLEL_THRESHOLD_CHARS > 0
+            and self.max_workers > 1
+            and len(text) >= config.PARALLEL_THRESHOLD_CHARS
+        )
+
+    def _pieces(self, text: str) -> List[str]:
+        target = max(config.PARALLEL_MIN_PIECE_CHARS, math.ceil(len(text) / (self.max_workers * 2)))
+        return split_text(text, target)
+
+    async def analyze_document_async(self, text: str, analyzer, segmenter: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyzes one long text by splitting it at safe sentence boundaries and segmenting
+        the pieces on the worker pool. Same result as `analyzer.analyze(text)`; the level
+        counts are merged here and turned into a result by `analyzer.result_from_counts`.
+        """
+        # The cache's disk tier is SQLite: looked up in a thread
+        result = await asyncio.to_thread(analyzer.cached, text, segmenter)
+        if result is not None:
+            return result
+        return (await self.count_document_async(text, analyzer, segmenter))[0]
+
+    async def count_document_async(self, text: str, analyzer,
+                                   segmenter: Optional[str] = None) -> Tuple[Dict[str, Any], List[int], Set[str]]:
+        """
+        analyze_document_async() without the cache lookup, plus the merged per-level word
+        counts and distinct words behind the result (for indexing).
+        """
+        pieces = self._pieces(text)
+        for _ in range(self.MAX_VERSION_RETRIES):
+            try:
+                futures = self._submit(_count_piece, [(piece, segmenter) for piece in pieces])
+                parts = await asyncio.gather(*futures)
+            except BrokenProcessPool:
+                self._pool = None
+                raise
+            versions = {part[3] for part in parts}
+            if len(versions) == 1:
+                break
+            # Pieces ran on workers started before and after an HSK data reload: counts of
+            # different vocabularies can't be merged. Fresh workers all load the new data.
+            self.recycle()
+        else:
+            raise RuntimeError(f"HSK data kept changing while the document was analyzed (versions {sorted(versions)})")
+        version = versions.pop()
+
+        counts = [0] * 7
+        char_counts = [0] * 7
+        unique: Set[str] = set()
+        for part_counts, part_unique, part_char_counts, _ in parts:
+            for level in range(7):
+                counts[level] += part_counts[level]
+                char_counts[level] += part_char_counts[level]
+            unique |= part_unique
+
+        result = analyzer.result_from_counts(counts, len(unique), version, char_counts)
+        await asyncio.to_thread(analyzer.remember, text, result, segmenter)
+        return result, counts, unique
+
+    @staticmethod
+    def _flatten(chunk_results) -> List[Dict[str, Any]]:
+        items = []
+        for chunk in chunk_results:
+            for item in chunk:
+                item["index"] = len(items)
+                items.append(item)
+        return items
+
+    def recycle(self):
+        """
+        Replaces the worker pool, e.g. after the HSK data was reloaded: new work goes to fresh
+        workers that load the new data, work already submitted finishes on the old ones.
+        """
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,41 @@
+import re
+from typing import List
+
+# jieba segments each run of "han" characters (its re_han_default class) on its
+# own and emits every other character as a separate token. Cutting the text
+# right after a non-han character therefore yields exactly the tokens the
+# whole text would. Sentence punctuation is the preferred cut point.
+_HAN = "一-鿕a-zA-Z0-9+#&\\._%\\-"
+_LAST_SAFE_CUT = re.compile(f"[^{_HAN}][{_HAN}]*\\Z")
+_SAFE_CHAR = re.compile(f"[^{_HAN}]")
+SENTENCE_ENDS = "。！？；!?\n"
+
+def cut_position(text: str) -> int:
+    """Index just after the last sentence end, else after the last safe character, else 0."""
+    position = max(text.rfind(ch) for ch in SENTENCE_ENDS)
+    if position >= 0:
+        return position + 1
+    match = _LAST_SAFE_CUT.search(text)
+    return match.start() + 1 if match else 0
+
+def split_text(text: str, target_chars: int) -> List[str]:
+    """
+    Splits text into pieces of roughly `target_chars`, each ending on a safe boundary,
+    so segmenting the pieces separately gives the same tokens as segmenting the whole.
+    A piece only exceeds the target when no safe boundary exists inside it.
+    """
+    pieces = []
+    start = 0
+    while len(text) - start > target_chars:
+        window_end = start + target_chars
+        cut = cut_position(text[start:window_end])
+        if cut == 0:
+            # No boundary in the window: extend to the next safe character
+            match = _SAFE_CHAR.search(text, window_end)
+            if match is None:
+                break
+            cut = match.end() - start
+        pieces.append(text[start:start + cut])
+        start += cut
+    pieces.append(text[start:])
+    return pieces
@@ -0,0 +1,41 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class Coalescer:
+    """
+    In-flight deduplication ("single flight") for async computations.
+
+    The first caller for a key starts the computation; callers arriving while it runs
+    await the same task and get the same result (or exception) instead of starting
+    their own. Nothing is kept once the task finishes; that is the caches' job.
+
+    The computation runs as its own task, so a caller that goes away (client
+    disconnect) does not cancel it for the others. Results are shared objects:
+    callers must not mutate them.
+    """
+
+    def __init__(self):
+        self.stats = {"started": 0, "coalesced": 0}
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["started"] += 1
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Every waiter may have been cancelled; don't log the error as never retrieved
+        if not task.cancelled():
+            task.exception()
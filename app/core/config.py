@@ -0,0 +1,101 @@
+import os
+
+# Runtime tuning knobs. Everything can be overridden through the environment
+# so deployments can size the service without code changes.
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return int(value)
+
+# Batch analysis (POST /api/v1/analyze/batch)
+BATCH_WORKERS = _env_int("HANZ_BATCH_WORKERS", os.cpu_count() or 1)
+BATCH_MAX_ITEMS = _env_int("HANZ_BATCH_MAX_ITEMS", 10_000)
+
+# Texts at least this long are split at sentence boundaries and segmented on the
+# batch worker pool (needs HANZ_BATCH_WORKERS > 1). 0 disables.
+PARALLEL_THRESHOLD_CHARS = _env_int("HANZ_PARALLEL_THRESHOLD_CHARS", 200_000)
+PARALLEL_MIN_PIECE_CHARS = _env_int("HANZ_PARALLEL_MIN_PIECE_CHARS", 50_000)
+
+# Single-text analysis runs on a bounded thread pool off the event loop. Requests
+# beyond workers + queue depth are rejected with 503 and Retry-After.
+ANALYSIS_WORKERS = _env_int("HANZ_ANALYSIS_WORKERS", 2)
+ANALYSIS_QUEUE_DEPTH = _env_int("HANZ_ANALYSIS_QUEUE_DEPTH", 32)
+
+# Background jobs (POST /api/v1/jobs), persisted so they survive a restart
+JOB_WORKERS = _env_int("HANZ_JOB_WORKERS", 4)                # items processed concurrently per process
+JOB_MAX_ITEMS = _env_int("HANZ_JOB_MAX_ITEMS", 1000)
+JOB_LEASE_SECONDS = _env_int("HANZ_JOB_LEASE_SECONDS", 300)  # a claimed item is retried after this
+JOB_TTL = _env_int("HANZ_JOB_TTL", 7 * 24 * 3600)            # finished jobs are purged after this
+JOB_MAX_ATTEMPTS = _env_int("HANZ_JOB_MAX_ATTEMPTS", 3)      # claims before a crashing item is failed
+
+# Feed / sitemap crawls (scripts/crawl_site.py)
+CRAWL_CONCURRENCY = _env_int("HANZ_CRAWL_CONCURRENCY", 8)              # pages in flight overall
+CRAWL_HOST_INTERVAL_MS = _env_int("HANZ_CRAWL_HOST_INTERVAL_MS", 500)  # min gap between requests to one host
+CRAWL_MAX_PAGES = _env_int("HANZ_CRAWL_MAX_PAGES", 10_000)
+
+# Personal coverage (POST /api/v1/analyze/known): max users scored in one request
+KNOWN_COVERAGE_MAX_USERS = _env_int("HANZ_KNOWN_COVERAGE_MAX_USERS", 10_000)
+
+# HSK data hot reload: the CSVs are checked for changes every N seconds (0 disables;
+# POST /api/v1/admin/reload still works)
+RELOAD_POLL_SECONDS = _env_int("HANZ_RELOAD_POLL_SECONDS", 10)
+
+# Admin endpoints require this token in the X-Admin-Token header; disabled when unset
+ADMIN_TOKEN = os.environ.get("HANZ_ADMIN_TOKEN", "")
+
+# Request profiling (?profile=1 with the admin token on the analyze endpoints): profiles
+# kept in memory, and at most this many profiled requests per minute
+PROFILE_KEEP = _env_int("HANZ_PROFILE_KEEP", 20)
+PROFILE_PER_MINUTE = _env_int("HANZ_PROFILE_PER_MINUTE", 6)
+
+# Downloads stop (and the URL fails) past this many bytes of page body
+SCRAPER_MAX_BYTES = _env_int("HANZ_SCRAPER_MAX_BYTES", 10 * 1024 * 1024)
+
+# URL extraction profile: "fast", "balanced" or "precision" (see app/core/scraper.py)
+EXTRACTION_PROFILE = os.environ.get("HANZ_EXTRACTION_PROFILE", "balanced")
+
+# Corpus index of analyzed documents (POST /api/v1/corpus/query). Opt-in: anyone who can
+# query it learns which words indexed documents contain. Fetched pages are indexed;
+# pasted texts only with HANZ_CORPUS_INDEX_TEXTS=1.
+CORPUS_INDEX_ENABLED = os.environ.get("HANZ_CORPUS_INDEX", "0") == "1"
+CORPUS_INDEX_TEXTS = os.environ.get("HANZ_CORPUS_INDEX_TEXTS", "0") == "1"
+CORPUS_MAX_DOCUMENTS = _env_int("HANZ_CORPUS_MAX_DOCUMENTS", 100_000)  # oldest are evicted beyond this
+
+# Default word segmenter: "jieba", "jieba_nohmm", "maxmatch" or "maxmatch_forward"
+# (see app/core/segmenters.py); requests may pick another one
+SEGMENTER = os.environ.get("HANZ_SEGMENTER", "jieba")
+
+# Local on-disk state (caches, indexes). Relative paths resolve against the working directory.
+CACHE_DIR = os.environ.get("HANZ_CACHE_DIR", "cache")
+
+# URL result cache (POST /api/v1/analyze/url)
+URL_CACHE_ENABLED = os.environ.get("HANZ_URL_CACHE", "1") != "0"
+URL_CACHE_TTL = _env_int("HANZ_URL_CACHE_TTL", 3600)                 # seconds before revalidation
+URL_CACHE_MAX_BYTES = _env_int("HANZ_URL_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+URL_CACHE_MEMORY_ENTRIES = _env_int("HANZ_URL_CACHE_MEMORY_ENTRIES", 1024)
+
+# Analysis result cache (TextAnalyzer.analyze)
+ANALYSIS_CACHE_ENABLED = os.environ.get("HANZ_ANALYSIS_CACHE", "1") != "0"
+ANALYSIS_CACHE_MEMORY_ENTRIES = _env_int("HANZ_ANALYSIS_CACHE_MEMORY_ENTRIES", 4096)
+ANALYSIS_CACHE_MAX_ENTRIES = _env_int("HANZ_ANALYSIS_CACHE_MAX_ENTRIES", 500_000)
+
+# Prebuilt jieba dictionary snapshot (scripts/build_dictionary.py)
+TOKENIZER_SNAPSHOT = os.environ.get("HANZ_TOKENIZER_SNAPSHOT", os.path.join(CACHE_DIR, "jieba_hsk.marshal"))
+
+# Compiled binary vocabulary (scripts/build_vocabulary.py)
+VOCAB_ARTIFACT = os.environ.get("HANZ_VOCAB_ARTIFACT", os.path.join(CACHE_DIR, "hsk_vocab.bin"))
+
+# Job queue database
+JOBS_DB = os.environ.get("HANZ_JOBS_DB", os.path.join(CACHE_DIR, "jobs.sqlite3"))
+
+# Per-user known-word bitsets (PUT /api/v1/users/{id}/known-words)
+KNOWN_WORDS_DB = os.environ.get("HANZ_KNOWN_WORDS_DB", os.path.join(CACHE_DIR, "known_words.sqlite3"))
+
+# Held while the vocabulary artifact or tokenizer snapshot is (re)built, so that after
+# a data change one worker rebuilds and the others load its result
+REFERENCE_BUILD_LOCK = os.environ.get("HANZ_REFERENCE_BUILD_LOCK", os.path.join(CACHE_DIR, "reference_build.lock"))
+
+# Corpus index database
+CORPUS_DB = os.environ.get("HANZ_CORPUS_DB", os.path.join(CACHE_DIR, "corpus.sqlite3"))
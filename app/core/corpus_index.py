@@ -0,0 +1,313 @@
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.core import config
+from app.core.storage import open_database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    seq INTEGER NOT NULL,
+    url TEXT,
+    title TEXT,
+    difficulty_score TEXT NOT NULL,
+    vocabulary_version TEXT,
+    unknown INTEGER NOT NULL,
+    hsk_1 INTEGER NOT NULL,
+    hsk_2 INTEGER NOT NULL,
+    hsk_3 INTEGER NOT NULL,
+    hsk_4 INTEGER NOT NULL,
+    hsk_5 INTEGER NOT NULL,
+    hsk_6 INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_seq ON documents (seq);
+CREATE TABLE IF NOT EXISTS words (
+    id INTEGER PRIMARY KEY,
+    word TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS postings (
+    word_id INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL,
+    PRIMARY KEY (word_id, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+"""
+
+LEVEL_COLUMNS = ("unknown", "hsk_1", "hsk_2", "hsk_3", "hsk_4", "hsk_5", "hsk_6")
+# Parameters per "IN (...)" lookup, well under SQLite's variable limit
+LOOKUP_BATCH = 500
+# Adds between exact recounts of the documents (other workers add documents as well)
+RECOUNT_EVERY = 100
+MAX_LEVEL = 6
+
+class CorpusIndex:
+    """
+    Local index of analyzed documents for "find me texts at this level" queries.
+
+    SQLite holds, per document, its word count at every HSK level and a word -> document
+    inverted index. Queries never touch the text: the level histograms of all documents
+    are mirrored into one NumPy matrix per process (refreshed incrementally from a
+    sequence number, so documents indexed by other workers show up), coverage filters
+    are vectorized over it and must-include words are intersected posting lists.
+
+    Documents are keyed by the caller (normalized URL, or content hash for pasted text);
+    indexing a key again replaces the document. Beyond `max_documents` the least recently
+    indexed ones are evicted.
+    """
+
+    def __init__(self, path: Optional[str] = None, clock=time.time, max_documents: Optional[int] = None):
+        self.path = path or config.CORPUS_DB
+        self.clock = clock
+        self.max_documents = config.CORPUS_MAX_DOCUMENTS if max_documents is None else max_documents
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        # Documents in the index, as of the last recount plus this process's adds since
+        self._documents: Optional[int] = None
+        self._adds_since_count = 0
+
+        # In-memory mirror of documents: row i of _counts belongs to document _ids[i],
+        # last indexed under sequence number _seqs[i]
+        self._seq = 0
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._seqs = np.zeros(0, dtype=np.int64)
+        self._counts = np.zeros((0, len(LEVEL_COLUMNS)), dtype=np.int32)
+        self._rows: Dict[int, int] = {}
+        # Derived from _counts on every sync that changed it: words per document, share of
+        # unknown words, and cumulative coverage of HSK 1..n in row n - 1 (one row per level,
+        # so each filter reads one contiguous array)
+        self._totals = np.zeros(0, dtype=np.int64)
+        self._unknown = np.zeros(0)
+        self._coverage = np.zeros((MAX_LEVEL, 0))
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = open_database(self.path, SCHEMA)
+        return self._db
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            return self.db.execute("SELECT 1 FROM documents WHERE key = ?", (key,)).fetchone() is not None
+
+    def add(self, key: str, counts: List[int], words: Iterable[str], difficulty_score: str,
+            vocabulary_version: Optional[str] = None, url: Optional[str] = None,
+            title: Optional[str] = None) -> int:
+        """
+        Indexes one document: per-level word counts (counts[0] = unknown, counts[1..6] HSK
+        levels, as VocabularyIndex.count_levels) and its distinct words. Returns the document id.
+        """
+        words = sorted(set(words))
+        with self._lock:
+            # IMMEDIATE: the sequence number is read and bumped in one write transaction
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                seq = self.db.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM documents").fetchone()[0]
+                row = (seq, url, title, difficulty_score, vocabulary_version, *counts, self.clock())
+                existing = self.db.execute("SELECT id FROM documents WHERE key = ?", (key,)).fetchone()
+                if existing is not None:
+                    doc_id = existing[0]
+                    self.db.execute(
+                        "UPDATE documents SET seq = ?, url = ?, title = ?, difficulty_score = ?, vocabulary_version = ?, "
+                        f"{', '.join(f'{column} = ?' for column in LEVEL_COLUMNS)}, indexed_at = ? WHERE id = ?",
+                        (*row, doc_id),
+                    )
+                    self.db.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+                else:
+                    if self._documents is not None:
+                        self._documents += 1
+                    doc_id = self.db.execute(
+                        "INSERT INTO documents (key, seq, url, title, difficulty_score, vocabulary_version, "
+                        f"{', '.join(LEVEL_COLUMNS)}, indexed_at) VALUES ({', '.join('?' * (len(row) + 1))})",
+                        (key, *row),
+                    ).lastrowid
+                self.db.executemany("INSERT OR IGNORE INTO words (word) VALUES (?)", [(word,) for word in words])
+                word_ids = self._word_ids(words)
+                self.db.executemany("INSERT INTO postings VALUES (?, ?)",
+                                    [(word_id, doc_id) for word_id in word_ids.values()])
+                self._evict()
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                self._documents = None
+                raise
+        return doc_id
+
+    def _evict(self):
+        """
+        Deletes the least recently indexed documents beyond max_documents, and the words
+        no remaining document contains (inside add's transaction).
+        """
+        if not self.max_documents:
+            return
+        self._adds_since_count += 1
+        if self._documents is None or self._adds_since_count >= RECOUNT_EVERY:
+            self._documents = self.db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            self._adds_since_count = 0
+        excess = self._documents - self.max_documents
+        if excess <= 0:
+            return
+        evicted = [row[0] for row in self.db.execute(
+            "SELECT id FROM documents ORDER BY seq LIMIT ?", (excess,))]
+        for i in range(0, len(evicted), LOOKUP_BATCH):
+            batch = evicted[i:i + LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            word_ids = [row[0] for row in self.db.execute(
+                f"SELECT DISTINCT word_id FROM postings WHERE doc_id IN ({placeholders})", batch)]
+            self.db.execute(f"DELETE FROM postings WHERE doc_id IN ({placeholders})", batch)
+            self.db.execute(f"DELETE FROM documents WHERE id IN ({placeholders})", batch)
+            for j in range(0, len(word_ids), LOOKUP_BATCH):
+                words = word_ids[j:j + LOOKUP_BATCH]
+                self.db.execute(
+                    f"DELETE FROM words WHERE id IN ({','.join('?' * len(words))}) "
+                    "AND NOT EXISTS (SELECT 1 FROM postings WHERE word_id = words.id)", words)
+        self._documents -= len(evicted)
+
+    def _word_ids(self, words: List[str]) -> Dict[str, int]:
+        ids = {}
+        for i in range(0, len(words), LOOKUP_BATCH):
+            batch = words[i:i + LOOKUP_BATCH]
+            ids.update(self.db.execute(
+                f"SELECT word, id FROM words WHERE word IN ({','.join('?' * len(batch))})", batch).fetchall())
+        return ids
+
+    def _sync(self):
+        """Pulls documents added or replaced since the last sync into the in-memory matrix."""
+        rows = self.db.execute(
+            f"SELECT seq, id, {', '.join(LEVEL_COLUMNS)} FROM documents WHERE seq > ? ORDER BY seq", (self._seq,)
+        ).fetchall()
+        if not rows:
+            return
+        self._seq = rows[-1][0]
+        new_ids, new_seqs, new_counts = [], [], []
+        for row in rows:
+            position = self._rows.get(row[1])
+            if position is not None:
+                self._seqs[position] = row[0]
+                self._counts[position] = row[2:]
+            else:
+                self._rows[row[1]] = len(self._ids) + len(new_ids)
+                new_ids.append(row[1])
+                new_seqs.append(row[0])
+                new_counts.append(row[2:])
+        if new_ids:
+            self._ids = np.concatenate([self._ids, np.asarray(new_ids, dtype=np.int64)])
+            self._seqs = np.concatenate([self._seqs, np.asarray(new_seqs, dtype=np.int64)])
+            self._counts = np.concatenate([self._counts, np.asarray(new_counts, dtype=np.int32)])
+
+        # Eviction removes the lowest sequence numbers: everything below the oldest one left is gone
+        oldest = self.db.execute("SELECT MIN(seq) FROM documents").fetchone()[0]
+        keep = self._seqs >= (oldest if oldest is not None else self._seq + 1)
+        if not keep.all():
+            self._ids, self._seqs, self._counts = self._ids[keep], self._seqs[keep], self._counts[keep]
+            self._rows = {doc_id: position for position, doc_id in enumerate(self._ids.tolist())}
+
+        self._totals = self._counts.sum(axis=1, dtype=np.int64)
+        divisor = np.maximum(self._totals, 1)
+        self._unknown = self._counts[:, 0] / divisor
+        self._coverage = np.ascontiguousarray((np.cumsum(self._counts[:, 1:], axis=1) / divisor[:, None]).T)
+
+    def _documents_with(self, words: List[str]) -> Optional[np.ndarray]:
+        """Sorted ids of the documents containing every word; None when no word was asked for."""
+        if not words:
+            return None
+        word_ids = self._word_ids(sorted(set(words)))
+        if len(word_ids) < len(set(words)):
+            return np.zeros(0, dtype=np.int64)
+        postings = [
+            np.fromiter((row[0] for row in self.db.execute(
+                "SELECT doc_id FROM postings WHERE word_id = ?", (word_id,))), dtype=np.int64)
+            for word_id in word_ids.values()
+        ]
+        # Intersect the shortest lists first
+        postings.sort(key=len)
+        result = postings[0]
+        for ids in postings[1:]:
+            result = np.intersect1d(result, ids, assume_unique=True)
+        return result
+
+    def query(self, max_level: int = 6, min_coverage: float = 0.0, max_unknown: Optional[float] = None,
+              target_level: Optional[int] = None, include_words: Optional[List[str]] = None,
+              min_tokens: int = 1, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """
+        Documents where HSK 1..`max_level` words cover at least `min_coverage` of all words
+        (optionally at most `max_unknown` unknown words and at least `min_tokens` words) and
+        that contain every word of `include_words`. Ranked by coverage at `target_level`
+        (default `max_level`), highest first, then by length.
+
+        Returns:
+            {"total": number of matches, "documents": the requested page of them}
+        """
+        target_level = target_level or max_level
+        with self._lock:
+            self._sync()
+            # A sync replaces these arrays rather than changing them (apart from re-indexed rows)
+            ids, counts, totals = self._ids, self._counts, self._totals
+            unknown, coverage = self._unknown, self._coverage
+            required = self._documents_with(include_words or [])
+
+        mask = totals >= max(min_tokens, 1)
+        if min_coverage > 0:
+            mask &= coverage[max_level - 1] >= min_coverage
+        if max_unknown is not None:
+            mask &= unknown <= max_unknown
+        if required is not None:
+            mask &= np.isin(ids, required, assume_unique=True)
+
+        matches = np.flatnonzero(mask)
+        total = len(matches)
+        ranking = coverage[target_level - 1]
+        # Only the page is sorted: keep the matches ranked at least as high as the last one on it
+        wanted = offset + limit
+        if total > wanted:
+            scores = ranking[matches]
+            kth = np.partition(scores, total - wanted)[total - wanted]
+            matches = matches[scores >= kth]
+        # lexsort: last key is the primary one
+        order = matches[np.lexsort((-totals[matches], -ranking[matches]))]
+        page = order[offset:offset + limit]
+        return {"total": int(total), "documents": self._describe(ids[page], counts[page], ranking[page])}
+
+    def _describe(self, ids: np.ndarray, counts: np.ndarray, ranking: np.ndarray) -> List[Dict[str, Any]]:
+        if not len(ids):
+            return []
+        with self._lock:
+            meta = {row[0]: row[1:] for row in self.db.execute(
+                f"SELECT id, url, title, difficulty_score, vocabulary_version FROM documents "
+                f"WHERE id IN ({','.join('?' * len(ids))})", [int(doc_id) for doc_id in ids])}
+        documents = []
+        for doc_id, row, score in zip(ids.tolist(), counts, ranking.tolist()):
+            url, title, difficulty_score, vocabulary_version = meta.get(doc_id, (None, None, "Unknown", None))
+            total = int(row.sum())
+            document = {
+                "id": doc_id,
+                "url": url,
+                "title": title,
+                "difficulty_score": difficulty_score,
+                "vocabulary_version": vocabulary_version,
+                "total_tokens": total,
+                "target_coverage": round(score, 4),
+            }
+            for level in range(1, 7):
+                document[f"hsk_{level}_coverage"] = round(int(row[level]) / total, 4) if total else 0.0
+            document["unknown_coverage"] = round(int(row[0]) / total, 4) if total else 0.0
+            documents.append(document)
+        return documents
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "documents": self.db.execute("SELECT COUNT(*) FROM documents").fetchone()[0],
+                "words": self.db.execute("SELECT COUNT(*) FROM words").fetchone()[0],
+            }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,314 @@
+import asyncio
+import zlib
+import json
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+from xml.etree import ElementTree
+
+from app.core import config
+from app.core.scraper import WebScraper
+from app.core.storage import open_database
+from app.core.url_cache import normalize_url
+
+# Sitemap indexes may point at further indexes; don't follow them forever
+MAX_SITEMAP_DEPTH = 3
+
+# Site-level ordering of AnalysisResult.difficulty_score values, easiest first
+DIFFICULTY_ORDER = ("A1", "A2", "B1", "B2", "C1", "C2", "Unknown (>20%)", "Unknown")
+LEVELS = ("hsk_1", "hsk_2", "hsk_3", "hsk_4", "hsk_5", "hsk_6", "unknown")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawl_pages (
+    source TEXT NOT NULL,
+    url TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (source, url)
+);
+"""
+
+def _local_name(tag: str) -> str:
+    """Tag without its XML namespace: '{http://www.w3.org/2005/Atom}entry' -> 'entry'."""
+    return tag.rsplit("}", 1)[-1]
+
+def _gunzip(data: bytes, max_bytes: int) -> bytes:
+    """Decompresses a gzip document, refusing to expand it past `max_bytes`."""
+    decompressor = zlib.decompressobj(wbits=31)
+    try:
+        output = decompressor.decompress(data, max_bytes)
+    except zlib.error as e:
+        raise ValueError(f"Not a feed or sitemap: {e}")
+    if decompressor.unconsumed_tail:
+        raise ValueError(f"Document larger than {max_bytes} bytes once decompressed")
+    return output
+
+def parse_feed(data: bytes, base_url: str = "") -> Tuple[List[str], List[str]]:
+    """
+    Extracts article URLs from an RSS 2.0 / RSS 1.0 / Atom feed or an XML sitemap
+    (optionally gzipped).
+
+    Returns:
+        (pages, sitemaps): article URLs in document order, and the child sitemaps
+        listed by a sitemap index.
+
+    Raises:
+        ValueError: the document is not a feed or sitemap, or decompresses to more than
+            HANZ_SCRAPER_MAX_BYTES.
+    """
+    if data[:2] == b"\x1f\x8b":
+        data = _gunzip(data, config.SCRAPER_MAX_BYTES)
+    try:
+        root = ElementTree.fromstring(data)
+    except ElementTree.ParseError as e:
+        raise ValueError(f"Not a feed or sitemap: {e}")
+
+    kind = _local_name(root.tag)
+    pages: List[str] = []
+    sitemaps: List[str] = []
+    if kind in ("urlset", "sitemapindex"):
+        target = pages if kind == "urlset" else sitemaps
+        entry_name = "url" if kind == "urlset" else "sitemap"
+        # Only the <loc> directly under each entry: image / video extensions nest their own
+        # (<image:image><image:loc>), which are not pages
+        for entry in root:
+            if _local_name(entry.tag) != entry_name:
+                continue
+            for child in entry:
+                if _local_name(child.tag) == "loc" and child.text and child.text.strip():
+                    target.append(child.text.strip())
+                    break
+    elif kind in ("rss", "RDF"):
+        for item in root.iter():
+            if _local_name(item.tag) != "item":
+                continue
+            for child in item:
+                if _local_name(child.tag) == "link" and child.text and child.text.strip():
+                    pages.append(child.text.strip())
+                    break
+    elif kind == "feed":
+        for entry in root.iter():
+            if _local_name(entry.tag) != "entry":
+                continue
+            links = [child for child in entry if _local_name(child.tag) == "link" and child.get("href")]
+            # The article itself is rel="alternate" (also the default when rel is missing)
+            alternate = [link for link in links if link.get("rel", "alternate") == "alternate"]
+            if alternate or links:
+                pages.append((alternate or links)[0].get("href").strip())
+    else:
+        raise ValueError(f"Not a feed or sitemap (root element <{kind}>)")
+
+    return [urljoin(base_url, url) for url in pages], [urljoin(base_url, url) for url in sitemaps]
+
+async def discover_urls(scraper: WebScraper, source: str, max_pages: Optional[int] = None) -> List[str]:
+    """Article URLs of a feed or sitemap, following sitemap indexes; deduplicated, in document order."""
+    max_pages = config.CRAWL_MAX_PAGES if max_pages is None else max_pages
+    seen = set()
+    urls: List[str] = []
+    documents = [(source, 0)]
+    visited = set()
+    while documents and len(urls) < max_pages:
+        url, depth = documents.pop(0)
+        if url in visited:
+            continue
+        visited.add(url)
+        data = await scraper.fetch_bytes(url)
+        if data is None:
+            raise ValueError(f"Failed to download {url}")
+        pages, sitemaps = parse_feed(data, base_url=url)
+        for page in pages:
+            key = normalize_url(page)
+            if key not in seen:
+                seen.add(key)
+                urls.append(page)
+        if depth < MAX_SITEMAP_DEPTH:
+            documents.extend((sitemap, depth + 1) for sitemap in sitemaps)
+    return urls[:max_pages]
+
+class CrawlState:
+    """
+    Per-page crawl progress in SQLite, keyed by crawl source (the feed or sitemap URL).
+    Running the same source again skips pages already done, so an interrupted crawl
+    picks up where it stopped; pages that newly appeared in the feed are added.
+    """
+
+    def __init__(self, path: Optional[str] = None, clock=time.time):
+        self.path = path or os.path.join(config.CACHE_DIR, "crawl_state.sqlite3")
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = open_database(self.path, SCHEMA)
+        return self._db
+
+    def add(self, source: str, urls: List[str]) -> int:
+        """Registers discovered pages; returns how many were new."""
+        with self._lock:
+            start = self.db.execute(
+                "SELECT COALESCE(MAX(position) + 1, 0) FROM crawl_pages WHERE source = ?", (source,)).fetchone()[0]
+            before = self.db.total_changes
+            self.db.executemany(
+                "INSERT OR IGNORE INTO crawl_pages (source, url, position, status, updated_at) VALUES (?, ?, ?, 'pending', ?)",
+                [(source, url, start + i, self.clock()) for i, url in enumerate(urls)],
+            )
+            return self.db.total_changes - before
+
+    def pending(self, source: str, retry_failed: bool = False) -> List[str]:
+        statuses = ("pending", "failed") if retry_failed else ("pending",)
+        with self._lock:
+            rows = self.db.execute(
+                f"SELECT url FROM crawl_pages WHERE source = ? AND status IN ({','.join('?' * len(statuses))}) "
+                "ORDER BY position",
+                (source, *statuses),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def finish(self, source: str, url: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        with self._lock:
+            self.db.execute(
+                "UPDATE crawl_pages SET status = ?, result = ?, error = ?, updated_at = ? WHERE source = ? AND url = ?",
+                (
+                    "failed" if error is not None else "done",
+                    json.dumps(result, ensure_ascii=False) if result is not None else None,
+                    error,
+                    self.clock(),
+                    source,
+                    url,
+                ),
+            )
+
+    def pages(self, source: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT url, status, result, error FROM crawl_pages WHERE source = ? ORDER BY position", (source,)
+            ).fetchall()
+        return [
+            {"url": url, "status": status, "result": json.loads(result) if result else None, "error": error}
+            for url, status, result, error in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+class HostRateLimiter:
+    """Spaces request starts to one host at least `interval` seconds apart (slots are reserved in arrival order)."""
+
+    def __init__(self, interval: float, clock=time.monotonic):
+        self.interval = interval
+        self.clock = clock
+        self._next: Dict[str, float] = {}
+
+    async def wait(self, url: str):
+        host = urlsplit(url).netloc.lower()
+        now = self.clock()
+        slot = max(self._next.get(host, now), now)
+        self._next[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+def site_summary(pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Site-level view of a crawl: how many articles fall in each difficulty band, the
+    median band, and HSK coverage over all analyzed tokens (long articles weigh more).
+    """
+    results = [page["result"] for page in pages if page.get("result")]
+    counts = {score: 0 for score in DIFFICULTY_ORDER}
+    for result in results:
+        score = result.get("difficulty_score", "Unknown")
+        counts[score] = counts.get(score, 0) + 1
+
+    total_tokens = sum(result.get("total_tokens", 0) for result in results)
+    coverage = {}
+    for level in LEVELS:
+        weighted = sum(result.get(f"{level}_coverage", 0.0) * result.get("total_tokens", 0) for result in results)
+        coverage[f"{level}_coverage"] = round(weighted / total_tokens, 4) if total_tokens else 0.0
+
+    ranks = sorted(DIFFICULTY_ORDER.index(r["difficulty_score"]) for r in results
+                   if r.get("difficulty_score") in DIFFICULTY_ORDER)
+    return {
+        "articles": len(results),
+        "failed": sum(1 for page in pages if page.get("status") == "failed"),
+        "pending": sum(1 for page in pages if page.get("status") == "pending"),
+        "total_tokens": total_tokens,
+        "median_difficulty": DIFFICULTY_ORDER[int(statistics.median_low(ranks))] if ranks else None,
+        "difficulty_distribution": {
+            score: {"count": count, "share": round(count / len(results), 4) if results else 0.0}
+            for score, count in counts.items()
+        },
+        "coverage": coverage,
+    }
+
+class Crawler:
+    """
+    Crawls every article of a feed or sitemap and analyzes each page as it arrives.
+
+    At most `concurrency` pages are in flight overall, request starts to any one host are
+    spaced by `host_interval` seconds (on top of the scraper's per-host connection limit),
+    and progress is recorded in a CrawlState after every page.
+    """
+
+    def __init__(self, scraper: WebScraper, analyze: Callable[[str], Awaitable[Dict[str, Any]]],
+                 state: CrawlState, concurrency: Optional[int] = None, host_interval: Optional[float] = None,
+                 max_pages: Optional[int] = None):
+        self.scraper = scraper
+        self.analyze = analyze
+        self.state = state
+        self.concurrency = concurrency or config.CRAWL_CONCURRENCY
+        interval = config.CRAWL_HOST_INTERVAL_MS / 1000 if host_interval is None else host_interval
+        self.limiter = HostRateLimiter(interval)
+        self.max_pages = max_pages
+
+    async def run(self, source: str, retry_failed: bool = False,
+                  on_page: Optional[Callable[[str, Optional[Dict[str, Any]], Optional[str]], None]] = None
+                  ) -> Dict[str, Any]:
+        """Discovers and crawls the pages of `source`; returns per-article results and the site summary."""
+        self.state.add(source, await discover_urls(self.scraper, source, self.max_pages))
+        queue: asyncio.Queue = asyncio.Queue()
+        for url in self.state.pending(source, retry_failed):
+            queue.put_nowait(url)
+
+        async def worker():
+            while True:
+                try:
+                    url = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                result, error = await self.crawl_page(url)
+                self.state.finish(source, url, result, error)
+                if on_page is not None:
+                    on_page(url, result, error)
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return self.report(source)
+
+    async def crawl_page(self, url: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        await self.limiter.wait(url)
+        scraped = await self.scraper.fetch_and_extract_async(url)
+        if scraped.get("error"):
+            return None, f"Scraping failed: {scraped['error']}"
+        if not scraped.get("content"):
+            return None, "Unable to extract meaningful content from the URL."
+        try:
+            result = dict(await self.analyze(scraped["content"]))
+        except Exception as e:
+            return None, str(e) or type(e).__name__
+        result["title"] = scraped.get("title")
+        result["url"] = scraped.get("url")
+        return result, None
+
+    def report(self, source: str) -> Dict[str, Any]:
+        pages = self.state.pages(source)
+        return {"source": source, "site": site_summary(pages), "pages": pages}
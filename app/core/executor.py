@@ -0,0 +1,99 @@
+import asyncio
+import contextvars
+import functools
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core import config
+
+class ExecutorSaturated(Exception):
+    """Raised instead of queueing when the analysis executor is at capacity."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Analysis queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+class AnalysisExecutor:
+    """
+    Bounded thread pool for CPU-bound analysis called from async handlers.
+
+    At most `max_workers` analyses run at once and at most `max_queue` more wait for a
+    thread; anything beyond that is rejected right away with ExecutorSaturated, so
+    latency under overload stays bounded and the caller can answer 503 + Retry-After.
+    Segmentation holds the GIL, but CPython hands it back to the event loop every few
+    milliseconds, so health checks and static files keep being served during a long
+    analysis. Threads share the process-wide tokenizer and caches; the tokenizer is a
+    dedicated jieba.Tokenizer that is only read after startup (jieba's global default
+    tokenizer is never used), so concurrent cuts are safe.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: Optional[int] = None):
+        self.max_workers = max_workers or config.ANALYSIS_WORKERS
+        self.max_queue = config.ANALYSIS_QUEUE_DEPTH if max_queue is None else max_queue
+        self.stats = {"completed": 0, "rejected": 0}
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="analysis")
+        self._lock = threading.Lock()
+        self._pending = 0
+        # Moving average of task duration, used to estimate Retry-After
+        self._avg_seconds = 0.05
+
+    @property
+    def pending(self) -> int:
+        """Tasks running or waiting for a thread."""
+        return self._pending
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained, at least 1."""
+        backlog = self._pending * self._avg_seconds / self.max_workers
+        return max(1, min(60, math.ceil(backlog)))
+
+    def check_capacity(self):
+        """Raises ExecutorSaturated if a new task would be rejected right now."""
+        if self._pending >= self.max_workers + self.max_queue:
+            with self._lock:
+                self.stats["rejected"] += 1
+            raise ExecutorSaturated(self.retry_after())
+
+    async def run(self, fn: Callable[..., Any], *args, admitted: bool = False) -> Any:
+        """
+        Runs fn(*args) on the pool and awaits the result.
+
+        `admitted=True` skips the capacity check, for follow-up work of a request that
+        was already accepted (e.g. the next chunk of a streaming upload).
+        """
+        with self._lock:
+            if not admitted and self._pending >= self.max_workers + self.max_queue:
+                self.stats["rejected"] += 1
+                raise ExecutorSaturated(self.retry_after())
+            self._pending += 1
+        # Run in a copy of the caller's context so per-request state (metrics stages) follows
+        call = functools.partial(contextvars.copy_context().run, self._timed, fn, *args)
+        try:
+            future = self._pool.submit(call)
+        except BaseException:
+            self._done(None)
+            raise
+        # Released when the thread is done with fn (or fn was cancelled before it started),
+        # not when the caller stops waiting: a disconnected request's analysis still occupies
+        # a worker until it finishes
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+    def _done(self, future):
+        with self._lock:
+            self._pending -= 1
+            self.stats["completed"] += 1
+
+    def _timed(self, fn: Callable[..., Any], *args) -> Any:
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._avg_seconds = 0.9 * self._avg_seconds + 0.1 * elapsed
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
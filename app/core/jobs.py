@@ -0,0 +1,284 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core import config
+from app.core.storage import open_database
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    total INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    input TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    claimed_at REAL,
+    finished_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS job_items_status ON job_items (status, claimed_at);
+CREATE INDEX IF NOT EXISTS jobs_created_at ON jobs (created_at);
+"""
+
+# Item states
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+class JobStore:
+    """
+    SQLite-backed job queue shared by every worker process on the host.
+
+    Items are claimed with a single atomic UPDATE, so several processes can drain the
+    same queue without running an item twice. A claim is a lease: an item still
+    "running" after `lease_seconds` (its worker died or was restarted) is handed out
+    again, up to `max_attempts` claims in total; an item that keeps crashing or hanging
+    its worker is then marked failed. Finished jobs are kept for `ttl` seconds, then purged.
+    """
+
+    def __init__(self, path: Optional[str] = None, lease_seconds: Optional[int] = None,
+                 ttl: Optional[int] = None, max_attempts: Optional[int] = None, clock=time.time):
+        self.path = path or config.JOBS_DB
+        self.lease_seconds = config.JOB_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        self.ttl = config.JOB_TTL if ttl is None else ttl
+        self.max_attempts = config.JOB_MAX_ATTEMPTS if max_attempts is None else max_attempts
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = open_database(self.path, SCHEMA)
+            # Databases created before attempts were counted
+            columns = {row[1] for row in db.execute("PRAGMA table_info(job_items)")}
+            if "attempts" not in columns:
+                db.execute("ALTER TABLE job_items ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+            self._db = db
+        return self._db
+
+    def create(self, items: List[Tuple[str, str]]) -> str:
+        """Queues a job of (kind, input) items and returns its id."""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self.db.execute("BEGIN")
+            try:
+                self.db.execute("INSERT INTO jobs VALUES (?, ?, ?)", (job_id, self.clock(), len(items)))
+                self.db.executemany(
+                    "INSERT INTO job_items (job_id, idx, kind, input, status) VALUES (?, ?, ?, ?, ?)",
+                    [(job_id, index, kind, value, PENDING) for index, (kind, value) in enumerate(items)],
+                )
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+        return job_id
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """
+        Takes the oldest runnable item (pending, or running with an expired lease), or None.
+        Expired items that already used up their attempts are marked failed instead.
+        """
+        now = self.clock()
+        expired = now - self.lease_seconds
+        with self._lock:
+            self.db.execute(
+                "UPDATE job_items SET status = ?, error = ?, finished_at = ? "
+                "WHERE status = ? AND claimed_at < ? AND attempts >= ?",
+                (FAILED, f"Gave up after {self.max_attempts} attempts (the worker crashed or timed out)",
+                 now, RUNNING, expired, self.max_attempts),
+            )
+            row = self.db.execute(
+                """
+                UPDATE job_items SET status = ?, claimed_at = ?, attempts = attempts + 1
+                WHERE rowid = (
+                    SELECT rowid FROM job_items
+                    WHERE status = ? OR (status = ? AND claimed_at < ?)
+                    ORDER BY rowid LIMIT 1
+                )
+                RETURNING job_id, idx, kind, input
+                """,
+                (RUNNING, now, PENDING, RUNNING, expired),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"job_id": row[0], "index": row[1], "kind": row[2], "input": row[3]}
+
+    def finish(self, job_id: str, index: int, result: Optional[Dict[str, Any]] = None,
+               error: Optional[str] = None):
+        with self._lock:
+            self.db.execute(
+                "UPDATE job_items SET status = ?, result = ?, error = ?, finished_at = ? WHERE job_id = ? AND idx = ?",
+                (
+                    FAILED if error is not None else DONE,
+                    json.dumps(result, ensure_ascii=False) if result is not None else None,
+                    error,
+                    self.clock(),
+                    job_id,
+                    index,
+                ),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job summary with per-item status and results, or None if unknown (or purged)."""
+        with self._lock:
+            job = self.db.execute("SELECT created_at, total FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            rows = self.db.execute(
+                "SELECT idx, kind, input, status, result, error FROM job_items WHERE job_id = ? ORDER BY idx",
+                (job_id,),
+            ).fetchall()
+
+        items = [
+            {
+                "index": index,
+                "kind": kind,
+                # Texts can be megabytes; echo URLs only
+                "url": value if kind == "url" else None,
+                "status": status,
+                "result": json.loads(result) if result is not None else None,
+                "error": error,
+            }
+            for index, kind, value, status, result, error in rows
+        ]
+        completed = sum(1 for item in items if item["status"] == DONE)
+        failed = sum(1 for item in items if item["status"] == FAILED)
+        pending = sum(1 for item in items if item["status"] == PENDING)
+        if completed + failed == job[1]:
+            status = "completed"
+        elif pending == job[1]:
+            status = "queued"
+        else:
+            status = "running"
+        return {
+            "id": job_id,
+            "status": status,
+            "created_at": job[0],
+            "total": job[1],
+            "completed": completed,
+            "failed": failed,
+            "items": items,
+        }
+
+    def purge(self) -> int:
+        """
+        Deletes jobs whose items all finished more than `ttl` seconds ago; returns how many.
+        A job with items still pending or running is kept, however old.
+        """
+        cutoff = self.clock() - self.ttl
+        expired = ("SELECT id FROM jobs WHERE created_at < ? AND NOT EXISTS (SELECT 1 FROM job_items "
+                   "WHERE job_id = jobs.id AND (status IN (?, ?) OR finished_at >= ?))")
+        params = (cutoff, PENDING, RUNNING, cutoff)
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                self.db.execute(f"DELETE FROM job_items WHERE job_id IN ({expired})", params)
+                # Their items are gone now: jobs without any left are the expired ones
+                deleted = self.db.execute(
+                    "DELETE FROM jobs WHERE created_at < ? AND NOT EXISTS "
+                    "(SELECT 1 FROM job_items WHERE job_id = jobs.id)", (cutoff,)).rowcount
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+        return deleted
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+class JobRunner:
+    """
+    Drains a JobStore with `concurrency` asyncio workers in this process.
+
+    `process(kind, input)` does the actual work and returns a result dict; an exception
+    marks the item failed with its message. Workers wake up immediately on `notify()`
+    (a job submitted here) and poll every `poll_interval` seconds otherwise, which picks
+    up jobs submitted to other processes and items whose lease expired after a restart.
+    """
+
+    PURGE_INTERVAL = 3600
+
+    def __init__(self, store: JobStore, process: Callable[[str, str], Awaitable[Dict[str, Any]]],
+                 concurrency: Optional[int] = None, poll_interval: float = 1.0):
+        self.store = store
+        self.process = process
+        self.concurrency = concurrency or config.JOB_WORKERS
+        self.poll_interval = poll_interval
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._last_purge = 0.0
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _worker(self):
+        while True:
+            try:
+                await self._step()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # E.g. the shared database stayed locked: keep this worker alive and retry.
+                # An item claimed meanwhile is retried once its lease expires.
+                logger.exception("Job worker step failed")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _step(self):
+        """Claims and processes one item, or waits for work (and purges) when there is none."""
+        item = await asyncio.to_thread(self.store.claim)
+        if item is None:
+            await self._maybe_purge()
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            return
+
+        try:
+            result = await self.process(item["kind"], item["input"])
+            error = None
+        except asyncio.CancelledError:
+            # Shutdown mid-item: leave it claimed, it is retried once the lease expires
+            raise
+        except Exception as e:
+            result, error = None, str(e) or type(e).__name__
+        await asyncio.to_thread(self.store.finish, item["job_id"], item["index"], result, error)
+
+    async def _maybe_purge(self):
+        now = time.monotonic()
+        if now - self._last_purge >= self.PURGE_INTERVAL:
+            self._last_purge = now
+            await asyncio.to_thread(self.store.purge)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
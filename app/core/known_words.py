@@ -0,0 +1,230 @@
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core import config
+from app.core.storage import open_database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS word_ids (
+    id INTEGER PRIMARY KEY,
+    word TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS known_words (
+    user_id TEXT PRIMARY KEY,
+    bits BLOB NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Elements of the (users x word occurrences) matrices built per block while scoring:
+# users are blocked so that about 10 MB of temporaries serve any batch of texts
+COVERAGE_BLOCK_ELEMENTS = 1 << 20
+
+# A text reduced to what coverage needs: ids of its distinct vocabulary words, how often
+# each occurs, and its total number of words (including words with no id, never known)
+TextProfile = Tuple[np.ndarray, np.ndarray, int]
+
+class KnownWordStore:
+    """
+    Per-user known-word lists, stored as bitsets over vocabulary ids.
+
+    Ids are assigned once per word and never change (new HSK words are appended after
+    a reload), so stored bitsets stay valid across data changes. Bit i of a user's set
+    (byte i >> 3, bit i & 7) is set when the user knows word i. Shared by every worker
+    through SQLite, like the other caches.
+    """
+
+    def __init__(self, path: Optional[str] = None, clock=time.time):
+        self.path = path or config.KNOWN_WORDS_DB
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._ids: Dict[str, int] = {}
+        self._words: List[Optional[str]] = []
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = open_database(self.path, SCHEMA)
+        return self._db
+
+    @property
+    def size(self) -> int:
+        """Number of ids assigned (bitsets are padded to this many bits)."""
+        return len(self._words)
+
+    @property
+    def nbytes(self) -> int:
+        return (self.size + 7) // 8
+
+    def _refresh(self):
+        """Picks up ids assigned since the last refresh (by this or another worker)."""
+        for word_id, word in self.db.execute("SELECT id, word FROM word_ids WHERE id >= ? ORDER BY id",
+                                             (len(self._words),)):
+            self._words.extend([None] * (word_id - len(self._words)))
+            self._words.append(word)
+            self._ids[word] = word_id
+
+    def assign_ids(self, words: Iterable[str]):
+        """Gives an id to every word that has none yet, in the given order (e.g. easiest first)."""
+        with self._lock:
+            self._refresh()
+            new = [word for word in dict.fromkeys(words) if word not in self._ids]
+            if new:
+                self.db.execute("BEGIN IMMEDIATE")
+                try:
+                    start = self.db.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM word_ids").fetchone()[0]
+                    self.db.executemany("INSERT OR IGNORE INTO word_ids VALUES (?, ?)",
+                                        [(start + i, word) for i, word in enumerate(new)])
+                    self.db.execute("COMMIT")
+                except BaseException:
+                    self.db.execute("ROLLBACK")
+                    raise
+            self._refresh()
+
+    def word_ids(self) -> Dict[str, int]:
+        with self._lock:
+            self._refresh()
+            return self._ids
+
+    def _pad(self, bits: Optional[bytes]) -> np.ndarray:
+        array = np.zeros(self.nbytes, dtype=np.uint8)
+        if bits:
+            array[:len(bits)] = np.frombuffer(bits, dtype=np.uint8)[:self.nbytes]
+        return array
+
+    def get(self, user_id: str) -> Optional[np.ndarray]:
+        """The user's bitset as a uint8 array of `nbytes`, or None for an unknown user."""
+        with self._lock:
+            self._refresh()
+            row = self.db.execute("SELECT bits FROM known_words WHERE user_id = ?", (user_id,)).fetchone()
+            return self._pad(row[0]) if row is not None else None
+
+    def get_many(self, user_ids: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+        """
+        Bitsets of several users as one (users x nbytes) matrix, in the given order.
+        Returns the matrix and the ids of users that have no list (their rows are empty).
+        """
+        with self._lock:
+            self._refresh()
+            found: Dict[str, bytes] = {}
+            unique = list(dict.fromkeys(user_ids))
+            for i in range(0, len(unique), 500):
+                batch = unique[i:i + 500]
+                found.update(self.db.execute(
+                    f"SELECT user_id, bits FROM known_words WHERE user_id IN ({','.join('?' * len(batch))})",
+                    batch).fetchall())
+            matrix = np.zeros((len(user_ids), self.nbytes), dtype=np.uint8)
+            for row, user_id in enumerate(user_ids):
+                if user_id in found:
+                    matrix[row] = self._pad(found[user_id])
+        return matrix, [user_id for user_id in unique if user_id not in found]
+
+    def update(self, user_id: str, words: Iterable[str], mode: str = "replace") -> Tuple[int, List[str]]:
+        """
+        Replaces the user's known words with `words`, or adds / removes them ("add", "remove").
+        Returns the number of words the user now knows and the words that have no id
+        (not in the vocabulary), which are ignored.
+        """
+        if mode not in ("replace", "add", "remove"):
+            raise ValueError(f"Unknown mode {mode!r}, expected 'replace', 'add' or 'remove'")
+        with self._lock:
+            self._refresh()
+            ids = []
+            unrecognized = []
+            for word in dict.fromkeys(words):
+                word_id = self._ids.get(word)
+                if word_id is None:
+                    unrecognized.append(word)
+                else:
+                    ids.append(word_id)
+            ids = np.asarray(ids, dtype=np.int64)
+            flags = np.zeros(self.nbytes, dtype=np.uint8)
+            np.bitwise_or.at(flags, ids >> 3, (1 << (ids & 7)).astype(np.uint8))
+
+            # Read-modify-write in one write transaction; another worker may update the same user
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.db.execute("SELECT bits FROM known_words WHERE user_id = ?", (user_id,)).fetchone()
+                bits = self._pad(row[0]) if row is not None else np.zeros(self.nbytes, dtype=np.uint8)
+                if mode == "replace":
+                    bits = flags
+                elif mode == "add":
+                    bits |= flags
+                else:
+                    bits &= ~flags
+                self.db.execute("INSERT OR REPLACE INTO known_words VALUES (?, ?, ?)",
+                                (user_id, bits.tobytes(), self.clock()))
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+        return int(np.unpackbits(bits).sum()), unrecognized
+
+    def words(self, bits: np.ndarray) -> List[str]:
+        """Words of a bitset, in id order."""
+        ids = np.flatnonzero(np.unpackbits(bits, bitorder="little"))
+        return [self._words[i] for i in ids.tolist() if i < len(self._words) and self._words[i] is not None]
+
+    def delete(self, user_id: str) -> bool:
+        with self._lock:
+            return self.db.execute("DELETE FROM known_words WHERE user_id = ?", (user_id,)).rowcount > 0
+
+    def profile(self, token_counts: Dict[str, int]) -> TextProfile:
+        """TextProfile of a text from its word -> occurrences counts (TextAnalyzer.token_counts)."""
+        ids = self.word_ids()
+        pairs = [(ids[word], count) for word, count in token_counts.items() if word in ids]
+        word_ids = np.fromiter((pair[0] for pair in pairs), dtype=np.int64, count=len(pairs))
+        counts = np.fromiter((pair[1] for pair in pairs), dtype=np.int64, count=len(pairs))
+        return word_ids, counts, sum(token_counts.values())
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+def known_coverage(bitsets: np.ndarray, profiles: Sequence[TextProfile]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Scores every text against every user in one batched pass: for the concatenated word
+    ids of all texts, each user's bits are picked out with a shift and a mask, weighted
+    by occurrences and summed per text.
+
+    Args:
+        bitsets: (users x nbytes) uint8 matrix from KnownWordStore.get_many.
+        profiles: one TextProfile per text.
+
+    Returns:
+        (coverage, known): (texts x users) share of each text's words the user knows,
+        and the number of those word occurrences.
+    """
+    n_texts, n_users = len(profiles), bitsets.shape[0]
+    known = np.zeros((n_texts, n_users), dtype=np.int64)
+    totals = np.asarray([profile[2] for profile in profiles], dtype=np.int64)
+    nonempty = [i for i, profile in enumerate(profiles) if len(profile[0])]
+    if nonempty and n_users and bitsets.shape[1]:
+        ids = np.concatenate([profiles[i][0] for i in nonempty])
+        counts = np.concatenate([profiles[i][1] for i in nonempty])
+        starts = np.cumsum([0] + [len(profiles[i][0]) for i in nonempty[:-1]])
+        # Ids assigned after a bitset was stored fall past its end: never known
+        in_range = ids < bitsets.shape[1] * 8
+        byte = np.where(in_range, ids >> 3, 0)
+        mask = np.where(in_range, 1 << (ids & 7), 0).astype(np.uint8)
+        # At least one user per block: then temporaries are as large as the texts' own id arrays
+        block_users = max(1, COVERAGE_BLOCK_ELEMENTS // len(ids))
+        for first in range(0, n_users, block_users):
+            block = bitsets[first:first + block_users]
+            known[nonempty, first:first + len(block)] = _known_block(block, byte, mask, counts, starts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        coverage = np.where(totals[:, None] > 0, known / np.maximum(totals, 1)[:, None], 0.0)
+    return np.round(coverage, 4), known
+
+def _known_block(block: np.ndarray, byte: np.ndarray, mask: np.ndarray, counts: np.ndarray,
+                 starts: np.ndarray) -> np.ndarray:
+    """(texts x users) known word occurrences for one block of users' bitsets."""
+    hits = (block[:, byte] & mask) != 0
+    return np.add.reduceat(hits * counts, starts, axis=1).T
@@ -0,0 +1,178 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Minimal in-process metrics: counters and fixed-bucket histograms rendered in the
+# Prometheus text format, plus per-request stage timings for the Server-Timing
+# header. Recording is a perf_counter pair, a bisect and a few additions under a
+# lock, cheap enough to leave on in production. Metrics are per process; with
+# several uvicorn workers each one serves its own /metrics.
+
+# Seconds; covers a sub-millisecond cache hit up to a slow 30s fetch
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labelvalues: str):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for labelvalues, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labelvalues -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *labelvalues: str) -> int:
+        series = self._series.get(labelvalues)
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labelvalues, list(series)) for labelvalues, series in self._series.items()]
+        for labelvalues, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labelnames, labelvalues, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {series[-1]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+STAGE_SECONDS = Histogram(
+    "hanz_stage_duration_seconds", "Time spent per processing stage.", ("stage",))
+REQUEST_SECONDS = Histogram(
+    "hanz_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status"))
+TOKENS = Counter("hanz_tokens_total", "Word tokens analyzed.")
+CHARS = Counter("hanz_analyzed_chars_total", "Characters of text analyzed.")
+FETCHED_BYTES = Counter("hanz_fetched_bytes_total", "Bytes downloaded from URLs.")
+
+_METRICS = [STAGE_SECONDS, REQUEST_SECONDS, TOKENS, CHARS, FETCHED_BYTES]
+# name -> callable returning {event: count}; read at scrape time (cache stats etc.)
+_collectors: Dict[str, Callable[[], Optional[Dict[str, float]]]] = {}
+
+def register_stats(name: str, collect: Callable[[], Optional[Dict[str, float]]]):
+    """Exposes a stats dict (e.g. a cache's hit/miss counters) as hanz_<name>_events_total."""
+    _collectors[name] = collect
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    for name, collect in list(_collectors.items()):
+        stats = collect()
+        if not stats:
+            continue
+        metric_name = f"hanz_{name}_events_total"
+        lines.append(f"# HELP {metric_name} Event counters of {name}.")
+        lines.append(f"# TYPE {metric_name} counter")
+        for event, value in stats.items():
+            lines.append(f'{metric_name}{{event="{_escape(event)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+# Stage durations (ms) of the request being served, for Server-Timing
+_request_stages: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "request_stages", default=None)
+
+def observe_stage(stage: str, seconds: float):
+    """Records one stage duration in the histogram and in the current request's Server-Timing."""
+    STAGE_SECONDS.observe(seconds, stage)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages[stage] = stages.get(stage, 0.0) + seconds * 1000
+
+@contextmanager
+def stage(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - start)
+
+def server_timing(stages: Dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={ms:.2f}" for name, ms in stages.items())
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: times every HTTP request by route and adds a Server-Timing header
+    listing the stages recorded while it was handled. Pure ASGI (not BaseHTTPMiddleware)
+    so streaming request bodies and responses pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stages: Dict[str, float] = {}
+        token = _request_stages.set(stages)
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if stages:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(stages).encode("latin-1")))
+                    message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stages.reset(token)
+            route = scope.get("route")
+            # Route templates only, never raw paths, to keep label cardinality bounded
+            path = getattr(route, "path", "unmatched")
+            REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], path, str(status["code"]))
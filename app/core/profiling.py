@@ -0,0 +1,173 @@
+import cProfile
+import itertools
+import marshal
+import os
+import pstats
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core import config
+
+# Where a function's own time is booked, by a path component of its source file.
+# Builtins and C methods have no file and are booked to their callers.
+CATEGORIES = (
+    ("jieba", ("jieba",)),
+    ("pandas", ("pandas",)),
+    # trafilatura and the libraries its extraction runs on
+    ("trafilatura", ("trafilatura", "lxml", "justext", "htmldate", "courlan", "charset_normalizer")),
+    ("numpy", ("numpy",)),
+    ("http", ("httpx", "httpcore", "h11", "ssl", "socket")),
+)
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Functions listed in a profile summary, by own time
+TOP_FUNCTIONS = 30
+
+class ProfilingBusy(Exception):
+    """Raised when a profile is requested while another one runs or the rate limit is used up."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Profiling is rate limited, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+def categorize(filename: str) -> str:
+    """Category of a source file: a CATEGORIES name, "app" for this service's code, else "other"."""
+    if filename.startswith(APP_DIR + os.sep):
+        return "app"
+    parts = set(filename.replace("\\", "/").split("/"))
+    for name, packages in CATEGORIES:
+        if parts.intersection(packages) or any(part.startswith(package + ".") for part in parts
+                                               for package in packages):
+            return name
+    return "other"
+
+def breakdown(stats: Dict) -> Dict[str, float]:
+    """
+    Own time per category in milliseconds, from a pstats `stats` dict. Time spent in a
+    builtin (file "~", e.g. a regex match or an lxml call) goes to the categories of
+    its callers, split by how much of it each caller accounted for.
+    """
+    totals: Dict[str, float] = {}
+    for (filename, _, name), (_, _, own, _, callers) in stats.items():
+        if filename != "~":
+            shares = [(categorize(filename), own)]
+        elif "lxml" in name:
+            shares = [("trafilatura", own)]
+        else:
+            caller_time = sum(timing[2] for timing in callers.values())
+            if caller_time > 0:
+                shares = [(categorize(caller[0]), own * timing[2] / caller_time)
+                          for caller, timing in callers.items()]
+            else:
+                shares = [("other", own)]
+        for category, seconds in shares:
+            totals[category] = totals.get(category, 0.0) + seconds
+    return {category: round(seconds * 1000, 2)
+            for category, seconds in sorted(totals.items(), key=lambda item: -item[1])}
+
+def top_functions(stats: Dict, limit: int = TOP_FUNCTIONS) -> List[Dict[str, Any]]:
+    """The `limit` functions with the most own time."""
+    rows = sorted(stats.items(), key=lambda item: -item[1][2])[:limit]
+    return [
+        {
+            "function": name,
+            "file": filename,
+            "line": line,
+            "category": categorize(filename) if filename != "~" else "builtin",
+            "calls": calls,
+            "own_ms": round(own * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for (filename, line, name), (_, calls, own, cumulative, _) in rows
+    ]
+
+class RequestProfiler:
+    """
+    Opt-in profiling of single requests (see ?profile=1 on the analyze endpoints).
+
+    The request's work runs in one thread under cProfile, so the profile holds exactly
+    that request's calls and nothing from concurrent ones. Deterministic profiling slows
+    pure-Python code (jieba above all) more than C code, so absolute times run high;
+    the shares are what to read. Profiles are kept in memory, the most recent `keep`,
+    and at most `per_minute` run per minute, one at a time.
+    """
+
+    def __init__(self, keep: Optional[int] = None, per_minute: Optional[int] = None, clock=time.monotonic):
+        self.keep = config.PROFILE_KEEP if keep is None else keep
+        self.per_minute = config.PROFILE_PER_MINUTE if per_minute is None else per_minute
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._running = False
+        self._started: deque = deque()
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._ids = itertools.count(1)
+
+    def acquire(self):
+        """Takes the profiling slot; raises ProfilingBusy if one runs or the minute's quota is used."""
+        with self._lock:
+            now = self.clock()
+            while self._started and now - self._started[0] >= 60:
+                self._started.popleft()
+            if self._running:
+                raise ProfilingBusy(1)
+            if len(self._started) >= self.per_minute:
+                raise ProfilingBusy(max(1, int(60 - (now - self._started[0])) + 1))
+            self._running = True
+            self._started.append(now)
+
+    def release(self):
+        with self._lock:
+            self._running = False
+
+    def run(self, label: str, fn: Callable[..., Any], *args) -> Tuple[Any, str]:
+        """
+        Calls fn(*args) under cProfile in this thread (take the slot with acquire() first).
+        Returns fn's result and the id of the stored profile; the profile is stored even
+        when fn raises.
+        """
+        profile = cProfile.Profile()
+        started = time.time()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            profile.disable()
+            self._store(label, profile, started, time.perf_counter() - start, f"{type(e).__name__}: {e}")
+            raise
+        profile.disable()
+        return result, self._store(label, profile, started, time.perf_counter() - start, None)
+
+    def _store(self, label: str, profile: cProfile.Profile, started: float, seconds: float,
+               error: Optional[str]) -> str:
+        profile.create_stats()
+        stats = pstats.Stats(profile).stats
+        profile_id = f"{int(started)}-{next(self._ids)}"
+        entry = {
+            "id": profile_id,
+            "label": label,
+            "started_at": started,
+            "wall_ms": round(seconds * 1000, 2),
+            "error": error,
+            "breakdown_ms": breakdown(stats),
+            "top_functions": top_functions(stats),
+            # Raw stats in the format pstats.Stats / snakeviz load (pstats.Stats.dump_stats)
+            "pstats": marshal.dumps(stats),
+        }
+        with self._lock:
+            self._profiles[profile_id] = entry
+            while len(self._profiles) > self.keep:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Stored profiles, newest first, without their function tables."""
+        with self._lock:
+            return [{key: entry[key] for key in ("id", "label", "started_at", "wall_ms", "error")}
+                    for entry in reversed(self._profiles.values())]
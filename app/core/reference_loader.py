@@ -1,10 +1,16 @@
-import pandas as pd
 import pathlib
 import os
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from app.core import config
+from app.core.vocab_store import VocabularyStore, open_store, read_hsk_csvs
+
+if TYPE_CHECKING:
+    # Imported where a DataFrame is built: analysis never needs pandas
+    import pandas as pd
 
 HSK_LEVELS_DIR = pathlib.Path(__file__).parent.parent / "data" / "hsk_levels"
 
-def load_hsk_data() -> pd.DataFrame:
+def load_hsk_data() -> "pd.DataFrame":
     """
     Loads HSK 1-6 CSV files into a single Pandas DataFrame.
     Optimized for lookup by setting 'word' as the index.
@@ -12,6 +18,8 @@ def load_hsk_data() -> pd.DataFrame:
     Returns:
         pd.DataFrame: Columns [level, pinyin, meaning], Index [word]
     """
+    import pandas as pd
+
     dfs = []
     
     # Iterate through HSK 1-6
@@ -43,21 +51,84 @@ def load_hsk_data() -> pd.DataFrame:
     
     return full_df
 
+_store_cache = None
 _hsk_cache = None
 
-def get_hsk_dataframe() -> pd.DataFrame:
-    """Singleton accessor for HSK data."""
+def get_hsk_words() -> List[str]:
+    """HSK words in source order (HSK 1 first, then file order), as the tokenizer tuning expects."""
+    return [entry[0] for entry in read_hsk_csvs(HSK_LEVELS_DIR)]
+
+def load_vocabulary_store() -> Optional[VocabularyStore]:
+    """
+    Opens the compiled vocabulary matching the CSVs as they are now, recompiling it if they
+    changed. Not cached; see get_vocabulary_store. The artifact is replaced atomically, so
+    stores opened earlier keep reading the old data.
+    """
+    return open_store(HSK_LEVELS_DIR, config.VOCAB_ARTIFACT)
+
+def get_vocabulary_store() -> Optional[VocabularyStore]:
+    """
+    Singleton accessor for the memory-mapped compiled vocabulary (see scripts/build_vocabulary.py).
+    Built from the CSVs on first use if missing or stale. None if there is no HSK data at all.
+    """
+    global _store_cache
+    if _store_cache is None:
+        _store_cache = load_vocabulary_store()
+    return _store_cache
+
+def set_vocabulary_store(store: Optional[VocabularyStore]):
+    """Swaps in a reloaded vocabulary; get_hsk_dataframe follows on its next call."""
+    global _store_cache
+    _store_cache = store
+
+def reference_data_signature() -> Tuple[Tuple[str, int, int], ...]:
+    """Cheap change detector for the CSVs (name, mtime, size); polled by the reload watcher."""
+    signature = []
+    for level in range(1, 7):
+        file_path = HSK_LEVELS_DIR / f"hsk{level}.csv"
+        try:
+            stat = file_path.stat()
+        except OSError:
+            continue
+        signature.append((file_path.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+def get_hsk_dataframe() -> "pd.DataFrame":
+    """
+    Singleton accessor for HSK data, read from the compiled vocabulary instead of the CSVs.
+    The DataFrame holds its own copy of the levels (one byte per word) and the decoded
+    glosses; the mapped file is only read while building it. Rebuilt after a reload.
+    """
+    import pandas as pd
+
     global _hsk_cache
-    if _hsk_cache is None:
-        _hsk_cache = load_hsk_data()
-    return _hsk_cache
+    store = get_vocabulary_store()
+    cached = _hsk_cache
+    if cached is not None and cached[0] is store:
+        return cached[1]
+
+    if store is None:
+        hsk_df = pd.DataFrame()
+    else:
+        glosses = [store.gloss(i) for i in range(len(store))]
+        hsk_df = pd.DataFrame(
+            {
+                'level': store.levels(),
+                'pinyin': [pinyin for pinyin, _ in glosses],
+                'meaning': [meaning for _, meaning in glosses],
+            },
+            index=pd.Index(store.words(), name='word'),
+        )
+    # Paired with its store, so a swap is never answered with the old table
+    _hsk_cache = (store, hsk_df)
+    return hsk_df
 
 def get_word_level(word: str) -> int:
     """
     Look up valid HSK words. Returns level (1-6) or 0 if not found.
-    (This function is mainly for testing/individual lookup, but vectorization is preferred)
+    Binary search directly in the mapped vocabulary; no DataFrame is built.
     """
-    df = get_hsk_dataframe()
-    if word in df.index:
-        return int(df.at[word, 'level'])
-    return 0
+    store = get_vocabulary_store()
+    if store is None:
+        return 0
+    return store.level(word)
@@ -1,18 +1,202 @@
-import requests
+import asyncio
+import codecs
+import time
+import httpx
 import trafilatura
-import re
-from typing import Optional, Dict, Any
+from trafilatura.utils import decode_file, load_html
+from typing import Optional, Dict, Any, FrozenSet, Tuple
+from urllib.parse import urlsplit
+from app.core import config
+
+# Extraction profiles, passed straight to trafilatura.bare_extraction.
+#   fast:      main extractor only, no readability/justext fallbacks
+#   balanced:  trafilatura defaults (fallbacks on)
+#   precision: fallbacks on, and drop borderline boilerplate
+EXTRACTION_PROFILES = {
+    "fast": {"no_fallback": True},
+    "balanced": {"no_fallback": False},
+    "precision": {"no_fallback": False, "favor_precision": True},
+}
+
+# Metadata fields copied from the extraction result
+METADATA_FIELDS = ("author", "date", "sitename", "hostname", "description", "language", "categories", "tags")
+
+# Content types extracted as pages; a response without a Content-Type is let through
+HTML_TYPES = frozenset({"text/html", "application/xhtml+xml"})
+
+# Declared charsets that are too often a server default to trust over byte-level detection
+UNTRUSTED_CHARSETS = frozenset({"ascii", "latin-1", "iso8859-1", "cp1252"})
+
+class DownloadError(Exception):
+    """
+    A response refused before or while reading its body. `code` is one of
+    "too_large" or "unsupported_content_type" and is reported as the result's error_code.
+    """
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+
+def check_headers(response: httpx.Response, max_bytes: int, content_types: Optional[FrozenSet[str]]):
+    """Rejects a response on its headers alone: declared size over the cap, or a content type we can't use."""
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit() and int(length) > max_bytes:
+        raise DownloadError("too_large", f"Response too large ({int(length)} bytes, limit {max_bytes}).")
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if content_types is not None and content_type and content_type not in content_types:
+        raise DownloadError("unsupported_content_type", f"Unsupported content type {content_type}.")
+
+def decode_body(body: bytes, response: httpx.Response) -> str:
+    """
+    Decodes a page with the charset its Content-Type declares, if that charset exists and
+    the body really is in it; otherwise with trafilatura's detection (as fetch_url does).
+    """
+    charset = response.charset_encoding
+    if charset:
+        try:
+            name = codecs.lookup(charset).name
+        except LookupError:
+            name = None
+        if name and name not in UNTRUSTED_CHARSETS:
+            try:
+                return body.decode(name)
+            except UnicodeDecodeError:
+                pass
+    return decode_file(body)
 
 class WebScraper:
-    def __init__(self, timeout: int = 10):
+    def __init__(self, timeout: int = 10, max_connections: int = 100,
+                 max_connections_per_host: int = 6,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 profile: Optional[str] = None, max_bytes: Optional[int] = None):
+        # Total deadline (seconds) for one fetch: waiting for a host slot, connect, and full read.
         self.timeout = timeout
+        # Bodies are streamed and abandoned past this many (decompressed) bytes
+        self.max_bytes = config.SCRAPER_MAX_BYTES if max_bytes is None else max_bytes
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        self.profile = profile or config.EXTRACTION_PROFILE
+        if self.profile not in EXTRACTION_PROFILES:
+            raise ValueError(f"Unknown extraction profile {self.profile!r}, expected one of {sorted(EXTRACTION_PROFILES)}")
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled client; connections are kept alive and reused across requests."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                follow_redirects=True,
+                transport=self._transport,
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        """Per-host connection limit, so one slow origin can't take the whole pool."""
+        host = urlsplit(url).netloc.lower()
+        slot = self._host_slots.get(host)
+        if slot is None:
+            if len(self._host_slots) >= 1024:
+                # Forget hosts that aren't saturated right now. Worst case a pruned
+                # host briefly gets a few extra connections, never an unbounded number.
+                self._host_slots = {h: s for h, s in self._host_slots.items() if s.locked()}
+            slot = asyncio.Semaphore(self.max_connections_per_host)
+            self._host_slots[host] = slot
+        return slot
+
+    async def fetch(self, url: str) -> Optional[str]:
+        """
+        Downloads a page without blocking the event loop.
+
+        Returns:
+            The decoded HTML, or None on a non-200 response.
+
+        Raises:
+            TimeoutError: the total deadline was exceeded.
+            httpx.HTTPError: network-level failures.
+        """
+        response, body = await self._get(url)
+        if response.status_code != 200:
+            return None
+        return decode_body(body, response)
+
+    async def fetch_bytes(self, url: str) -> Optional[bytes]:
+        """
+        Like fetch(), but returns the undecoded body (feeds and sitemaps declare their own
+        encoding) and accepts any content type; the size cap still applies.
+        """
+        response, body = await self._get(url, content_types=None)
+        if response.status_code != 200:
+            return None
+        return body
+
+    async def _get(self, url: str, headers: Optional[Dict[str, str]] = None,
+                   content_types: Optional[FrozenSet[str]] = HTML_TYPES) -> Tuple[httpx.Response, bytes]:
+        """
+        Streaming GET on the shared client, bounded by the per-host limit and the total deadline.
+        Headers are checked before the body is read, and reading stops at `max_bytes` (counted
+        after decompression, so a small gzip bomb is cut off too).
+
+        Returns:
+            The response and its body (empty unless the status is 200).
+
+        Raises:
+            DownloadError: refused on its headers or its size.
+            TimeoutError: the total deadline was exceeded.
+        """
+        async with asyncio.timeout(self.timeout):
+            async with self._host_slot(url):
+                async with self.client.stream("GET", url, headers=headers) as response:
+                    if response.status_code != 200:
+                        return response, b""
+                    check_headers(response, self.max_bytes, content_types)
+                    body = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        body += chunk
+                        if len(body) > self.max_bytes:
+                            raise DownloadError("too_large", f"Response larger than {self.max_bytes} bytes.")
+                    return response, bytes(body)
+
+    def _download_sync(self, url: str) -> Optional[str]:
+        """
+        Blocking counterpart of fetch() for fetch_and_extract, with the same checks and size
+        cap. The deadline is checked between chunks, so one stalled read can add up to
+        `timeout` on top of it.
+        """
+        deadline = time.monotonic() + self.timeout
+        with httpx.Client(headers=self.headers, timeout=httpx.Timeout(self.timeout), follow_redirects=True) as client:
+            with client.stream("GET", url) as response:
+                if response.status_code != 200:
+                    return None
+                check_headers(response, self.max_bytes, HTML_TYPES)
+                body = bytearray()
+                for chunk in response.iter_bytes():
+                    body += chunk
+                    if len(body) > self.max_bytes:
+                        raise DownloadError("too_large", f"Response larger than {self.max_bytes} bytes.")
+                    if time.monotonic() > deadline:
+                        raise TimeoutError()
+                return decode_body(bytes(body), response)
 
     def fetch_and_extract(self, url: str) -> Dict[str, Any]:
         """
         Fetches a URL and extracts the main text content, title, and metadata.
+        Blocking version, for scripts; the API uses fetch_and_extract_async.
         
         Args:
             url (str): The URL to scrape.
@@ -22,61 +206,147 @@ class WebScraper:
                 "content": str (Cleaned main text),
                 "title": str (Page title),
                 "url": str,
-                "error": str (Optional error message)
+                "error": str (Optional error message),
+                "metadata": dict (author, date, sitename, ...),
+                "timings": dict (fetch_ms, parse_ms, extract_ms)
             }
         """
-        result = {
-            "content": "",
-            "title": "",
-            "url": url,
-            "error": None
-        }
+        result = self._empty_result(url)
         
         try:
             # 1. Fetch
-            downloaded = trafilatura.fetch_url(url)
+            start = time.perf_counter()
+            downloaded = self._download_sync(url)
+            result["timings"]["fetch_ms"] = (time.perf_counter() - start) * 1000
             
             if downloaded is None:
-                # trafilatura fetch failed (maybe 404 or network), try requests manually as backup
-                # or just report error. trafilatura.fetch_url uses requests under the hood usually.
-                # Let's try explicit requests for better error control if needed, 
-                # but trafilatura.fetch_url is robust.
                 result["error"] = "Failed to download content."
+                result["error_code"] = "download_failed"
                 return result
 
-            # 2. Extract
-            # include_comments=False, include_tables=False for cleaner text
-            content = trafilatura.extract(downloaded, include_comments=False, include_tables=False, no_fallback=False)
+            self._extract(downloaded, result)
             
-            if not content:
-                result["error"] = "No main content found."
+        except DownloadError as e:
+            result["error"] = str(e)
+            result["error_code"] = e.code
+        except TimeoutError:
+            result["error"] = f"Timed out after {self.timeout}s."
+            result["error_code"] = "timeout"
+        except Exception as e:
+            result["error"] = str(e)
+            
+        return result
+
+    async def fetch_and_extract_async(self, url: str, etag: Optional[str] = None,
+                                      last_modified: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Async version of fetch_and_extract: the download runs on the shared pooled client
+        and extraction runs in a thread, so neither blocks the event loop.
+
+        Passing the `etag` / `last_modified` of a previous response makes the request
+        conditional. On a 304 the result has "not_modified" set and nothing is extracted.
+        """
+        result = self._empty_result(url)
+
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        try:
+            start = time.perf_counter()
+            response, body = await self._get(url, headers=headers or None)
+            result["timings"]["fetch_ms"] = (time.perf_counter() - start) * 1000
+
+            if response.status_code == 304 and headers:
+                result["not_modified"] = True
                 return result
 
-            # 3. Metadata (Title etc)
-            # trafilatura.extract usually returns just text.
-            # To get metadata, we might need bare_extraction
-            metadata = trafilatura.bare_extraction(downloaded)
-            
-            if metadata:
-                # metadata is a Document object (or dict depending on version, but error said Document)
-                # It usually acts as a dict in older versions but error implies object.
-                # Let's try attribute access or generic check.
-                # Safer: check if it has .get, if not assume attribute.
-                if hasattr(metadata, 'get'):
-                    result["title"] = metadata.get('title') or ""
-                else:
-                    # Assume object with attributes
-                    result["title"] = getattr(metadata, 'title', "") or ""
-            
-            # Fallback: Regex for title if missing
-            if not result["title"]:
-                title_match = re.search(r'<title>(.*?)</title>', downloaded, re.IGNORECASE | re.DOTALL)
-                if title_match:
-                    result["title"] = title_match.group(1).strip()
+            if response.status_code != 200:
+                result["error"] = "Failed to download content."
+                result["error_code"] = "download_failed"
+                return result
 
-            result["content"] = content
-            
-        except Exception as e:
+            result["bytes"] = len(body)
+            result["etag"] = response.headers.get('ETag')
+            result["last_modified"] = response.headers.get('Last-Modified')
+            downloaded = decode_body(body, response)
+
+            await asyncio.to_thread(self._extract, downloaded, result)
+
+        except DownloadError as e:
             result["error"] = str(e)
-            
+            result["error_code"] = e.code
+        except TimeoutError:
+            result["error"] = f"Timed out after {self.timeout}s."
+            result["error_code"] = "timeout"
+        except Exception as e:
+            result["error"] = str(e) or type(e).__name__
+
+        return result
+
+    @staticmethod
+    def _empty_result(url: str) -> Dict[str, Any]:
+        return {
+            "content": "",
+            "title": "",
+            "url": url,
+            "error": None,
+            # Machine-readable reason for some errors: "download_failed", "timeout",
+            # "too_large", "unsupported_content_type"
+            "error_code": None,
+            "metadata": {},
+            # HTTP validators of the response, for conditional revalidation
+            "etag": None,
+            "last_modified": None,
+            "not_modified": False,
+            # Size of the downloaded body
+            "bytes": 0,
+            # Per-stage wall time in milliseconds: fetch_ms, parse_ms, extract_ms
+            "timings": {},
+        }
+
+    def _extract(self, downloaded: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fills `result` with the main text, title and metadata of an already downloaded page.
+        The HTML is parsed once; text and metadata come out of the same bare_extraction call.
+        """
+        timings = result.setdefault("timings", {})
+
+        # 2. Parse
+        start = time.perf_counter()
+        tree = load_html(downloaded)
+        timings["parse_ms"] = (time.perf_counter() - start) * 1000
+        if tree is None:
+            result["error"] = "No main content found."
+            return result
+
+        # Read <title> before extraction; trafilatura prunes the tree while extracting.
+        page_title = (tree.findtext('.//title') or "").strip()
+
+        # 3. Extract text + metadata in one pass
+        # include_comments=False, include_tables=False for cleaner text
+        start = time.perf_counter()
+        document = trafilatura.bare_extraction(
+            tree,
+            include_comments=False,
+            include_tables=False,
+            with_metadata=True,
+            **EXTRACTION_PROFILES[self.profile],
+        )
+        timings["extract_ms"] = (time.perf_counter() - start) * 1000
+
+        if document and not hasattr(document, 'get'):
+            # Some trafilatura versions return a Document object instead of a dict
+            document = vars(document)
+
+        content = document.get('text') if document else None
+        if not content:
+            result["error"] = "No main content found."
+            return result
+
+        result["content"] = content
+        result["title"] = page_title or document.get('title') or ""
+        result["metadata"] = {key: document.get(key) for key in METADATA_FIELDS}
         return result
@@ -0,0 +1,37 @@
+import fcntl
+import os
+import sqlite3
+from contextlib import contextmanager
+
+def open_database(path: str, schema: str) -> sqlite3.Connection:
+    """
+    Opens (and creates if needed) a local SQLite file shared by every worker on the host.
+
+    WAL lets readers in other processes proceed while one process writes, and
+    synchronous=NORMAL skips the fsync per commit; these files hold derived data
+    that can always be rebuilt, so losing the last few writes on power loss is fine.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(schema)
+    return db
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Exclusive lock shared by every process on the host (flock on `path`, created if
+    needed), for work that only one worker should do at a time. Blocks until it is free.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
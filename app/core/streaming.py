@@ -0,0 +1,86 @@
+import codecs
+from typing import Any, Dict, List, Optional
+
+from app.core import metrics
+from app.core.boundaries import cut_position
+
+class StreamingAnalysis:
+    """
+    Incremental TextAnalyzer.analyze over text that arrives in pieces.
+
+    Text is buffered until `segment_chars` are pending, cut at the last sentence
+    boundary (see app/core/boundaries.py) and segmented; only per-level counts and
+    the set of distinct words are kept, so memory does not grow with document length.
+    `result()` after `close()` equals `analyzer.analyze(whole_text)`.
+    """
+
+    def __init__(self, analyzer, segment_chars: int = 64 * 1024, max_pending_chars: int = 4 * 1024 * 1024,
+                 segmenter: Optional[str] = None):
+        self.analyzer = analyzer
+        # The whole upload is analyzed with the data loaded when it started
+        self.state = analyzer.state
+        self.segmenter = self.state.segmenter(segmenter)
+        self.segment_chars = segment_chars
+        self.max_pending_chars = max_pending_chars
+        self.counts: List[int] = [0] * 7
+        self.char_counts: List[int] = [0] * 7
+        self.unique = set()
+        self.bytes_received = 0
+        self.chars_processed = 0
+        self._pending = ""
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def feed_bytes(self, data: bytes) -> int:
+        """Feeds raw UTF-8 (multi-byte characters may straddle chunks). Returns the number of chars segmented."""
+        self.bytes_received += len(data)
+        return self.feed(self._decoder.decode(data))
+
+    def feed(self, text: str) -> int:
+        """Feeds decoded text. Returns the number of chars segmented by this call (0 if still buffering)."""
+        self._pending += text
+        if len(self._pending) < self.segment_chars:
+            return 0
+
+        cut = cut_position(self._pending)
+        if cut == 0:
+            if len(self._pending) < self.max_pending_chars:
+                return 0
+            # One unbroken run of han characters longer than max_pending_chars;
+            # cutting inside it may shift a token or two at this boundary.
+            cut = len(self._pending)
+
+        head, self._pending = self._pending[:cut], self._pending[cut:]
+        self._segment(head)
+        return len(head)
+
+    def close(self) -> int:
+        """Segments whatever is still buffered. Returns the number of chars segmented."""
+        tail = self._pending + self._decoder.decode(b"", final=True)
+        self._pending = ""
+        if tail:
+            self._segment(tail)
+        return len(tail)
+
+    def _segment(self, text: str):
+        with metrics.stage("segment"):
+            counts, unique = self.state.vocabulary.count_levels(self.segmenter.cut(text))
+        char_counts = self.state.vocabulary.count_characters(text)
+        for level in range(7):
+            self.counts[level] += counts[level]
+            self.char_counts[level] += char_counts[level]
+        self.unique |= unique
+        self.chars_processed += len(text)
+
+    def result(self) -> Dict[str, Any]:
+        """analyze()-shaped result for everything segmented so far."""
+        return self.analyzer.result_from_counts(self.counts, len(self.unique), self.state.version,
+                                             self.char_counts)
+
+    def progress(self) -> Dict[str, Any]:
+        record = {
+            "type": "progress",
+            "bytes_received": self.bytes_received,
+            "chars_processed": self.chars_processed,
+        }
+        record.update(self.result())
+        return record
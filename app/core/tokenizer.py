@@ -0,0 +1,176 @@
+import hashlib
+import logging
+import marshal
+import os
+import tempfile
+from typing import Callable, Iterable, Iterator, Optional, Set, Tuple
+
+import jieba
+from jieba import finalseg
+from jieba._compat import strdecode
+
+from app.core import config
+
+logger = logging.getLogger(__name__)
+
+# "Sticky words": pairs jieba's default corpus glues together even when both
+# halves are HSK words. "这是" (This is) often wins against "这" + "是", so the
+# split is forced.
+FORCED_SPLITS: Tuple[Tuple[str, ...], ...] = (
+    ('这', '是'),
+)
+
+class HSKTokenizer(jieba.Tokenizer):
+    """
+    jieba.Tokenizer whose forced splits stay its own.
+
+    jieba registers a word added with frequency 0 (what suggest_freq(..., True) does for
+    FORCED_SPLITS) in `jieba.finalseg`, a module global: the HMM would then split that
+    word for every jieba user in the process. Here such words go to `force_split`, and
+    only this tokenizer's HMM pass splits them.
+    """
+
+    def __init__(self, dictionary=jieba.DEFAULT_DICT):
+        super().__init__(dictionary)
+        self.force_split: Set[str] = set()
+
+    def add_word(self, word, freq=None, tag=None):
+        # jieba.Tokenizer.add_word without the finalseg.add_force_split call
+        self.check_initialized()
+        word = strdecode(word)
+        freq = int(freq) if freq is not None else self.suggest_freq(word, False)
+        self.FREQ[word] = freq
+        self.total += freq
+        if tag:
+            self.user_word_tag_tab[word] = tag
+        for end in range(1, len(word) + 1):
+            self.FREQ.setdefault(word[:end], 0)
+        if freq == 0:
+            self.force_split.add(word)
+
+    def _hmm_cut(self, text: str) -> Iterator[str]:
+        for word in finalseg.cut(text):
+            if word in self.force_split:
+                yield from word
+            else:
+                yield word
+
+    def _Tokenizer__cut_DAG(self, sentence):
+        # jieba.Tokenizer.__cut_DAG (the HMM=True path of cut()), with unknown runs
+        # segmented by _hmm_cut instead of finalseg.cut
+        DAG = self.get_DAG(sentence)
+        route = {}
+        self.calc(sentence, DAG, route)
+        x = 0
+        buf = ''
+        N = len(sentence)
+        while x < N:
+            y = route[x][1] + 1
+            l_word = sentence[x:y]
+            if y - x == 1:
+                buf += l_word
+            else:
+                if buf:
+                    yield from self._cut_buffer(buf)
+                    buf = ''
+                yield l_word
+            x = y
+        if buf:
+            yield from self._cut_buffer(buf)
+
+    def _cut_buffer(self, buf: str) -> Iterator[str]:
+        """A run of single characters the dictionary route left: HMM for unknown runs."""
+        if len(buf) == 1:
+            yield buf
+        elif not self.FREQ.get(buf):
+            yield from self._hmm_cut(buf)
+        else:
+            yield from buf
+
+def tune_tokenizer(tokenizer: jieba.Tokenizer, words: Iterable[str]):
+    """
+    Syncs HSK vocabulary with a jieba dictionary.
+    This provides a 'nudge' to the probabilistic tokenizer to prefer our known words.
+    Each add_word frequency depends on the words added before it, so pass the words
+    in a stable order (reference_loader.get_hsk_words keeps the CSV order).
+    """
+    # 1. Boost frequency of all HSK words
+    # We don't specify freq, let Jieba calculate a high default or use existing
+    for word in words:
+        tokenizer.add_word(word)
+
+    # 2. Handle specific "Sticky Words"
+    for segments in FORCED_SPLITS:
+        tokenizer.suggest_freq(segments, True)
+
+def snapshot_fingerprint(vocabulary_version: str) -> str:
+    """Identifies everything a snapshot depends on: jieba's base dictionary, the HSK words and the forced splits."""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(jieba.__version__.encode())
+    digest.update(vocabulary_version.encode())
+    digest.update(repr(FORCED_SPLITS).encode("utf-8"))
+    return digest.hexdigest()
+
+def build_tokenizer(words: Iterable[str]) -> jieba.Tokenizer:
+    """Builds a tuned tokenizer from scratch: jieba base dictionary + HSK words + forced splits."""
+    tokenizer = HSKTokenizer()
+    tokenizer.initialize()
+    tune_tokenizer(tokenizer, words)
+    return tokenizer
+
+def save_snapshot(tokenizer: jieba.Tokenizer, fingerprint: str, path: Optional[str] = None):
+    """Writes the merged prefix dictionary atomically, in jieba's own (marshal) cache format."""
+    path = path or config.TOKENIZER_SNAPSHOT
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            marshal.dump((fingerprint, tokenizer.FREQ, tokenizer.total), f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def load_snapshot(fingerprint: str, path: Optional[str] = None) -> Optional[jieba.Tokenizer]:
+    """Returns a ready tokenizer from the snapshot, or None when it is missing or stale."""
+    path = path or config.TOKENIZER_SNAPSHOT
+    try:
+        # One read + loads(); marshal.load() on a file object is several times slower
+        with open(path, "rb") as f:
+            stored_fingerprint, freq, total = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if stored_fingerprint != fingerprint:
+        return None
+
+    tokenizer = HSKTokenizer()
+    tokenizer.FREQ = freq
+    tokenizer.total = total
+    tokenizer.initialized = True
+    # suggest_freq(..., True) also marks the joined word for the HMM to split; that
+    # isn't part of the dictionary, so redo it.
+    for segments in FORCED_SPLITS:
+        tokenizer.force_split.add("".join(segments))
+    return tokenizer
+
+def get_tokenizer(load_words: Callable[[], Iterable[str]], vocabulary_version: str,
+                  path: Optional[str] = None) -> jieba.Tokenizer:
+    """
+    Dedicated (non-global) jieba tokenizer with the HSK tuning applied.
+    Loads the prebuilt snapshot when it matches the current data; otherwise builds
+    the dictionary and saves a snapshot so the next process starts fast.
+    `load_words` is only called when a build is needed.
+    """
+    fingerprint = snapshot_fingerprint(vocabulary_version)
+    tokenizer = load_snapshot(fingerprint, path)
+    if tokenizer is not None:
+        return tokenizer
+
+    logger.info("Tokenizer snapshot missing or stale, building it (run scripts/build_dictionary.py at deploy time)")
+    tokenizer = build_tokenizer(load_words())
+    try:
+        save_snapshot(tokenizer, fingerprint, path)
+    except OSError as e:
+        logger.warning("Could not save tokenizer snapshot: %s", e)
+    return tokenizer
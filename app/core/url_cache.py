@@ -0,0 +1,194 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from app.core import config
+from app.core.storage import open_database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    analysis TEXT NOT NULL,
+    content TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    validated_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access);
+"""
+
+def normalize_url(url: str) -> str:
+    """Cache key for a URL: scheme and host lowercased, fragment dropped."""
+    parts = urlsplit(url.strip())
+    path = parts.path or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+class UrlCache:
+    """
+    Persistent cache of URL analyses: extracted page content plus the AnalysisResult,
+    with the ETag / Last-Modified validators of the response they came from.
+
+    Two tiers: a small in-process LRU of analyses (a repeat hit never touches disk),
+    in front of a SQLite file shared by every worker on the host. The disk tier is
+    bounded by total bytes and evicts least recently used entries. Every method may
+    wait on another worker's write; call them off the event loop.
+
+    Entries are plain dicts:
+        {"url", "analysis", "etag", "last_modified", "validated_at"}
+    """
+
+    # Disk last_access is only rewritten when older than this, so hot entries
+    # don't turn every read into a write.
+    ACCESS_RESOLUTION = 60
+    # Summing the sizes is a table scan: it is done every this many writes, or sooner when
+    # this process's own writes since then may have crossed max_bytes
+    EVICT_EVERY = 100
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[int] = None,
+                 max_bytes: Optional[int] = None, memory_entries: Optional[int] = None,
+                 clock=time.time):
+        self.path = path or os.path.join(config.CACHE_DIR, "url_cache.sqlite3")
+        self.ttl = config.URL_CACHE_TTL if ttl is None else ttl
+        self.max_bytes = config.URL_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.memory_entries = config.URL_CACHE_MEMORY_ENTRIES if memory_entries is None else memory_entries
+        self.clock = clock
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "evictions": 0}
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        # Total size as of the last check, plus what this process stored since
+        self._bytes: Optional[int] = None
+        self._writes_since_evict = 0
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = open_database(self.path, SCHEMA)
+        return self._db
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return self.clock() - entry["validated_at"] < self.ttl
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached entry (fresh or stale), or None. Use is_fresh() to decide on revalidation."""
+        key = normalize_url(url)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry
+
+            row = self.db.execute(
+                "SELECT analysis, etag, last_modified, validated_at, last_access FROM pages WHERE url = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+
+            analysis, etag, last_modified, validated_at, last_access = row
+            now = self.clock()
+            if now - last_access > self.ACCESS_RESOLUTION:
+                self.db.execute("UPDATE pages SET last_access = ? WHERE url = ?", (now, key))
+
+            entry = {
+                "url": key,
+                "analysis": json.loads(analysis),
+                "etag": etag,
+                "last_modified": last_modified,
+                "validated_at": validated_at,
+            }
+            self._remember(key, entry)
+            self.stats["hits"] += 1
+            return entry
+
+    def get_content(self, url: str) -> Optional[Dict[str, Any]]:
+        """Extracted page ({"content", "title", "metadata"}) of a cached URL, or None."""
+        with self._lock:
+            row = self.db.execute("SELECT content FROM pages WHERE url = ?", (normalize_url(url),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, url: str, scrape_result: Dict[str, Any], analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Stores a freshly fetched page and its analysis, then evicts down to max_bytes."""
+        key = normalize_url(url)
+        now = self.clock()
+        analysis_json = json.dumps(analysis, ensure_ascii=False)
+        content_json = json.dumps({
+            "content": scrape_result.get("content", ""),
+            "title": scrape_result.get("title", ""),
+            "metadata": scrape_result.get("metadata", {}),
+        }, ensure_ascii=False)
+        size = len(analysis_json.encode("utf-8")) + len(content_json.encode("utf-8"))
+        entry = {
+            "url": key,
+            "analysis": analysis,
+            "etag": scrape_result.get("etag"),
+            "last_modified": scrape_result.get("last_modified"),
+            "validated_at": now,
+        }
+
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, analysis_json, content_json, entry["etag"], entry["last_modified"], now, now, size),
+            )
+            self._remember(key, entry)
+            self._writes_since_evict += 1
+            if self._bytes is not None:
+                self._bytes += size
+            if (self._bytes is None or self._bytes > self.max_bytes
+                    or self._writes_since_evict >= self.EVICT_EVERY):
+                self._writes_since_evict = 0
+                self._evict()
+        return entry
+
+    def touch(self, url: str) -> Optional[Dict[str, Any]]:
+        """Marks a cached entry as revalidated (the origin answered 304 Not Modified)."""
+        key = normalize_url(url)
+        now = self.clock()
+        with self._lock:
+            self.db.execute("UPDATE pages SET validated_at = ?, last_access = ? WHERE url = ?", (now, now, key))
+            entry = self._memory.get(key)
+            if entry is not None:
+                entry["validated_at"] = now
+            self.stats["revalidated"] += 1
+        return entry
+
+    def _remember(self, key: str, entry: Dict[str, Any]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        excess = total - self.max_bytes
+        if excess > 0:
+            # Least recently used pages until `excess` bytes are freed: those whose running
+            # total falls short of it, plus the one that reaches it
+            count = self.db.execute(
+                "SELECT COUNT(*) + 1 FROM (SELECT SUM(size) OVER (ORDER BY last_access, url) AS freed "
+                "FROM pages) WHERE freed < ?", (excess,)
+            ).fetchone()[0]
+            lru = "SELECT url FROM pages ORDER BY last_access, url LIMIT ?"
+            for key, size in self.db.execute(
+                    f"SELECT url, size FROM pages WHERE url IN ({lru})", (count,)).fetchall():
+                self._memory.pop(key, None)
+                total -= size
+            evicted = self.db.execute(f"DELETE FROM pages WHERE url IN ({lru})", (count,)).rowcount
+            self.stats["evictions"] += max(evicted, 0)
+        self._bytes = total
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
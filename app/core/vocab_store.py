@@ -0,0 +1,216 @@
+import csv
+import hashlib
+import mmap
+import os
+import pathlib
+import struct
+import tempfile
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Compiled HSK vocabulary, laid out so it can be memory-mapped and queried in place.
+# Every worker maps the same file, so the OS keeps a single page-cache copy.
+#
+#   header        see HEADER
+#   word_offsets  uint32[count + 1]      byte offsets into the words blob
+#   gloss_offsets uint32[2 * count + 1]  pinyin_i, meaning_i offsets into the gloss blob
+#   levels        uint8[count]           (padded to 4 bytes)
+#   words blob    UTF-8 words, sorted bytewise (binary-searchable)
+#   gloss blob    UTF-8 pinyin and meaning strings, never touched on the hot path
+#
+# All integers are little-endian.
+
+MAGIC = b"HSKV"
+FORMAT_VERSION = 1
+# magic, format version, count, words blob start, gloss blob start, source fingerprint, vocabulary version
+HEADER = struct.Struct("<4sIIII16s16s")
+
+Entry = Tuple[str, int, str, str]  # word, level, pinyin, meaning
+
+def read_hsk_csvs(directory: pathlib.Path) -> List[Entry]:
+    """
+    Reads hsk1.csv .. hsk6.csv (columns word,pinyin,meaning). A word listed in several
+    levels keeps the first (lowest) one, same as `reference_loader.load_hsk_data`.
+    """
+    entries: List[Entry] = []
+    seen = set()
+    for level in range(1, 7):
+        file_path = directory / f"hsk{level}.csv"
+        if not file_path.exists():
+            continue
+        with open(file_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                word = row.get("word")
+                if not word or word in seen:
+                    continue
+                seen.add(word)
+                entries.append((word, level, row.get("pinyin") or "", row.get("meaning") or ""))
+    return entries
+
+def source_fingerprint(directory: pathlib.Path) -> bytes:
+    """Hash of the CSV sources; an artifact built from different CSVs is stale."""
+    digest = hashlib.blake2b(digest_size=16)
+    for level in range(1, 7):
+        file_path = directory / f"hsk{level}.csv"
+        if file_path.exists():
+            digest.update(f"hsk{level}.csv\0".encode())
+            digest.update(file_path.read_bytes())
+    return digest.digest()
+
+def vocabulary_fingerprint(entries) -> str:
+    """Same value as `VocabularyIndex.version`: hash of the sorted word -> level table."""
+    digest = hashlib.blake2b(digest_size=8)
+    for word, level in sorted((entry[0], entry[1]) for entry in entries):
+        digest.update(f"{word}\t{level}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+def build_artifact(directory: pathlib.Path, path: str) -> int:
+    """Compiles the CSVs in `directory` into the binary format at `path` (atomic replace). Returns the word count."""
+    entries = sorted(read_hsk_csvs(directory), key=lambda entry: entry[0].encode("utf-8"))
+    count = len(entries)
+
+    words = bytearray()
+    word_offsets = [0]
+    gloss = bytearray()
+    gloss_offsets = [0]
+    for word, _, pinyin, meaning in entries:
+        words += word.encode("utf-8")
+        word_offsets.append(len(words))
+        gloss += pinyin.encode("utf-8")
+        gloss_offsets.append(len(gloss))
+        gloss += meaning.encode("utf-8")
+        gloss_offsets.append(len(gloss))
+    levels = bytes(entry[1] for entry in entries)
+    levels += b"\0" * (-len(levels) % 4)
+
+    tables = (
+        struct.pack(f"<{count + 1}I", *word_offsets)
+        + struct.pack(f"<{2 * count + 1}I", *gloss_offsets)
+        + levels
+    )
+    words_start = HEADER.size + len(tables)
+    gloss_start = words_start + len(words)
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, count, words_start, gloss_start,
+        source_fingerprint(directory), vocabulary_fingerprint(entries).encode("ascii"),
+    )
+
+    target_dir = os.path.dirname(path) or "."
+    os.makedirs(target_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=target_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(tables)
+            f.write(words)
+            f.write(gloss)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return count
+
+class VocabularyStore:
+    """
+    Read-only view over a compiled vocabulary file.
+
+    Offsets and levels are memoryviews straight into the mapping, so lookups
+    copy nothing but the few bytes of each compared word.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, fmt, count, words_start, gloss_start, source, version = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a compiled HSK vocabulary (format {FORMAT_VERSION})")
+
+        self.count = count
+        self.source_fingerprint: bytes = source
+        self.version: str = version.decode("ascii")
+        self._words_start = words_start
+        self._gloss_start = gloss_start
+
+        view = memoryview(self._mm)
+        pos = HEADER.size
+        self._word_offsets = view[pos:pos + 4 * (count + 1)].cast("I")
+        pos += 4 * (count + 1)
+        self._gloss_offsets = view[pos:pos + 4 * (2 * count + 1)].cast("I")
+        pos += 4 * (2 * count + 1)
+        self._levels = view[pos:pos + count]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _word_bytes(self, i: int) -> bytes:
+        start = self._words_start + self._word_offsets[i]
+        return self._mm[start:self._words_start + self._word_offsets[i + 1]]
+
+    def word(self, i: int) -> str:
+        return self._word_bytes(i).decode("utf-8")
+
+    def find(self, word: str) -> int:
+        """Index of `word`, or -1. Binary search over the sorted words blob."""
+        key = word.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._word_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._word_bytes(lo) == key:
+            return lo
+        return -1
+
+    def level(self, word: str) -> int:
+        """HSK level (1-6) of `word`, or 0 if it isn't in the vocabulary."""
+        i = self.find(word)
+        return self._levels[i] if i >= 0 else 0
+
+    def gloss(self, i: int) -> Tuple[str, str]:
+        """(pinyin, meaning) of entry i, decoded on demand from the gloss blob."""
+        base = self._gloss_start
+        start, middle, end = self._gloss_offsets[2 * i], self._gloss_offsets[2 * i + 1], self._gloss_offsets[2 * i + 2]
+        return (
+            self._mm[base + start:base + middle].decode("utf-8"),
+            self._mm[base + middle:base + end].decode("utf-8"),
+        )
+
+    def words(self) -> List[str]:
+        return [self.word(i) for i in range(self.count)]
+
+    def levels(self) -> np.ndarray:
+        """Levels as a read-only uint8 array backed by the mapping (no copy)."""
+        return np.frombuffer(self._levels, dtype=np.uint8)
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        for i in range(self.count):
+            yield self.word(i), self._levels[i]
+
+def open_store(directory: pathlib.Path, path: str) -> Optional[VocabularyStore]:
+    """
+    Opens the compiled vocabulary at `path`, (re)building it from the CSVs when it is
+    missing or was built from different CSVs. Returns None if there is no source data.
+    """
+    fingerprint = source_fingerprint(directory)
+    try:
+        store = VocabularyStore(path)
+        if store.source_fingerprint == fingerprint:
+            return store
+    except (OSError, ValueError, struct.error):
+        pass
+
+    try:
+        count = build_artifact(directory, path)
+    except OSError:
+        # Read-only deployment without a prebuilt artifact: build a private copy
+        path = os.path.join(tempfile.gettempdir(), f"hsk_vocab_{fingerprint.hex()}.bin")
+        count = build_artifact(directory, path)
+    if count == 0:
+        return None
+    return VocabularyStore(path)
@@ -0,0 +1,141 @@
+import hashlib
+import re
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.core.vocab_store import VocabularyStore
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# A token counts as a "word" when, once stripped, it consists only of word
+# characters (letters, digits, CJK ideographs, underscore). Same rule as the
+# original `str.strip().str.match(r'^[^\s\W]+$')` pandas filter.
+_WORD_RE = re.compile(r'[^\s\W]+')
+
+PUNCTUATION = -1
+UNKNOWN_LEVEL = 0
+MAX_LEVEL = 6
+
+# Code point ranges counted as Chinese characters by the character coverage:
+# CJK Unified Ideographs with Extension A, the compatibility ideographs and the
+# supplementary-plane extensions. Every other character is left out, like punctuation.
+CJK_RANGES = ((0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xF900, 0xFAFF), (0x20000, 0x2FA1F))
+# The lookup table covers code points below this; anything above is not CJK
+CHAR_TABLE_SIZE = 0x2FA20
+
+
+class VocabularyIndex:
+    """
+    Compiled word -> HSK level lookup built once from the reference data.
+
+    Every token is classified into one integer: -1 for punctuation/whitespace,
+    0 for unknown words and 1-6 for HSK levels. Classifications are memoized so
+    repeated tokens (the vast majority of any text) cost a single dict lookup.
+    """
+
+    # Upper bound for memoized non-HSK tokens; user text can contain an
+    # unbounded number of distinct strings (numbers, latin words, names).
+    MAX_EXTRA_TOKENS = 100_000
+
+    def __init__(self, levels: Dict[str, int], version: Optional[str] = None):
+        self.levels = levels
+        self.version = version or self._fingerprint(levels)
+        self._classes: Dict[str, int] = {}
+        self._seed()
+        self.char_levels = self._build_char_table(levels)
+
+    @staticmethod
+    def _fingerprint(levels: Dict[str, int]) -> str:
+        """Content hash of the word -> level table; changes whenever the HSK data does."""
+        digest = hashlib.blake2b(digest_size=8)
+        for word in sorted(levels):
+            digest.update(f"{word}\t{levels[word]}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    @classmethod
+    def from_dataframe(cls, hsk_df: "pd.DataFrame") -> "VocabularyIndex":
+        """Builds the index from the `get_hsk_dataframe()` layout (index=word, column 'level')."""
+        if hsk_df.empty or 'level' not in hsk_df.columns:
+            return cls({})
+        levels = {str(word): int(level) for word, level in zip(hsk_df.index, hsk_df['level'])}
+        return cls(levels)
+
+    @classmethod
+    def from_store(cls, store: Optional["VocabularyStore"]) -> "VocabularyIndex":
+        """Builds the index from the compiled vocabulary; its version is precomputed at build time."""
+        if store is None:
+            return cls({})
+        return cls(dict(store.items()), version=store.version)
+
+    @staticmethod
+    def _build_char_table(levels: Dict[str, int]) -> np.ndarray:
+        """
+        Code point -> class of a single character: -1 outside the CJK ranges, otherwise the
+        lowest HSK level of any word the character appears in (0 if none).
+        """
+        table = np.full(CHAR_TABLE_SIZE + 1, PUNCTUATION, dtype=np.int8)
+        for start, end in CJK_RANGES:
+            table[start:end + 1] = UNKNOWN_LEVEL
+        for word, level in levels.items():
+            for char in word:
+                code = ord(char)
+                if code < CHAR_TABLE_SIZE and table[code] != PUNCTUATION and not 0 < table[code] <= level:
+                    table[code] = level
+        return table
+
+    def count_characters(self, text: str) -> List[int]:
+        """
+        Counts the Chinese characters of `text` per level in one vectorized pass over its
+        UTF-32 code points. counts[0] is characters of no HSK word, counts[1..6] HSK levels.
+        """
+        # surrogatepass: a lone surrogate (valid in JSON) becomes its own code point, which is not CJK
+        codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        classes = self.char_levels[np.minimum(codes, CHAR_TABLE_SIZE)]
+        counts = np.bincount(classes[classes >= 0], minlength=MAX_LEVEL + 1)
+        return counts.tolist()
+
+    def _seed(self):
+        self._classes = {}
+        for word, level in self.levels.items():
+            self._classes[word] = level if _WORD_RE.fullmatch(word.strip()) else PUNCTUATION
+        self._seeded_size = len(self._classes)
+
+    def classify(self, token: str) -> int:
+        """Returns -1 for punctuation, 0 for unknown words, 1-6 for HSK words."""
+        cls = self._classes.get(token)
+        if cls is not None:
+            return cls
+
+        if _WORD_RE.fullmatch(token.strip()):
+            cls = self.levels.get(token, UNKNOWN_LEVEL)
+        else:
+            cls = PUNCTUATION
+
+        if len(self._classes) - self._seeded_size >= self.MAX_EXTRA_TOKENS:
+            self._seed()
+        self._classes[token] = cls
+        return cls
+
+    def count_levels(self, tokens: Iterable[str]) -> Tuple[List[int], Set[str]]:
+        """
+        Counts tokens per level in a single pass.
+
+        Returns:
+            (counts, unique): counts[0] is unknown words, counts[1..6] HSK levels;
+            unique is the set of distinct word tokens (punctuation excluded).
+        """
+        counts = [0] * (MAX_LEVEL + 1)
+        unique: Set[str] = set()
+        classes = self._classes
+        classify = self.classify
+        for token in tokens:
+            cls = classes.get(token)
+            if cls is None:
+                cls = classify(token)
+            if cls < 0:
+                continue
+            counts[cls] += 1
+            unique.add(token)
+        return counts, unique
@@ -1,15 +1,167 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import hmac
+import json
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, List, Optional, Set
+from fastapi import FastAPI, Header, HTTPException, Request, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.requests import ClientDisconnect
+from app.core import config, metrics
+from app.core.analysis_cache import AnalysisCache, content_key
 from app.core.analyzer import TextAnalyzer
-from app.core.scraper import WebScraper
-from app.models.schemas import TextRequest, UrlRequest, AnalysisResult
+from app.core.batch import BatchAnalyzer
+from app.core.coalesce import Coalescer
+from app.core.corpus_index import CorpusIndex
+from app.core.executor import AnalysisExecutor, ExecutorSaturated
+from app.core.jobs import JobRunner, JobStore
+from app.core.known_words import KnownWordStore, known_coverage
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import ProfilingBusy, RequestProfiler
+from app.core.reference_loader import reference_data_signature
+from app.core.segmenters import check_segmenter
+from app.core.streaming import StreamingAnalysis
+from app.core.url_cache import UrlCache, normalize_url
+from app.models.schemas import (
+    TextRequest, UrlRequest, AnalysisResult,
+    BatchTextRequest, BatchItemResult, BatchAnalysisResponse,
+    JobRequest, JobCreated, JobStatus,
+    CorpusQuery, CorpusQueryResult,
+    KnownWordsUpdate, KnownWords, KnownCoverageRequest, KnownCoverageItem, KnownCoverageResponse,
+)
 
-app = FastAPI(title="Hanz Reader Analysis Service")
+if TYPE_CHECKING:
+    from app.core.scraper import WebScraper
 
-# Initialize Analyzer and Scraper
-analyzer = TextAnalyzer()
-scraper = WebScraper()
+# Vocabulary and tokenizer load at startup (lifespan warmup), not at import
+analyzer = TextAnalyzer(cache=AnalysisCache() if config.ANALYSIS_CACHE_ENABLED else None)
+# Created by get_scraper() on the first URL request
+scraper: Optional["WebScraper"] = None
+# get_scraper() also runs in worker threads (profiled requests)
+scraper_lock = threading.Lock()
+url_cache = UrlCache() if config.URL_CACHE_ENABLED else None
+# Worker processes are started lazily, on the first batch request
+batch_analyzer = BatchAnalyzer()
+# Single texts are analyzed here, off the event loop
+analysis_executor = AnalysisExecutor()
+# Concurrent requests for the same page / text share one computation
+url_coalescer = Coalescer()
+text_coalescer = Coalescer()
+# Analyzed documents, searchable by difficulty
+corpus_index = CorpusIndex() if config.CORPUS_INDEX_ENABLED else None
+# Background indexing tasks; referenced here so they aren't garbage collected mid-run
+indexing_tasks = set()
+# Per-user known-word lists
+known_words = KnownWordStore()
+# Opt-in profiles of single requests (?profile=1 with the admin token)
+profiler = RequestProfiler()
+
+metrics.register_stats("analysis_cache", lambda: analyzer.cache.stats if analyzer.cache else None)
+metrics.register_stats("url_cache", lambda: url_cache.stats if url_cache else None)
+metrics.register_stats("analysis_executor", lambda: analysis_executor.stats)
+metrics.register_stats("url_coalescer", lambda: url_coalescer.stats)
+metrics.register_stats("text_coalescer", lambda: text_coalescer.stats)
+
+logger = logging.getLogger(__name__)
+
+def get_scraper() -> "WebScraper":
+    """
+    The shared scraper, created on first use: a worker that only ever analyzes text
+    never imports the scraping stack (trafilatura, lxml, httpx).
+    """
+    global scraper
+    if scraper is None:
+        with scraper_lock:
+            if scraper is None:
+                from app.core.scraper import WebScraper
+                scraper = WebScraper()
+    return scraper
+
+async def reload_reference_data() -> bool:
+    """
+    Rebuilds vocabulary and tokenizer from the HSK CSVs in a background thread and swaps
+    them in; requests keep being served on the old data meanwhile. Returns True if the
+    data changed. With several uvicorn workers each one reloads itself (see the watcher).
+    """
+    changed = await asyncio.to_thread(analyzer.reload)
+    if changed:
+        # Batch workers load the new data when they are restarted
+        batch_analyzer.recycle()
+        await asyncio.to_thread(assign_word_ids)
+        logger.info("HSK reference data reloaded, vocabulary version %s", analyzer.version)
+    return changed
+
+def assign_word_ids():
+    """Gives every HSK word a known-word bit, easiest words first (appended after a reload)."""
+    levels = analyzer.vocabulary.levels
+    known_words.assign_ids(sorted(levels, key=lambda word: (levels[word], word)))
+
+async def watch_reference_data(interval: float):
+    """Polls the HSK CSVs and reloads when they change. A failed reload keeps the old data."""
+    signature = reference_data_signature()
+    while True:
+        await asyncio.sleep(interval)
+        current = reference_data_signature()
+        if current == signature:
+            continue
+        signature = current
+        try:
+            await reload_reference_data()
+        except Exception:
+            logger.exception("HSK reference data reload failed, still serving version %s", analyzer.version)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the tokenizer before the readiness probe reports ready
+    analyzer.warmup()
+    assign_word_ids()
+    job_runner.start()
+    watcher = None
+    if config.RELOAD_POLL_SECONDS > 0:
+        watcher = asyncio.create_task(watch_reference_data(config.RELOAD_POLL_SECONDS))
+    app.state.ready = True
+    yield
+    app.state.ready = False
+    if watcher:
+        watcher.cancel()
+    await job_runner.stop()
+    await asyncio.to_thread(job_store.close)
+    await asyncio.gather(*indexing_tasks, return_exceptions=True)
+    if corpus_index:
+        corpus_index.close()
+    known_words.close()
+    batch_analyzer.shutdown()
+    analysis_executor.shutdown()
+    if scraper:
+        await scraper.aclose()
+    if url_cache:
+        url_cache.close()
+    if analyzer.cache:
+        analyzer.cache.close()
+
+app = FastAPI(title="Hanz Reader Analysis Service", lifespan=lifespan)
+app.state.ready = False
+app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated(request: Request, exc: ExecutorSaturated):
+    # Shed load fast instead of letting queueing latency grow without bound
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+@app.exception_handler(ProfilingBusy)
+async def profiling_busy(request: Request, exc: ProfilingBusy):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 # Mount Static Files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
@@ -18,54 +170,513 @@ app.mount("/static", StaticFiles(directory="app/static"), name="static")
 def read_root():
     return FileResponse('app/static/index.html')
 
+async def run_analysis(text: str, admitted: bool = False, segmenter: Optional[str] = None,
+                       index_key: Optional[str] = None, url: Optional[str] = None,
+                       title: Optional[str] = None) -> dict:
+    """
+    Analyzes one text without blocking the event loop. Hits in the in-process cache tier
+    are answered inline and the shared disk tier is looked up in a thread. Long documents
+    are segmented in parallel on the worker pool, everything else runs on the bounded
+    analysis executor (ExecutorSaturated when it is full, unless `admitted`).
+    Identical texts analyzed at the same time (with the same segmenter) share one computation.
+    When the text is actually analyzed (not a cache hit) and `index_key` is given, the
+    counts are added to the corpus index under that key, with `url` and `title`.
+    """
+    result = None if batch_analyzer.should_split(text) else analyzer.cached(text, segmenter, disk=False)
+    if result is None:
+        key = content_key(text, segmenter or config.SEGMENTER)
+        compute = lambda: compute_analysis(text, admitted, segmenter, index_key, url, title)
+        try:
+            result = await text_coalescer.run(key, compute)
+        except ExecutorSaturated:
+            if not admitted:
+                raise
+            # Joined a computation started (and turned away) for a request that wasn't admitted
+            result = await compute()
+        # The coalesced result is shared between requests
+        result = dict(result)
+    metrics.TOKENS.inc(result.get("total_tokens", 0))
+    metrics.CHARS.inc(len(text))
+    return result
+
+async def compute_analysis(text: str, admitted: bool, segmenter: Optional[str] = None,
+                           index_key: Optional[str] = None, url: Optional[str] = None,
+                           title: Optional[str] = None) -> dict:
+    # The disk tier of the cache is SQLite shared by every worker: may wait on a write lock
+    result = await asyncio.to_thread(analyzer.cached, text, segmenter)
+    if result is not None:
+        return result
+    if batch_analyzer.should_split(text):
+        result, counts, words = await batch_analyzer.count_document_async(text, analyzer, segmenter)
+    else:
+        result, counts, words = await analysis_executor.run(analyzer.analyze_counted, text, segmenter,
+                                                            admitted=admitted)
+    if index_key is not None:
+        schedule_indexing(index_key, result, counts, words, url, title)
+    return result
+
+def index_document(key: str, result: dict, counts: List[int], words: Set[str], url: Optional[str],
+                   title: Optional[str]):
+    """Adds (or replaces) one analyzed document in the corpus index. Blocking SQLite; run it in a thread."""
+    corpus_index.add(key, counts, words, result["difficulty_score"], result["vocabulary_version"], url, title)
+
+def schedule_indexing(key: str, result: dict, counts: List[int], words: Set[str], url: Optional[str] = None,
+                      title: Optional[str] = None):
+    """
+    Indexes a document in the background, after the response, from the counts its analysis
+    just produced. Re-indexing a key refreshes its entry (e.g. counts under new HSK data).
+    """
+    if corpus_index is None or not sum(counts):
+        return
+    task = asyncio.create_task(asyncio.to_thread(index_document, key, result, counts, words, url, title))
+    indexing_tasks.add(task)
+    task.add_done_callback(indexing_done)
+
+def indexing_done(task: asyncio.Task):
+    indexing_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Corpus indexing failed: %s", task.exception())
+
+@app.get("/health/live")
+def liveness():
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+def readiness():
+    """503 until the tokenizer is loaded and warmed; point the orchestrator's readiness probe here."""
+    if not app.state.ready:
+        raise HTTPException(status_code=503, detail="Warming up")
+    return {"status": "ready", "vocabulary_version": analyzer.version}
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Prometheus scrape endpoint: request and per-stage latency histograms, throughput and cache counters."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def check_admin(x_admin_token: Optional[str]):
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (set HANZ_ADMIN_TOKEN)")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, config.ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.post("/api/v1/admin/reload")
+async def admin_reload(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Reloads the HSK CSVs now instead of waiting for the watcher. Only reloads the worker
+    that serves this request; the others pick the change up on their next poll.
+    """
+    check_admin(x_admin_token)
+    try:
+        changed = await reload_reference_data()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, still serving the previous data: {e}")
+    return {"reloaded": changed, "vocabulary_version": analyzer.version}
+
+@app.get("/api/v1/admin/profiles")
+def list_profiles(x_admin_token: Optional[str] = Header(default=None)):
+    """Request profiles kept by this worker, newest first."""
+    check_admin(x_admin_token)
+    return {"profiles": profiler.list()}
+
+@app.get("/api/v1/admin/profiles/{profile_id}")
+def get_profile(profile_id: str, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    One request profile: wall time, own time per category (jieba, pandas, trafilatura,
+    app for this service's code, ...) and the functions with the most own time.
+    """
+    check_admin(x_admin_token)
+    entry = profiler.get(profile_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Profile not found (profiles are kept per worker)")
+    return {key: value for key, value in entry.items() if key != "pstats"}
+
+@app.get("/api/v1/admin/profiles/{profile_id}/pstats")
+def download_profile(profile_id: str, x_admin_token: Optional[str] = Header(default=None)):
+    """The raw profile, loadable with pstats.Stats(path) or snakeviz."""
+    check_admin(x_admin_token)
+    entry = profiler.get(profile_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Profile not found (profiles are kept per worker)")
+    return Response(content=entry["pstats"], media_type="application/octet-stream",
+                    headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'})
+
+def wants_profile(profile: bool, x_profile: Optional[str], x_admin_token: Optional[str]) -> bool:
+    """Whether a request asked to be profiled (?profile=1 or X-Profile: 1); only admins may."""
+    if not profile and (not x_profile or x_profile == "0"):
+        return False
+    check_admin(x_admin_token)
+    return True
+
+async def run_profiled(label: str, response: Response, fn, *args):
+    """
+    Runs one request's work under the profiler, in a thread of its own, and returns its
+    result; the profile id is sent in the X-Profile-Id header. Caches, coalescing and
+    the worker pools are bypassed so the work is really done (and measured) every time.
+    """
+    profiler.acquire()
+    try:
+        result, profile_id = await asyncio.to_thread(profiler.run, label, fn, *args)
+    finally:
+        profiler.release()
+    response.headers["X-Profile-Id"] = profile_id
+    return result
+
+@app.get("/api/v1/cache/stats")
+def cache_stats():
+    """Hit / miss / eviction counters of this worker's caches, and how many requests were coalesced."""
+    return {
+        "analysis": analyzer.cache.stats if analyzer.cache else None,
+        "url": url_cache.stats if url_cache else None,
+        "coalescing": {"url": url_coalescer.stats, "text": text_coalescer.stats},
+    }
+
 @app.post("/api/v1/analyze", response_model=AnalysisResult)
-async def analyze_text(request: TextRequest):
+async def analyze_text(request: TextRequest, response: Response, profile: bool = False,
+                       x_profile: Optional[str] = Header(default=None),
+                       x_admin_token: Optional[str] = Header(default=None)):
     """
     Analyze the difficulty of the provided Chinese text.
+    With the admin token, ?profile=1 (or an X-Profile: 1 header) profiles this request.
     """
+    try:
+        check_segmenter(request.segmenter)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not request.content:
         return AnalysisResult(
             total_tokens=0,
             difficulty_score="Unknown",
-            hsk_1_coverage=0.0
+            hsk_1_coverage=0.0,
+            vocabulary_version=analyzer.version,
         )
     
+    if wants_profile(profile, x_profile, x_admin_token):
+        return AnalysisResult(**await run_profiled(
+            "/api/v1/analyze", response, analyzer.analyze_uncached, request.content, request.segmenter))
+
     try:
-        result_dict = analyzer.analyze(request.content)
+        index_key = f"text:{content_key(request.content, '')}" if config.CORPUS_INDEX_TEXTS else None
+        result_dict = await run_analysis(request.content, segmenter=request.segmenter, index_key=index_key)
         # Convert dict to Pydantic model (Pydantic does this mostly automatically if keys match)
         return AnalysisResult(**result_dict)
+    except ExecutorSaturated:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/v1/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_batch(request: BatchTextRequest):
+    """
+    Analyze many texts in one call. Texts are spread across a pool of worker processes;
+    results come back in input order, with an error message on any item that failed.
+    """
+    if len(request.texts) > config.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {config.BATCH_MAX_ITEMS} texts)")
+    try:
+        check_segmenter(request.segmenter)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        items = await batch_analyzer.analyze_many_async(request.texts, request.segmenter)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    results = []
+    for item, text in zip(items, request.texts):
+        if item["result"] is not None:
+            metrics.TOKENS.inc(item["result"].get("total_tokens", 0))
+            metrics.CHARS.inc(len(text))
+        result = AnalysisResult(**item["result"]) if item["result"] is not None else None
+        results.append(BatchItemResult(index=item["index"], result=result, error=item["error"]))
+    return BatchAnalysisResponse(results=results)
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator reads the request body itself.
+    On servers older than ASGI spec 2.4 Starlette listens for disconnects by calling
+    receive(), which would swallow upload chunks; this response only streams.
+    """
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+@app.post("/api/v1/analyze/stream")
+async def analyze_stream(request: Request, segmenter: Optional[str] = None):
+    """
+    Analyze a large plain-text (UTF-8) upload as it arrives, e.g. a chunked request body.
+    Responds with NDJSON: a "progress" record with partial coverage after every segmented
+    block, then one "result" record equal to what /api/v1/analyze returns for the whole text.
+    The segmenter backend can be picked with the `segmenter` query parameter.
+    """
+    try:
+        check_segmenter(segmenter)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Admission happens once per upload; its chunks then queue like any admitted work
+    analysis_executor.check_capacity()
+    stream = StreamingAnalysis(analyzer, segmenter=segmenter)
+
+    async def records():
+        async for chunk in request.stream():
+            if not chunk:
+                continue
+            # Segmentation is CPU-bound; keep it off the event loop
+            if await analysis_executor.run(stream.feed_bytes, chunk, admitted=True):
+                yield json.dumps(stream.progress(), ensure_ascii=False) + "\n"
+        await analysis_executor.run(stream.close, admitted=True)
+        final = {"type": "result"}
+        final.update(AnalysisResult(**stream.result()).model_dump(exclude_none=True))
+        yield json.dumps(final, ensure_ascii=False) + "\n"
+
+    return UploadStreamingResponse(records(), media_type="application/x-ndjson")
+
 @app.post("/api/v1/analyze/url", response_model=AnalysisResult)
-async def analyze_url(request: UrlRequest):
+async def analyze_url(request: UrlRequest, response: Response, profile: bool = False,
+                      x_profile: Optional[str] = Header(default=None),
+                      x_admin_token: Optional[str] = Header(default=None)):
     """
     Fetches content from a URL and analyzes its difficulty.
+    With the admin token, ?profile=1 (or an X-Profile: 1 header) profiles this request.
     """
     if not request.url:
          raise HTTPException(status_code=400, detail="URL is required")
+    if wants_profile(profile, x_profile, x_admin_token):
+        return await run_profiled("/api/v1/analyze/url", response, fetch_and_analyze_page_sync, request.url)
+    return await analyze_page(request.url)
 
-    # 1. Scrape
-    scrape_result = scraper.fetch_and_extract(request.url)
-    
+def fetch_and_analyze_page_sync(url: str) -> AnalysisResult:
+    """Blocking fetch + extract + analyze of one URL, without caches (for profiling)."""
+    scrape_result = get_scraper().fetch_and_extract(url)
+    check_scrape_result(scrape_result)
+    result = AnalysisResult(**analyzer.analyze_uncached(scrape_result["content"]))
+    result.title = scrape_result.get("title")
+    result.url = scrape_result.get("url")
+    return result
+
+def check_scrape_result(scrape_result: dict):
+    """Raises the HTTPException for a failed scrape or a page without extractable text."""
     if scrape_result.get("error"):
-        raise HTTPException(status_code=400, detail=f"Scraping failed: {scrape_result['error']}")
-        
-    content = scrape_result.get("content", "")
-    if not content:
+        # Pages refused for their size or type can't be fixed by retrying the same URL
+        status = 422 if scrape_result.get("error_code") in ("too_large", "unsupported_content_type") else 400
+        raise HTTPException(status_code=status, detail=f"Scraping failed: {scrape_result['error']}")
+    if not scrape_result.get("content"):
          raise HTTPException(status_code=422, detail="Unable to extract meaningful content from the URL.")
+
+def is_current(entry: dict) -> bool:
+    """
+    Whether a URL-cache entry was analyzed with the HSK data now loaded, by code that
+    produced every AnalysisResult field.
+    """
+    analysis = entry["analysis"]
+    return (analysis.get("vocabulary_version") == analyzer.version
+            and AnalysisResult.model_fields.keys() <= analysis.keys())
+
+async def reanalyze_cached_page(url: str, cached: dict, admitted: bool) -> Optional[AnalysisResult]:
+    """Analyzes the extracted text stored with a URL-cache entry again; None if it is gone."""
+    page = await asyncio.to_thread(url_cache.get_content, url)
+    if not page or not page.get("content"):
+        return None
+    analysis = await run_analysis(page["content"], admitted=admitted, index_key=f"url:{normalize_url(url)}",
+                                  url=cached["analysis"].get("url"), title=page.get("title"))
+    result = AnalysisResult(**analysis)
+    result.title = page.get("title")
+    result.url = cached["analysis"].get("url")
+    page.update(etag=cached["etag"], last_modified=cached["last_modified"])
+    await asyncio.to_thread(url_cache.put, url, page, result.model_dump())
+    return result
+
+async def analyze_page(url: str, admitted: bool = False) -> AnalysisResult:
+    """
+    Cached fetch + extract + analyze of one URL; failures are raised as HTTPException.
+    Concurrent calls for the same (normalized) URL wait for one shared fetch and analysis.
+    """
+    try:
+        result = await url_coalescer.run(normalize_url(url), lambda: fetch_and_analyze_page(url, admitted))
+    except ExecutorSaturated:
+        if not admitted:
+            raise
+        # Joined a fetch started (and turned away) for a request that wasn't admitted
+        result = await fetch_and_analyze_page(url, admitted)
+    return result.model_copy()
+
+async def fetch_and_analyze_page(url: str, admitted: bool) -> AnalysisResult:
+    # 0. Cache: a fresh entry is returned as is; a stale one is revalidated with the origin.
+    # The disk tier is shared with every worker: its SQLite calls run in a thread.
+    cached = None
+    if url_cache:
+        with metrics.stage("url_cache"):
+            cached = await asyncio.to_thread(url_cache.get, url)
+    if cached and url_cache.is_fresh(cached):
+        if is_current(cached):
+            return AnalysisResult(**cached["analysis"])
+        # Page still fresh but analyzed with HSK data replaced since: re-analyze the stored text
+        result = await reanalyze_cached_page(url, cached, admitted)
+        if result is not None:
+            return result
+
+    # Don't spend a fetch on a request the analysis stage would reject
+    if not admitted:
+        analysis_executor.check_capacity()
+
+    # 1. Scrape (conditional request when we hold validators for a stale entry)
+    scrape_result = await get_scraper().fetch_and_extract_async(
+        url,
+        etag=cached["etag"] if cached else None,
+        last_modified=cached["last_modified"] if cached else None,
+    )
+    for name, ms in scrape_result.get("timings", {}).items():
+        metrics.observe_stage(name.removesuffix("_ms"), ms / 1000)
+    metrics.FETCHED_BYTES.inc(scrape_result.get("bytes", 0))
+
+    if scrape_result.get("not_modified") and cached:
+        # 304: page unchanged, skip extraction and analysis entirely
+        await asyncio.to_thread(url_cache.touch, url)
+        if is_current(cached):
+            return AnalysisResult(**cached["analysis"])
+        result = await reanalyze_cached_page(url, cached, admitted)
+        if result is not None:
+            return result
+        scrape_result = await get_scraper().fetch_and_extract_async(url)
+    
+    check_scrape_result(scrape_result)
+    content = scrape_result["content"]
          
     # 2. Analyze
     try:
-        analysis = analyzer.analyze(content)
+        analysis = await run_analysis(content, admitted=admitted, index_key=f"url:{normalize_url(url)}",
+                                      url=scrape_result.get("url"), title=scrape_result.get("title"))
         
         # 3. Combine with metadata
-        result = AnalysisResult(**analysis)
-        result.title = scrape_result.get("title")
-        result.url = scrape_result.get("url")
+        with metrics.stage("response"):
+            result = AnalysisResult(**analysis)
+            result.title = scrape_result.get("title")
+            result.url = scrape_result.get("url")
+
+        if url_cache:
+            with metrics.stage("url_cache"):
+                await asyncio.to_thread(url_cache.put, url, scrape_result, result.model_dump())
         
         return result
-        
+
+    except ExecutorSaturated:
+        raise
     except Exception as e:
         # Log error in real app
         raise HTTPException(status_code=500, detail=str(e))
+
+async def process_job_item(kind: str, value: str) -> dict:
+    """Job worker step: analyzes one URL or text. Job concurrency is bounded by the runner."""
+    try:
+        if kind == "url":
+            result = await analyze_page(value, admitted=True)
+        elif not value:
+            result = AnalysisResult(total_tokens=0, difficulty_score="Unknown", hsk_1_coverage=0.0,
+                                    vocabulary_version=analyzer.version)
+        else:
+            result = AnalysisResult(**await run_analysis(value, admitted=True))
+    except HTTPException as e:
+        raise RuntimeError(e.detail)
+    return result.model_dump()
+
+job_store = JobStore()
+job_runner = JobRunner(job_store, process_job_item)
+
+@app.post("/api/v1/corpus/query", response_model=CorpusQueryResult)
+def query_corpus(request: CorpusQuery):
+    """
+    Searches the documents analyzed so far (text and URL endpoints), e.g. "articles where
+    HSK 1-3 covers 95% of words and that use 环境": max_level=3, min_coverage=0.95,
+    include_words=["环境"]. Nothing is segmented again; answered from the corpus index.
+    """
+    if corpus_index is None:
+        raise HTTPException(status_code=404, detail="Corpus index is disabled (set HANZ_CORPUS_INDEX=1)")
+    start = time.perf_counter()
+    found = corpus_index.query(**request.model_dump())
+    return CorpusQueryResult(took_ms=round((time.perf_counter() - start) * 1000, 3), **found)
+
+@app.put("/api/v1/users/{user_id}/known-words", response_model=KnownWords)
+def update_known_words(user_id: str, request: KnownWordsUpdate):
+    """
+    Sets a learner's known words: the given words plus every word of the given HSK levels.
+    mode "add" / "remove" changes the stored list instead of replacing it.
+    """
+    levels = set(request.levels)
+    words = list(request.words)
+    if levels:
+        words += [word for word, level in analyzer.vocabulary.levels.items() if level in levels]
+    try:
+        count, unrecognized = known_words.update(user_id, words, request.mode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return KnownWords(user_id=user_id, known_words=count, unrecognized=unrecognized)
+
+@app.get("/api/v1/users/{user_id}/known-words", response_model=KnownWords)
+def get_known_words(user_id: str, include_words: bool = False):
+    bits = known_words.get(user_id)
+    if bits is None:
+        raise HTTPException(status_code=404, detail="No known-word list for this user")
+    words = known_words.words(bits)
+    return KnownWords(user_id=user_id, known_words=len(words), words=words if include_words else None)
+
+@app.delete("/api/v1/users/{user_id}/known-words", status_code=204)
+def delete_known_words(user_id: str):
+    if not known_words.delete(user_id):
+        raise HTTPException(status_code=404, detail="No known-word list for this user")
+
+@app.post("/api/v1/analyze/known", response_model=KnownCoverageResponse)
+async def analyze_known_coverage(request: KnownCoverageRequest):
+    """
+    Coverage of texts against learners' own known-word lists: for every text, the share
+    of its words each user knows. One text against thousands of users, or thousands of
+    texts against one user, are both scored in a single batched pass.
+    """
+    if len(request.texts) > config.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Too many texts (max {config.BATCH_MAX_ITEMS})")
+    if len(request.user_ids) > config.KNOWN_COVERAGE_MAX_USERS:
+        raise HTTPException(status_code=413, detail=f"Too many users (max {config.KNOWN_COVERAGE_MAX_USERS})")
+    try:
+        check_segmenter(request.segmenter)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    bitsets, missing = known_words.get_many(request.user_ids)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"No known-word list for users: {missing[:20]}")
+
+    def score():
+        profiles = [known_words.profile(analyzer.token_counts(text, request.segmenter)) for text in request.texts]
+        return profiles, known_coverage(bitsets, profiles)[0]
+
+    profiles, coverage = await analysis_executor.run(score)
+    return KnownCoverageResponse(user_ids=request.user_ids, results=[
+        KnownCoverageItem(index=i, total_tokens=profile[2], known_coverage=row)
+        for i, (profile, row) in enumerate(zip(profiles, coverage.tolist()))
+    ])
+
+@app.post("/api/v1/jobs", response_model=JobCreated, status_code=202)
+async def create_job(request: JobRequest):
+    """
+    Queues URLs and/or texts for background analysis and returns a job id right away.
+    Poll GET /api/v1/jobs/{id} for progress; jobs survive a restart of the service.
+    """
+    items = [("url", url) for url in request.urls] + [("text", text) for text in request.texts]
+    if not items:
+        raise HTTPException(status_code=400, detail="At least one URL or text is required")
+    if len(items) > config.JOB_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Job too large (max {config.JOB_MAX_ITEMS} items)")
+
+    job_id = await asyncio.to_thread(job_store.create, items)
+    job_runner.notify()
+    return JobCreated(id=job_id, status="queued", total=len(items))
+
+@app.get("/api/v1/jobs/{job_id}", response_model=JobStatus)
+def get_job(job_id: str):
+    """Job progress with each item's status and, once finished, its result or error."""
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobStatus(**job)
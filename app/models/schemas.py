@@ -1,9 +1,11 @@
-from pydantic import BaseModel
-from typing import Dict, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 
 class TextRequest(BaseModel):
     content: str
     target_level: str = "HSK2" # Optional in prompt implementation, but good to have
+    # Segmenter backend (see app/core/segmenters.py); default HANZ_SEGMENTER
+    segmenter: Optional[str] = None
 
 class UrlRequest(BaseModel):
     url: str
@@ -19,6 +21,113 @@ class AnalysisResult(BaseModel):
     hsk_5_coverage: float = 0.0
     hsk_6_coverage: float = 0.0
     unknown_coverage: float = 0.0
+    # The same coverage over Chinese characters: each character counts at the lowest
+    # HSK level of any word it appears in (keys as above, e.g. "hsk_1_coverage")
+    total_characters: Optional[int] = None
+    character_coverage: Optional[Dict[str, float]] = None
+    # Version of the HSK data the result was computed with; changes on reload
+    vocabulary_version: Optional[str] = None
     # Optional metadata from scraper
     title: Optional[str] = None
     url: Optional[str] = None
+
+class BatchTextRequest(BaseModel):
+    texts: List[str]
+    target_level: str = "HSK2"
+    segmenter: Optional[str] = None
+
+class BatchItemResult(BaseModel):
+    index: int
+    result: Optional[AnalysisResult] = None
+    error: Optional[str] = None
+
+class BatchAnalysisResponse(BaseModel):
+    results: List[BatchItemResult]
+
+class JobRequest(BaseModel):
+    urls: List[str] = []
+    texts: List[str] = []
+    target_level: str = "HSK2"
+
+class JobCreated(BaseModel):
+    id: str
+    status: str
+    total: int
+
+class JobItem(BaseModel):
+    index: int
+    kind: str  # "url" or "text"
+    url: Optional[str] = None
+    status: str  # pending / running / done / failed
+    result: Optional[AnalysisResult] = None
+    error: Optional[str] = None
+
+class JobStatus(BaseModel):
+    id: str
+    status: str  # queued / running / completed
+    created_at: float
+    total: int
+    completed: int
+    failed: int
+    items: List[JobItem]
+
+class CorpusQuery(BaseModel):
+    # "HSK 1-3 covers 95% of words": max_level=3, min_coverage=0.95
+    max_level: int = Field(6, ge=1, le=6)
+    min_coverage: float = Field(0.0, ge=0.0, le=1.0)
+    max_unknown: Optional[float] = Field(None, ge=0.0, le=1.0)
+    # Rank by coverage of HSK 1..target_level (default max_level)
+    target_level: Optional[int] = Field(None, ge=1, le=6)
+    include_words: List[str] = []
+    min_tokens: int = Field(1, ge=1)
+    limit: int = Field(20, ge=1, le=1000)
+    offset: int = Field(0, ge=0)
+
+class CorpusDocument(BaseModel):
+    id: int
+    url: Optional[str] = None
+    title: Optional[str] = None
+    difficulty_score: str
+    vocabulary_version: Optional[str] = None
+    total_tokens: int
+    target_coverage: float
+    hsk_1_coverage: float = 0.0
+    hsk_2_coverage: float = 0.0
+    hsk_3_coverage: float = 0.0
+    hsk_4_coverage: float = 0.0
+    hsk_5_coverage: float = 0.0
+    hsk_6_coverage: float = 0.0
+    unknown_coverage: float = 0.0
+
+class CorpusQueryResult(BaseModel):
+    total: int
+    took_ms: float
+    documents: List[CorpusDocument]
+
+class KnownWordsUpdate(BaseModel):
+    words: List[str] = []
+    # Every word of these HSK levels, on top of `words`
+    levels: List[int] = []
+    mode: str = "replace"  # replace / add / remove
+
+class KnownWords(BaseModel):
+    user_id: str
+    known_words: int
+    # Words not in the vocabulary; they can't be tracked and were ignored
+    unrecognized: List[str] = []
+    words: Optional[List[str]] = None
+
+class KnownCoverageRequest(BaseModel):
+    texts: List[str]
+    user_ids: List[str]
+    segmenter: Optional[str] = None
+
+class KnownCoverageItem(BaseModel):
+    index: int
+    total_tokens: int
+    # Share of the text's words each user knows, in `user_ids` order
+    known_coverage: List[float]
+
+class KnownCoverageResponse(BaseModel):
+    user_ids: List[str]
+    results: List[KnownCoverageItem]
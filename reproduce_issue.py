@@ -1,13 +1,9 @@
-import jieba
 import sys
 sys.path.append(".")
 from app.core.analyzer import TextAnalyzer
 
 analyzer = TextAnalyzer()
 
-# Fix for "这是"
-jieba.suggest_freq(('这', '是'), True)
-
 cases = [
     "王明：这是？",
     "王明：是？"
@@ -18,7 +14,8 @@ print("Loading HSK Data...")
 
 for text in cases:
     print(f"\nScanning: '{text}'")
-    tokens = jieba.lcut(text)
+    # The analyzer segments with its own HSK-tuned tokenizer, not the global jieba one
+    tokens = analyzer.tokenizer.lcut(text)
     print(f"Jieba Tokens: {tokens}")
     
     result = analyzer.analyze(text)
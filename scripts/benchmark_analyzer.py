@@ -0,0 +1,163 @@
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+import pandas as pd
+
+sys.path.append(".")
+from app.core.analyzer import TextAnalyzer
+from app.core.batch import BatchAnalyzer
+
+# Sample sentences used to generate request-sized texts.
+SENTENCES = [
+    "我是学生。",
+    "王明：这是？",
+    "今天天气很好，我们去公园散步吧。",
+    "他每天早上七点起床，然后坐地铁去公司上班。",
+    "这本书的内容非常丰富，值得推荐给所有喜欢历史的朋友。",
+    "经济全球化对发展中国家既是机遇也是挑战。",
+    "StrangeWord 123 !!",
+]
+
+
+def legacy_analyze(hsk_df: pd.DataFrame, text: str, tokenizer) -> Dict[str, Any]:
+    """The pre-VocabularyIndex pandas implementation of `TextAnalyzer.analyze` (reference only)."""
+    if not text:
+        return {"total_tokens": 0, "difficulty_score": "Unknown"}
+
+    tokens = tokenizer.lcut(text)
+    token_series = pd.Series(tokens, name='token')
+    clean_tokens = token_series[token_series.str.strip().str.match(r'^[^\s\W]+$')]
+    if clean_tokens.empty:
+        return {"total_tokens": 0, "difficulty_score": "Unknown"}
+
+    total_words = len(clean_tokens)
+    unique_words = clean_tokens.nunique()
+
+    token_df = pd.DataFrame(clean_tokens, columns=['token'])
+    merged_df = token_df.join(hsk_df, on='token', how='left')
+    merged_df['level'] = merged_df['level'].fillna(0).astype(int)
+    level_counts = merged_df['level'].value_counts(normalize=True).sort_index()
+
+    coverage: Dict[str, float] = {}
+    for level in range(1, 7):
+        if level in level_counts:
+            coverage[f"hsk_{level}_coverage"] = round(level_counts[level], 4)
+        else:
+            coverage[f"hsk_{level}_coverage"] = 0.0
+    coverage["unknown_coverage"] = round(level_counts.get(0, 0.0), 4)
+
+    difficulty_map = {1: "A1", 2: "A2", 3: "B1", 4: "B2", 5: "C1", 6: "C2"}
+    current_coverage = 0.0
+    found_level = 1
+    for lvl in range(1, 7):
+        current_coverage += coverage.get(f"hsk_{lvl}_coverage", 0)
+        if current_coverage >= 0.80:
+            found_level = lvl
+            break
+    if current_coverage < 0.80:
+        final_score = "Unknown (>20%)"
+    else:
+        final_score = difficulty_map.get(found_level, "A1")
+
+    result = {
+        "total_tokens": int(total_words),
+        "unique_words": int(unique_words),
+        "difficulty_score": final_score
+    }
+    result.update(coverage)
+    return result
+
+
+def make_corpus(n_texts: int, sentences_per_text: int, seed: int = 42) -> List[str]:
+    rng = random.Random(seed)
+    return ["".join(rng.choice(SENTENCES) for _ in range(sentences_per_text)) for _ in range(n_texts)]
+
+
+def time_per_request(fns, texts: List[str], rounds: int = 3) -> List[List[float]]:
+    """Times each fn on every text, interleaved so machine noise hits all paths equally."""
+    timings: List[List[float]] = [[] for _ in fns]
+    for _ in range(rounds):
+        for text in texts:
+            for i, fn in enumerate(fns):
+                start = time.perf_counter()
+                fn(text)
+                timings[i].append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+def run_benchmark():
+    analyzer = TextAnalyzer()
+    hsk_df = analyzer.hsk_df
+
+    for sentences_per_text in (1, 10, 100, 1000):
+        texts = make_corpus(200 if sentences_per_text < 1000 else 20, sentences_per_text)
+
+        # Warm up jieba and check both paths agree before timing anything.
+        for text in texts:
+            expected = legacy_analyze(hsk_df, text, analyzer.tokenizer)
+            actual = analyzer.analyze(text)
+            # Not reported by the legacy path
+            for key in ("vocabulary_version", "total_characters", "character_coverage"):
+                actual.pop(key, None)
+            if expected != actual:
+                print(f"MISMATCH for {text[:40]!r}:\n  pandas: {expected}\n  engine: {actual}")
+                sys.exit(1)
+
+        legacy, engine = time_per_request([lambda t: legacy_analyze(hsk_df, t, analyzer.tokenizer), analyzer.analyze], texts)
+
+        avg_chars = sum(len(t) for t in texts) / len(texts)
+        print(
+            f"~{avg_chars:>7.0f} chars | "
+            f"pandas p50 {statistics.median(legacy):>9.1f} us | "
+            f"engine p50 {statistics.median(engine):>9.1f} us | "
+            f"speedup {statistics.median(legacy) / statistics.median(engine):5.1f}x"
+        )
+
+
+def run_batch_benchmark():
+    """Texts/second through BatchAnalyzer for 1..N worker processes."""
+    texts = make_corpus(2000, 10)
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    for workers in worker_counts:
+        batch = BatchAnalyzer(max_workers=workers)
+        batch.analyze_many(texts[:workers * 10])  # start and warm every worker
+        start = time.perf_counter()
+        batch.analyze_many(texts)
+        elapsed = time.perf_counter() - start
+        batch.shutdown()
+        print(f"{workers:>3} workers | {len(texts) / elapsed:>8.0f} texts/s")
+
+
+def run_parallel_benchmark():
+    """One ~5 MB document: serial analyze() vs. intra-document parallel segmentation."""
+    import asyncio
+
+    analyzer = TextAnalyzer()
+    text = make_corpus(1, 80_000)[0]
+    batch = BatchAnalyzer()
+    batch.analyze_many(["我是学生"] * batch.max_workers * 4)  # start and warm every worker
+
+    start = time.perf_counter()
+    serial = analyzer.analyze(text)
+    serial_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel = asyncio.run(batch.analyze_document_async(text, analyzer))
+    parallel_s = time.perf_counter() - start
+    batch.shutdown()
+
+    print(f"{len(text.encode('utf-8')) / 1e6:.1f} MB | serial {serial_s:.2f}s | "
+          f"parallel ({batch.max_workers} workers) {parallel_s:.2f}s | same result: {serial == parallel}")
+
+
+if __name__ == "__main__":
+    if "--batch" in sys.argv:
+        run_batch_benchmark()
+    elif "--parallel" in sys.argv:
+        run_parallel_benchmark()
+    else:
+        run_benchmark()
@@ -0,0 +1,37 @@
+import pathlib
+import statistics
+import sys
+
+sys.path.append(".")
+from app.core.scraper import WebScraper, EXTRACTION_PROFILES
+
+# Usage: python scripts/benchmark_scraper.py page1.html page2.html ...
+# Runs every extraction profile over saved HTML pages and prints per-stage
+# timings, so the profile can be chosen per deployment (HANZ_EXTRACTION_PROFILE).
+
+def run_benchmark(paths, rounds: int = 5):
+    pages = [(path, pathlib.Path(path).read_text(encoding="utf-8", errors="replace")) for path in paths]
+
+    for profile in EXTRACTION_PROFILES:
+        scraper = WebScraper(profile=profile)
+        for path, html in pages:
+            parse, extract, chars = [], [], 0
+            for _ in range(rounds):
+                result = scraper._empty_result(path)
+                scraper._extract(html, result)
+                parse.append(result["timings"].get("parse_ms", 0.0))
+                extract.append(result["timings"].get("extract_ms", 0.0))
+                chars = len(result["content"])
+            print(
+                f"{profile:<10} {pathlib.Path(path).name:<30} "
+                f"parse {statistics.median(parse):>7.2f} ms | "
+                f"extract {statistics.median(extract):>8.2f} ms | "
+                f"{chars:>7} chars"
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python scripts/benchmark_scraper.py page.html [page.html ...]")
+        sys.exit(1)
+    run_benchmark(sys.argv[1:])
@@ -0,0 +1,136 @@
+import argparse
+import json
+import pathlib
+import random
+import sys
+import time
+from typing import Any, Dict, List, Set, Tuple
+
+sys.path.append(".")
+from app.core.analyzer import TextAnalyzer
+from app.core.segmenters import SEGMENTERS
+from scripts.benchmark_suite import make_text
+
+# Usage:
+#   python scripts/benchmark_segmenters.py
+#   python scripts/benchmark_segmenters.py --chars 1000000 --output segmenters.json
+#
+# Accuracy versus speed of every segmenter backend (app/core/segmenters.py):
+#   - token precision / recall / F1 against the hand-segmented sentences in
+#     scripts/fixtures/segmentation_gold.txt
+#   - how often the difficulty score of a passage matches the jieba (HMM) one,
+#     and the largest coverage difference
+#   - segmentation throughput on a generated corpus of --chars characters
+# Passages and corpus are generated from fixed seeds, so runs are comparable.
+
+GOLD_PATH = pathlib.Path(__file__).parent / "fixtures" / "segmentation_gold.txt"
+REFERENCE = "jieba"
+PASSAGES = 200
+PASSAGE_SENTENCES = 5
+ROUNDS = 3
+COVERAGE_KEYS = [f"hsk_{level}_coverage" for level in range(1, 7)] + ["unknown_coverage"]
+
+
+def load_gold(path: pathlib.Path = GOLD_PATH) -> List[List[str]]:
+    """Reference segmentations, one token list per sentence."""
+    sentences = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            sentences.append(line.split(" "))
+    return sentences
+
+
+def spans(tokens: List[str]) -> Set[Tuple[int, int]]:
+    """(start, end) character offsets of the tokens, whitespace tokens left out."""
+    result, start = set(), 0
+    for token in tokens:
+        if token.strip():
+            result.add((start, start + len(token)))
+        start += len(token)
+    return result
+
+
+def score_tokens(gold: List[List[str]], segment) -> Dict[str, float]:
+    """Token-level precision / recall / F1: a token counts when both of its boundaries match."""
+    matched = predicted = expected = 0
+    for tokens in gold:
+        want = spans(tokens)
+        got = spans(segment("".join(tokens)))
+        matched += len(want & got)
+        predicted += len(got)
+        expected += len(want)
+    precision = matched / predicted if predicted else 0.0
+    recall = matched / expected if expected else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": round(precision, 4), "recall": round(recall, 4), "f1": round(f1, 4)}
+
+
+def make_passages(gold: List[List[str]], count: int = PASSAGES, seed: int = 42) -> List[str]:
+    rng = random.Random(seed)
+    texts = ["".join(tokens) for tokens in gold]
+    return ["".join(rng.choice(texts) for _ in range(PASSAGE_SENTENCES)) for _ in range(count)]
+
+
+def throughput(segment, text: str) -> Dict[str, float]:
+    segment(text[:1000])  # warm
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        segment(text)
+        times.append(time.perf_counter() - start)
+    best = min(times)
+    return {"seconds": round(best, 4), "chars_per_s": round(len(text) / best)}
+
+
+def run(chars: int) -> Dict[str, Any]:
+    analyzer = TextAnalyzer()
+    analyzer.warmup()
+    gold = load_gold()
+    passages = make_passages(gold)
+    corpus = make_text(chars)
+    reference = [analyzer.analyze(text, REFERENCE) for text in passages]
+
+    backends = {}
+    for name in SEGMENTERS:
+        segmenter = analyzer.state.segmenter(name)
+        results = [analyzer.analyze(text, name) for text in passages]
+        agreement = sum(r["difficulty_score"] == ref["difficulty_score"] for r, ref in zip(results, reference))
+        coverage_delta = max(abs(r.get(key, 0.0) - ref.get(key, 0.0))
+                             for r, ref in zip(results, reference) for key in COVERAGE_KEYS)
+        backends[name] = {
+            "accuracy": score_tokens(gold, segmenter.lcut),
+            "difficulty_agreement": round(agreement / len(passages), 4),
+            "max_coverage_delta": round(coverage_delta, 4),
+            "speed": throughput(segmenter.lcut, corpus),
+        }
+
+    base_speed = backends[REFERENCE]["speed"]["chars_per_s"]
+    for backend in backends.values():
+        backend["speedup"] = round(backend["speed"]["chars_per_s"] / base_speed, 2)
+    return {"gold_sentences": len(gold), "passages": len(passages), "corpus_chars": len(corpus), "backends": backends}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare segmenter backends on accuracy and speed.")
+    parser.add_argument("--chars", type=int, default=300_000, help="size of the throughput corpus")
+    parser.add_argument("--output", type=pathlib.Path, help="write the report as JSON to this file")
+    args = parser.parse_args()
+
+    report = run(args.chars)
+    print(f"{len(SEGMENTERS)} backends, {report['gold_sentences']} gold sentences, "
+          f"{report['passages']} passages, {report['corpus_chars']} chars\n")
+    print(f"{'backend':<18} {'P':>7} {'R':>7} {'F1':>7} {'score agr':>10} {'max Δcov':>9} "
+          f"{'chars/s':>12} {'speedup':>8}")
+    for name, backend in report["backends"].items():
+        accuracy = backend["accuracy"]
+        print(f"{name:<18} {accuracy['precision']:>7.3f} {accuracy['recall']:>7.3f} {accuracy['f1']:>7.3f} "
+              f"{backend['difficulty_agreement']:>10.1%} {backend['max_coverage_delta']:>9.3f} "
+              f"{backend['speed']['chars_per_s']:>12,} {backend['speedup']:>7.2f}x")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import argparse
+import json
+import pathlib
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.append(".")
+from scripts.benchmark_analyzer import SENTENCES
+
+# Usage:
+#   python scripts/benchmark_suite.py --output bench.json
+#   python scripts/benchmark_suite.py --compare bench.json [--threshold 0.15]
+#
+# Runs a fixed set of cases (analyzer throughput on generated corpora from 100
+# chars to 10 MB, cold start of the vocabulary and tokenizer, scraper extraction
+# on saved HTML fixtures) and writes the results as JSON. With --compare the run
+# is checked against a stored baseline and exits with status 1 on a regression.
+# Corpora are generated from a fixed seed, so every run analyzes the same text.
+
+FIXTURES_DIR = pathlib.Path(__file__).parent / "fixtures"
+CORPUS_SIZES = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+# Every timed case runs for at least this long (split over its rounds)
+MIN_CASE_SECONDS = 1.0
+MAX_ROUNDS = 50
+COLD_START_ROUNDS = 3
+
+# A fresh interpreter per round; prints one JSON line with the stage timings
+COLD_START_SCRIPT = """
+import json, sys, time
+sys.path.append(".")
+start = time.perf_counter()
+from app.core.reference_loader import get_hsk_dataframe
+get_hsk_dataframe()
+vocabulary = time.perf_counter()
+from app.core.analyzer import TextAnalyzer
+TextAnalyzer().warmup()
+tokenizer = time.perf_counter()
+print(json.dumps({"vocabulary_s": vocabulary - start, "tokenizer_s": tokenizer - vocabulary}))
+"""
+
+
+def make_text(chars: int, seed: int = 42) -> str:
+    """Deterministic text of exactly `chars` characters, built from the sample sentences."""
+    rng = random.Random(seed)
+    parts, length = [], 0
+    while length < chars:
+        sentence = rng.choice(SENTENCES)
+        parts.append(sentence)
+        length += len(sentence)
+    return "".join(parts)[:chars]
+
+
+def measure(fn: Callable[[], Any], rounds: Optional[int] = None) -> Dict[str, Any]:
+    """Median/min wall time over several rounds, then one extra traced run for peak memory."""
+    fn()  # warm-up; also calibrates the number of rounds
+    if rounds is None:
+        start = time.perf_counter()
+        fn()
+        once = time.perf_counter() - start
+        rounds = max(1, min(MAX_ROUNDS, int(MIN_CASE_SECONDS / max(once, 1e-6))))
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    # tracemalloc slows allocation-heavy code down, so it never overlaps the timed rounds
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "rounds": rounds,
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def analyzer_cases(max_chars: int) -> Dict[str, Dict[str, Any]]:
+    from app.core.analyzer import TextAnalyzer
+
+    # No result cache: every round has to segment the text
+    analyzer = TextAnalyzer()
+    analyzer.warmup()
+    cases = {}
+    for chars in CORPUS_SIZES:
+        if chars > max_chars:
+            continue
+        text = make_text(chars)
+        case = measure(lambda: analyzer.analyze(text), rounds=1 if chars >= 1_000_000 else None)
+        case["chars"] = chars
+        case["chars_per_s"] = round(chars / case["median_s"])
+        cases[f"analyze/{chars}"] = case
+        print(f"  analyze {chars:>10} chars | {case['median_s'] * 1000:>10.2f} ms | "
+              f"{case['chars_per_s']:>10} chars/s | peak {case['peak_kib']:>10.1f} KiB")
+    return cases
+
+
+def cold_start_cases() -> Dict[str, Dict[str, Any]]:
+    samples: Dict[str, List[float]] = {}
+    for _ in range(COLD_START_ROUNDS):
+        output = subprocess.run(
+            [sys.executable, "-c", COLD_START_SCRIPT],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        # jieba logs to stderr; the last stdout line is ours
+        for stage, seconds in json.loads(output.strip().splitlines()[-1]).items():
+            samples.setdefault(stage, []).append(seconds)
+
+    cases = {}
+    for stage, timings in samples.items():
+        name = f"cold_start/{stage.removesuffix('_s')}"
+        cases[name] = {"rounds": len(timings), "median_s": statistics.median(timings), "min_s": min(timings)}
+        print(f"  {name:<24} | {cases[name]['median_s'] * 1000:>10.2f} ms")
+    return cases
+
+
+def scraper_cases(paths: List[pathlib.Path]) -> Dict[str, Dict[str, Any]]:
+    from app.core.scraper import WebScraper
+
+    scraper = WebScraper()
+    cases = {}
+    for path in paths:
+        html = path.read_text(encoding="utf-8", errors="replace")
+
+        def extract():
+            result = scraper._empty_result(str(path))
+            scraper._extract(html, result)
+            return result
+
+        case = measure(extract)
+        case["html_bytes"] = len(html.encode("utf-8"))
+        case["content_chars"] = len(extract()["content"])
+        cases[f"extract/{path.name}"] = case
+        print(f"  extract {path.name:<24} | {case['median_s'] * 1000:>10.2f} ms | "
+              f"{case['content_chars']:>7} chars | peak {case['peak_kib']:>10.1f} KiB")
+    return cases
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(max_chars: int, html_paths: List[pathlib.Path]) -> Dict[str, Any]:
+    cases: Dict[str, Dict[str, Any]] = {}
+    print("Cold start")
+    cases.update(cold_start_cases())
+    print("Analyzer")
+    cases.update(analyzer_cases(max_chars))
+    print("Scraper")
+    cases.update(scraper_cases(html_paths))
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "cases": cases,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Returns one message per regression: a case whose median time or peak memory grew by
+    more than `threshold` (relative) over the baseline. Cases missing on either side are skipped.
+    """
+    regressions = []
+    print(f"\n{'case':<32} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, case in current["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None:
+            continue
+        for key, unit, scale in (("median_s", "ms", 1000), ("peak_kib", "KiB", 1)):
+            if key not in case or not base.get(key):
+                continue
+            change = case[key] / base[key] - 1
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions.append(f"{name} {key}: {base[key] * scale:.2f} -> {case[key] * scale:.2f} {unit} "
+                                   f"(+{change:.0%})")
+            label = name if key == "median_s" else f"{name} (memory)"
+            print(f"{label:<32} {base[key] * scale:>9.2f} {unit:<3}{case[key] * scale:>9.2f} {unit:<3}"
+                  f"{change:>+7.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analyzer, vocabulary/tokenizer loading and scraper.")
+    parser.add_argument("--output", type=pathlib.Path, help="write results as JSON to this file")
+    parser.add_argument("--compare", type=pathlib.Path, help="baseline JSON to check the results against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="relative slowdown/memory growth reported as a regression (default 0.15)")
+    parser.add_argument("--max-chars", type=int, default=CORPUS_SIZES[-1],
+                        help="largest analyzer corpus to run (default 10 MB)")
+    parser.add_argument("--html", type=pathlib.Path, nargs="*",
+                        help="HTML pages to extract (default: scripts/fixtures/*.html)")
+    args = parser.parse_args()
+
+    results = run_suite(args.max_chars, args.html or sorted(FIXTURES_DIR.glob("*.html")))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.compare}:")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.compare} (threshold {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
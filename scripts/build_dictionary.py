@@ -0,0 +1,23 @@
+import sys
+import time
+
+sys.path.append(".")
+from app.core import config
+from app.core.reference_loader import get_hsk_words, get_vocabulary_store
+from app.core.tokenizer import build_tokenizer, save_snapshot, snapshot_fingerprint
+
+# Build step: merges jieba's base dictionary, the HSK words and the forced
+# splits into one prefix dictionary and saves it where TextAnalyzer loads it
+# at startup (HANZ_TOKENIZER_SNAPSHOT). Run at image build / deploy time.
+
+def build_dictionary(path: str = None):
+    path = path or config.TOKENIZER_SNAPSHOT
+    store = get_vocabulary_store()
+
+    start = time.perf_counter()
+    tokenizer = build_tokenizer(get_hsk_words())
+    save_snapshot(tokenizer, snapshot_fingerprint(store.version), path)
+    print(f"Saved {len(tokenizer.FREQ)} entries to {path} in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    build_dictionary(sys.argv[1] if len(sys.argv) > 1 else None)
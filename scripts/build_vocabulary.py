@@ -0,0 +1,22 @@
+import os
+import sys
+import time
+
+sys.path.append(".")
+from app.core import config
+from app.core.reference_loader import HSK_LEVELS_DIR
+from app.core.vocab_store import build_artifact
+
+# Build step: compiles app/data/hsk_levels/hsk*.csv (as downloaded by
+# populate_data.py) into the memory-mappable binary vocabulary that
+# reference_loader reads at startup (HANZ_VOCAB_ARTIFACT). Run it after
+# changing the CSVs and at image build / deploy time.
+
+def build_vocabulary(path: str = None):
+    path = path or config.VOCAB_ARTIFACT
+    start = time.perf_counter()
+    count = build_artifact(HSK_LEVELS_DIR, path)
+    print(f"Compiled {count} words into {path} ({os.path.getsize(path)} bytes) in {time.perf_counter() - start:.3f}s")
+
+if __name__ == "__main__":
+    build_vocabulary(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,74 @@
+import argparse
+import asyncio
+import json
+import pathlib
+import sys
+
+sys.path.append(".")
+from app.core import config
+from app.core.analysis_cache import AnalysisCache
+from app.core.analyzer import TextAnalyzer
+from app.core.crawler import CrawlState, Crawler
+from app.core.scraper import WebScraper
+
+# Usage:
+#   python scripts/crawl_site.py https://example.com/sitemap.xml --output site.json
+#   python scripts/crawl_site.py https://example.com/rss.xml --concurrency 4 --host-interval-ms 1000
+#
+# Rates every article of an RSS/Atom feed or sitemap and prints the site-level
+# difficulty distribution. Progress is stored in --state after every page: run the
+# same command again after an interruption and only the remaining pages are fetched.
+
+
+async def crawl(args) -> dict:
+    analyzer = TextAnalyzer(cache=AnalysisCache() if config.ANALYSIS_CACHE_ENABLED else None)
+    scraper = WebScraper()
+    state = CrawlState(str(args.state) if args.state else None)
+    crawler = Crawler(
+        scraper,
+        lambda text: asyncio.to_thread(analyzer.analyze, text),
+        state,
+        concurrency=args.concurrency,
+        host_interval=args.host_interval_ms / 1000 if args.host_interval_ms is not None else None,
+        max_pages=args.max_pages,
+    )
+
+    def on_page(url, result, error):
+        status = result["difficulty_score"] if result else f"FAILED {error}"
+        print(f"  {status:<16} {url}")
+
+    try:
+        return await crawler.run(args.source, retry_failed=args.retry_failed, on_page=on_page)
+    finally:
+        await scraper.aclose()
+        state.close()
+        if analyzer.cache:
+            analyzer.cache.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rate every article of a feed or sitemap.")
+    parser.add_argument("source", help="RSS/Atom feed or sitemap URL")
+    parser.add_argument("--state", type=pathlib.Path, help="crawl progress database (default cache/crawl_state.sqlite3)")
+    parser.add_argument("--concurrency", type=int, help=f"pages in flight (default {config.CRAWL_CONCURRENCY})")
+    parser.add_argument("--host-interval-ms", type=int,
+                        help=f"min gap between requests to one host (default {config.CRAWL_HOST_INTERVAL_MS})")
+    parser.add_argument("--max-pages", type=int, help=f"page limit (default {config.CRAWL_MAX_PAGES})")
+    parser.add_argument("--retry-failed", action="store_true", help="fetch pages that failed last time again")
+    parser.add_argument("--output", type=pathlib.Path, help="write per-article results and the summary as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(crawl(args))
+    site = report["site"]
+    print(f"\n{site['articles']} articles rated, {site['failed']} failed, {site['pending']} pending")
+    print(f"Median difficulty: {site['median_difficulty']}")
+    for score, row in site["difficulty_distribution"].items():
+        if row["count"]:
+            print(f"  {score:<16} {row['count']:>6}  {row['share']:>7.1%}")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
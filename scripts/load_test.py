@@ -0,0 +1,327 @@
+import argparse
+import asyncio
+import json
+import os
+import pathlib
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+
+sys.path.append(".")
+from scripts.benchmark_suite import make_text
+
+# Usage:
+#   python scripts/load_test.py --concurrency 32 --duration 30
+#   python scripts/load_test.py --rate 200 --mix analyze=0.5,url=0.5 --latency-ms 300 --page-kb 512
+#   python scripts/load_test.py --target http://staging:8000 --concurrency 64
+#
+# Replays a mix of /api/v1/analyze and /api/v1/analyze/url traffic against a uvicorn
+# server (started here unless --target is given) and reports p50/p95/p99 latency,
+# throughput and error rate per endpoint. URL requests point at a local mock content
+# server that can add artificial latency and serve large pages.
+#
+# --concurrency runs a closed loop (N clients, each sending its next request when the
+# previous one returns); --rate runs an open loop (requests start on schedule however
+# slow the server is), which is what exposes queueing. A probe hits /health/live every
+# 100 ms throughout: its latency stays near zero unless the event loop is blocked.
+
+MOCK_PORT = 8002
+API_PORT = 8001
+PROBE_INTERVAL = 0.1
+
+
+class MockContentHandler(BaseHTTPRequestHandler):
+    """
+    Serves a generated Chinese article for any path. Query parameters override the
+    server defaults: latency_ms delays the response, kb sets the page size.
+    """
+    latency_ms = 0
+    page_kb = 8
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        latency_ms = float(query.get("latency_ms", [self.latency_ms])[0])
+        kb = int(query.get("kb", [self.page_kb])[0])
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+
+        body = mock_page(urlparse(self.path).path, kb)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@lru_cache(maxsize=256)
+def mock_page(path: str, kb: int) -> bytes:
+    """Article page of roughly `kb` KiB; the text depends on the path so pages differ."""
+    seed = sum(path.encode("utf-8"))
+    paragraphs = []
+    size = 0
+    while size < kb * 1024:
+        paragraph = f"<p>{make_text(200, seed=seed + len(paragraphs))}</p>"
+        paragraphs.append(paragraph)
+        size += len(paragraph.encode("utf-8"))
+    return (
+        "<html><head><title>Load Test Article</title></head><body>"
+        "<nav>Menu</nav><article><h1>测试文章</h1>"
+        + "".join(paragraphs)
+        + "</article><footer>Copyright</footer></body></html>"
+    ).encode("utf-8")
+
+
+def start_mock_server(port: int, latency_ms: float, page_kb: int) -> ThreadingHTTPServer:
+    MockContentHandler.latency_ms = latency_ms
+    MockContentHandler.page_kb = page_kb
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockContentHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_api_server(port: int, workers: int, no_cache: bool, cache_dir: str) -> subprocess.Popen:
+    env = dict(os.environ, HANZ_CACHE_DIR=cache_dir)
+    if no_cache:
+        env.update(HANZ_URL_CACHE="0", HANZ_ANALYSIS_CACHE="0")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_ready(base_url: str, timeout: float = 120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health/ready", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"API server at {base_url} not ready after {timeout}s")
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("analyze", "url"):
+            raise argparse.ArgumentTypeError(f"unknown request kind {name!r} (expected analyze, url)")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+class LoadGenerator:
+    def __init__(self, base_url: str, mock_url: str, mix: Dict[str, float], texts: List[str],
+                 pages: int, page_kb: Optional[int], latency_ms: Optional[float], seed: int = 0):
+        self.base_url = base_url
+        self.mock_url = mock_url
+        self.kinds = list(mix)
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.texts = texts
+        self.pages = pages
+        self.page_kb = page_kb
+        self.latency_ms = latency_ms
+        self.rng = random.Random(seed)
+        # kind -> list of (latency seconds, ok)
+        self.samples: Dict[str, List[tuple]] = {kind: [] for kind in self.kinds + ["probe"]}
+        self.errors: Dict[str, Dict[str, int]] = {kind: {} for kind in self.kinds + ["probe"]}
+
+    def next_request(self) -> tuple:
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        if kind == "analyze":
+            return kind, "/api/v1/analyze", {"content": self.rng.choice(self.texts)}
+        params = []
+        if self.page_kb is not None:
+            params.append(f"kb={self.page_kb}")
+        if self.latency_ms is not None:
+            params.append(f"latency_ms={self.latency_ms}")
+        query = "?" + "&".join(params) if params else ""
+        page = self.rng.randrange(self.pages)
+        return kind, "/api/v1/analyze/url", {"url": f"{self.mock_url}/article/{page}{query}"}
+
+    async def send(self, client: httpx.AsyncClient, kind: str, path: str, payload: Optional[dict]):
+        start = time.perf_counter()
+        error = None
+        try:
+            if payload is None:
+                response = await client.get(path)
+            else:
+                response = await client.post(path, json=payload)
+            if response.status_code >= 400:
+                error = str(response.status_code)
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        self.samples[kind].append((time.perf_counter() - start, error is None))
+        if error:
+            self.errors[kind][error] = self.errors[kind].get(error, 0) + 1
+
+    async def probe(self, client: httpx.AsyncClient, stop: asyncio.Event):
+        while not stop.is_set():
+            await self.send(client, "probe", "/health/live", None)
+            try:
+                await asyncio.wait_for(stop.wait(), PROBE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self, duration: float, concurrency: Optional[int], rate: Optional[float],
+                  timeout: float) -> float:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=1024)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=timeout, limits=limits) as client, \
+                httpx.AsyncClient(base_url=self.base_url, timeout=timeout) as probe_client:
+            stop = asyncio.Event()
+            probe = asyncio.create_task(self.probe(probe_client, stop))
+            start = time.perf_counter()
+            deadline = start + duration
+
+            if rate:
+                # Open loop: fixed schedule, requests pile up if the server falls behind
+                in_flight = set()
+                sent = 0
+                while True:
+                    due = start + sent / rate
+                    if due >= deadline:
+                        break
+                    await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                    task = asyncio.create_task(self.send(client, *self.next_request()))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+                    sent += 1
+                if in_flight:
+                    await asyncio.wait(in_flight)
+            else:
+                async def worker():
+                    while time.perf_counter() < deadline:
+                        await self.send(client, *self.next_request())
+                await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+            elapsed = time.perf_counter() - start
+            stop.set()
+            await probe
+            return elapsed
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        report = {}
+        load_kinds = [kind for kind in self.kinds if self.samples[kind]]
+        groups = {kind: self.samples[kind] for kind in load_kinds}
+        groups["all"] = [sample for kind in load_kinds for sample in self.samples[kind]]
+        groups["probe"] = self.samples["probe"]
+        for name, samples in groups.items():
+            latencies = sorted(latency for latency, _ in samples)
+            failures = sum(1 for _, ok in samples if not ok)
+            errors = self.errors.get(name)
+            if name == "all":
+                errors = {}
+                for kind in load_kinds:
+                    for error, count in self.errors[kind].items():
+                        errors[error] = errors.get(error, 0) + count
+            report[name] = {
+                "requests": len(samples),
+                "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+                "error_rate": round(failures / len(samples), 4) if samples else 0.0,
+                "errors": errors or {},
+                "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+                "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            }
+        return report
+
+
+def print_report(report: Dict[str, Any], elapsed: float):
+    print(f"\n{elapsed:.1f}s")
+    print(f"{'kind':<10} {'requests':>9} {'req/s':>9} {'errors':>8} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'max ms':>9}")
+    for name, row in report.items():
+        print(f"{name:<10} {row['requests']:>9} {row['throughput_rps']:>9.1f} {row['error_rate']:>8.2%} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}")
+        if row["errors"]:
+            print(f"{'':<10} errors: {row['errors']}")
+    probe = report.get("probe")
+    if probe and probe["p99_ms"] > 50:
+        print(f"\nWARNING: /health/live p99 {probe['p99_ms']:.0f} ms under load; "
+              f"something is blocking the event loop")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the analysis API.")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, default=16, help="closed loop: parallel clients (default 16)")
+    load.add_argument("--rate", type=float, help="open loop: requests per second")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of load (default 20)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("analyze=0.8,url=0.2"),
+                        help="request mix, e.g. analyze=0.8,url=0.2")
+    parser.add_argument("--text-chars", type=int, default=2000, help="size of /analyze texts (default 2000)")
+    parser.add_argument("--texts", type=int, default=1000,
+                        help="distinct /analyze texts; fewer means more result-cache hits (default 1000)")
+    parser.add_argument("--pages", type=int, default=1000,
+                        help="distinct mock URLs; fewer means more URL-cache hits (default 1000)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="mock server response delay (default 0)")
+    parser.add_argument("--page-kb", type=int, default=8, help="mock page size in KiB (default 8)")
+    parser.add_argument("--timeout", type=float, default=30, help="client timeout per request in seconds")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local server")
+    parser.add_argument("--no-cache", action="store_true", help="start the local server with all caches off")
+    parser.add_argument("--target", help="base URL of a running server instead of starting one")
+    parser.add_argument("--mock-host", default=f"http://127.0.0.1:{MOCK_PORT}",
+                        help="mock server URL as seen by the API server")
+    parser.add_argument("--output", type=pathlib.Path, help="write the report as JSON to this file")
+    args = parser.parse_args()
+
+    start_mock_server(urlparse(args.mock_host).port or MOCK_PORT, args.latency_ms, args.page_kb)
+    texts = [make_text(args.text_chars, seed=i) for i in range(args.texts)]
+
+    proc = None
+    with tempfile.TemporaryDirectory() as cache_dir:
+        base_url = args.target
+        if base_url is None:
+            base_url = f"http://127.0.0.1:{API_PORT}"
+            proc = start_api_server(API_PORT, args.workers, args.no_cache, cache_dir)
+        try:
+            wait_ready(base_url)
+            mode = f"{args.rate:g} req/s" if args.rate else f"{args.concurrency} clients"
+            print(f"Load: {mode} for {args.duration:g}s against {base_url}, mix {args.mix}")
+            # Page size and latency travel in the query string so they also apply to --target servers
+            generator = LoadGenerator(base_url, args.mock_host, args.mix, texts, args.pages,
+                                      args.page_kb, args.latency_ms or None)
+            elapsed = asyncio.run(generator.run(
+                args.duration, None if args.rate else args.concurrency, args.rate, args.timeout))
+        finally:
+            if proc:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+
+    report = generator.report(elapsed)
+    print_report(report, elapsed)
+    if args.output:
+        args.output.write_text(json.dumps({"elapsed_s": round(elapsed, 2), "args": {
+            k: v for k, v in vars(args).items() if k != "output"}, "results": report}, indent=2, default=str) + "\n")
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import argparse
+import http.server
+import json
+import os
+import pathlib
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from typing import Any, Dict, List
+
+sys.path.append(".")
+
+# Usage:
+#   python scripts/measure_footprint.py
+#   python scripts/measure_footprint.py --output footprint.json
+#
+# Cold-start cost of the API process, one fresh interpreter per configuration:
+#   - import:  `import app.main` only
+#   - ready:   uvicorn started, lifespan done (/health/ready answers 200)
+#   - text:    ready + one POST /api/v1/analyze (a text-only worker)
+#   - url:     ready + one POST /api/v1/analyze/url against a local page
+# For each: import time, time until ready, resident memory (VmRSS) and which heavy
+# libraries ended up imported. HANZ_* variables are passed through, so other
+# deployments can be measured as well (e.g. HANZ_ANALYSIS_CACHE=0).
+
+CONFIGURATIONS = ("import", "ready", "text", "url")
+HEAVY_MODULES = ("jieba", "numpy", "pandas", "trafilatura", "lxml", "httpx", "requests")
+GOLD_PATH = pathlib.Path(__file__).parent / "fixtures" / "segmentation_gold.txt"
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def sample_text() -> str:
+    lines = GOLD_PATH.read_text(encoding="utf-8").splitlines()
+    return "".join(line.replace(" ", "") for line in lines if line and not line.startswith("#"))
+
+def serve_page(text: str) -> str:
+    """Serves one HTML page with `text` from a background thread; returns its URL."""
+    body = f"<html><head><title>Footprint</title></head><body><article><p>{text}</p></article></body></html>"
+    page = body.encode("utf-8")
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", free_port()), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}/article.html"
+
+def post(base: str, path: str, payload: Dict[str, Any]):
+    request = urllib.request.Request(base + path, data=json.dumps(payload).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        if response.status != 200:
+            raise RuntimeError(f"{path} answered {response.status}")
+
+def measure(configuration: str) -> Dict[str, Any]:
+    """Runs in the child process."""
+    start = time.perf_counter()
+    import app.main
+    row = {"configuration": configuration, "import_ms": round((time.perf_counter() - start) * 1000, 1)}
+    if configuration != "import":
+        import uvicorn
+
+        port = free_port()
+        server = uvicorn.Server(uvicorn.Config(app.main.app, host="127.0.0.1", port=port, log_level="warning"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{port}"
+        while True:
+            try:
+                with urllib.request.urlopen(base + "/health/ready", timeout=1) as response:
+                    if response.status == 200:
+                        break
+            except OSError:
+                time.sleep(0.01)
+        row["ready_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+        text = sample_text()
+        if configuration == "text":
+            post(base, "/api/v1/analyze", {"content": text})
+        elif configuration == "url":
+            post(base, "/api/v1/analyze/url", {"url": serve_page(text)})
+        server.should_exit = True
+        thread.join()
+    row["rss_mb"] = round(rss_mb(), 1)
+    row["modules"] = [name for name in HEAVY_MODULES if name in sys.modules]
+    return row
+
+def run(configurations: List[str]) -> List[Dict[str, Any]]:
+    rows = []
+    for configuration in configurations:
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", configuration],
+            capture_output=True, text=True, check=True, env=dict(os.environ),
+        ).stdout
+        row = json.loads(output.strip().splitlines()[-1])
+        rows.append(row)
+        ready = f"{row['ready_ms']:>7.1f} ms" if "ready_ms" in row else f"{'-':>10}"
+        print(
+            f"{configuration:<7} import {row['import_ms']:>7.1f} ms | ready {ready} | "
+            f"RSS {row['rss_mb']:>6.1f} MB | {', '.join(row['modules'])}"
+        )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import time and memory of the API per configuration")
+    parser.add_argument("--configurations", nargs="+", default=list(CONFIGURATIONS), choices=CONFIGURATIONS)
+    parser.add_argument("--output", help="Write the measurements as JSON to this file")
+    parser.add_argument("--child", choices=CONFIGURATIONS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child)))
+        sys.exit(0)
+    results = run(args.configurations)
+    if args.output:
+        pathlib.Path(args.output).write_text(json.dumps(results, indent=2))
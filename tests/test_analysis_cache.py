@@ -0,0 +1,83 @@
+import os
+import sys
+import tempfile
+import unittest
+# Add project root to path
+sys.path.append(".")
+from app.core.analysis_cache import AnalysisCache, content_key
+from app.core.analyzer import TextAnalyzer
+
+class TestAnalysisCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "analysis_cache.sqlite3")
+        self.cache = AnalysisCache(path=self.path, memory_entries=2)
+        self.cache.set_version("v1")
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_content_key(self):
+        # Surrounding whitespace never changes the analysis
+        self.assertEqual(content_key("我是学生", "v1"), content_key("  我是学生\n", "v1"))
+        self.assertNotEqual(content_key("我是学生", "v1"), content_key("我是学生", "v2"))
+        self.assertNotEqual(content_key("\ud800我是学生", "v1"), content_key("我是学生", "v1"))
+
+    def test_memory_and_disk_tiers(self):
+        self.assertIsNone(self.cache.get("我是学生"))
+        self.cache.put("我是学生", {"total_tokens": 3})
+
+        self.assertEqual(self.cache.get("我是学生"), {"total_tokens": 3})
+        self.assertEqual(self.cache.stats["memory_hits"], 1)
+
+        # Another process sharing the file sees the entry through the disk tier
+        other = AnalysisCache(path=self.path)
+        other.set_version("v1")
+        try:
+            # The event-loop lookup leaves the disk alone
+            self.assertIsNone(other.get("我是学生", disk=False))
+            self.assertEqual(other.stats, {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0})
+            self.assertEqual(other.get("我是学生"), {"total_tokens": 3})
+            self.assertEqual(other.stats["disk_hits"], 1)
+            self.assertEqual(other.get("我是学生", disk=False), {"total_tokens": 3})
+        finally:
+            other.close()
+
+    def test_version_change_invalidates(self):
+        self.cache.put("我是学生", {"total_tokens": 3})
+        self.cache.set_version("v2")
+
+        self.assertIsNone(self.cache.get("我是学生"))
+        # A worker still on the old version keeps its entries
+        other = AnalysisCache(path=self.path)
+        try:
+            other.set_version("v1")
+            self.assertEqual(other.get("我是学生"), {"total_tokens": 3})
+        finally:
+            other.close()
+
+    def test_disk_eviction(self):
+        cache = AnalysisCache(path=os.path.join(self.tmp.name, "small.sqlite3"), max_entries=5)
+        cache.set_version("v1")
+        try:
+            for i in range(8):
+                cache.put(f"text {i}", {"total_tokens": i})
+            cache._evict()
+            self.assertEqual(cache.stats["evictions"], 3)
+            self.assertEqual(cache.db.execute("SELECT COUNT(*) FROM analyses").fetchone()[0], 5)
+        finally:
+            cache.close()
+
+    def test_analyzer_memoizes(self):
+        analyzer = TextAnalyzer(cache=self.cache)
+        first = analyzer.analyze("我是学生")
+        first["total_tokens"] = -1  # mutating a result must not poison the cache
+        second = analyzer.analyze("我是学生")
+
+        self.assertEqual(second["total_tokens"], 3)
+        self.assertEqual(self.cache.stats["misses"], 1)
+        self.assertEqual(self.cache.stats["memory_hits"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
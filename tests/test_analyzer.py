@@ -38,6 +38,18 @@ class TestTextAnalyzer(unittest.TestCase):
         self.assertEqual(result["hsk_1_coverage"], 1.0)
         self.assertEqual(result["difficulty_score"], "A1")
 
+    def test_lone_surrogate(self):
+        # "\ud800" is a valid JSON string; it must not break the analysis
+        result = self.analyzer.analyze("\ud800我是学生")
+        self.assertEqual(result["difficulty_score"], "A1")
+        self.assertEqual(result["total_characters"], 4)
+
+    def test_analyze_counted(self):
+        result, counts, words = self.analyzer.analyze_counted("我是学生，我是学生。")
+        self.assertEqual(result, self.analyzer.analyze("我是学生，我是学生。"))
+        self.assertEqual(counts[1], 6)
+        self.assertEqual(words, {"我", "是", "学生"})
+
     def test_analyze_mixed(self):
         # HSK1: 苹果 (Actually we put Apple in HSK2 in our mock)
         # HSK2: 苹果
@@ -93,5 +105,18 @@ class TestTextAnalyzer(unittest.TestCase):
         self.assertEqual(result["total_tokens"], 3)
         self.assertAlmostEqual(result["hsk_1_coverage"], 0.6667, places=3)
 
+    def test_character_coverage(self):
+        # 王明 is an unknown word, but 明 is an HSK1 character (明天) and 王 an HSK5 one (王子)
+        result = self.analyzer.analyze("王明：这是？")
+        self.assertEqual(result["total_characters"], 4)
+        self.assertEqual(result["character_coverage"]["hsk_1_coverage"], 0.75)
+        self.assertEqual(result["character_coverage"]["hsk_5_coverage"], 0.25)
+        self.assertEqual(result["character_coverage"]["unknown_coverage"], 0.0)
+
+        # No Chinese characters at all
+        result = self.analyzer.analyze("StrangeWord 123 !!")
+        self.assertEqual(result["total_characters"], 0)
+        self.assertEqual(result["character_coverage"]["unknown_coverage"], 0.0)
+
 if __name__ == '__main__':
     unittest.main()
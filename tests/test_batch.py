@@ -0,0 +1,118 @@
+import asyncio
+import sys
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+import unittest
+from unittest.mock import patch
+# Add project root to path
+sys.path.append(".")
+from app.core.analyzer import TextAnalyzer
+from app.core.batch import BatchAnalyzer
+
+class TestBatchAnalyzer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.batch = BatchAnalyzer(max_workers=2)
+        cls.analyzer = TextAnalyzer()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.batch.shutdown()
+
+    def test_results_in_input_order(self):
+        texts = ["我是学生", "王明：这是？", "", "StrangeWord 123 !!"] * 5
+        items = self.batch.analyze_many(texts)
+
+        self.assertEqual([item["index"] for item in items], list(range(len(texts))))
+        for text, item in zip(texts, items):
+            self.assertIsNone(item["error"])
+            self.assertEqual(item["result"], self.analyzer.analyze(text))
+
+    def test_per_item_error(self):
+        # A non-string input fails inside jieba; the rest of the batch still succeeds.
+        items = self.batch.analyze_many(["我是学生", object(), "我是学生"])
+
+        self.assertIsNone(items[0]["error"])
+        self.assertIsNotNone(items[1]["error"])
+        self.assertIsNone(items[1]["result"])
+        self.assertEqual(items[2]["result"]["total_tokens"], 3)
+
+    @patch('app.core.batch.config.PARALLEL_MIN_PIECE_CHARS', 100)
+    @patch('app.core.batch.config.PARALLEL_THRESHOLD_CHARS', 1000)
+    def test_parallel_document(self):
+        text = "我是学生。王明：这是？今天天气很好，我们去公园散步吧！StrangeWord 123 !!\n" * 200
+        self.assertTrue(self.batch.should_split(text))
+        self.assertFalse(self.batch.should_split(text[:500]))
+        self.assertGreater(len(self.batch._pieces(text)), 1)
+
+        result = asyncio.run(self.batch.analyze_document_async(text, self.analyzer))
+
+        self.assertEqual(result, self.analyzer.analyze(text))
+
+        # The merged counts behind the result are the whole text's (what the corpus index stores)
+        result, counts, words = asyncio.run(self.batch.count_document_async(text, self.analyzer))
+        _, expected_counts, expected_words = self.analyzer.analyze_counted(text)
+        self.assertEqual(counts, expected_counts)
+        self.assertEqual(words, expected_words)
+        self.assertEqual(sum(counts), result["total_tokens"])
+
+    @patch('app.core.batch.config.PARALLEL_MIN_PIECE_CHARS', 100)
+    def test_pieces_from_different_versions_are_recounted(self):
+        class FakePool:
+            """Counts every piece as one HSK 1 word, under the given versions in turn."""
+            def __init__(self, versions):
+                self.versions = versions
+
+            def submit(self, fn, piece, segmenter):
+                future = Future()
+                future.set_result(([0, 1, 0, 0, 0, 0, 0], {piece}, [0] * 7, self.versions.pop(0)))
+                return future
+
+            def shutdown(self, wait=True, cancel_futures=False):
+                pass
+
+        class FakeBatch(BatchAnalyzer):
+            @property
+            def pool(self):
+                if self._pool is None:
+                    self._pool = pools.pop(0)
+                return self._pool
+
+        new_version = self.analyzer.version
+        # First round straddles a reload; the recycled pool runs on the new data only
+        pools = [FakePool(["old"] + [new_version] * 10), FakePool([new_version] * 10)]
+        result = asyncio.run(FakeBatch(max_workers=2).analyze_document_async("我是学生。" * 100, TextAnalyzer()))
+        self.assertEqual(result["vocabulary_version"], new_version)
+        self.assertEqual(pools, [])
+
+    def test_broken_pool_is_replaced(self):
+        class BrokenPool:
+            """A pool one of whose workers died earlier: submit() raises right away."""
+            def submit(self, *args):
+                raise BrokenProcessPool("A child process terminated abruptly")
+
+            def shutdown(self, wait=True, cancel_futures=False):
+                pass
+
+        batch = BatchAnalyzer(max_workers=2)
+        batch._pool = BrokenPool()
+        try:
+            items = asyncio.run(batch.analyze_many_async(["我是学生"]))
+        finally:
+            batch.shutdown()
+        self.assertEqual(items[0]["result"], self.analyzer.analyze("我是学生"))
+
+        # Broken again right away: given up after one fresh pool
+        class AlwaysBroken(BatchAnalyzer):
+            @property
+            def pool(self):
+                return BrokenPool()
+
+        with self.assertRaises(BrokenProcessPool):
+            asyncio.run(AlwaysBroken(max_workers=2).analyze_many_async(["我是学生"]))
+
+    def test_empty_batch(self):
+        self.assertEqual(self.batch.analyze_many([]), [])
+
+if __name__ == '__main__':
+    unittest.main()
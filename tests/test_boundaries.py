@@ -0,0 +1,32 @@
+import sys
+import unittest
+# Add project root to path
+sys.path.append(".")
+from app.core.analyzer import TextAnalyzer
+from app.core.boundaries import cut_position, split_text
+
+class TestBoundaries(unittest.TestCase):
+    def test_cut_position(self):
+        self.assertEqual(cut_position("我是学生。我是"), 5)
+        # No sentence end: after the last non-han character ("，")
+        self.assertEqual(cut_position("我是学生，我是"), 5)
+        # "." belongs to jieba's han class (3.14), so it is never a cut point
+        self.assertEqual(cut_position("3.14"), 0)
+
+    def test_split_text(self):
+        text = "我是学生。今天天气很好，我们去公园散步吧！" * 100
+        pieces = split_text(text, 50)
+
+        self.assertEqual("".join(pieces), text)
+        self.assertTrue(all(len(piece) <= 50 for piece in pieces))
+
+        tokenizer = TextAnalyzer().tokenizer
+        tokens = [token for piece in pieces for token in tokenizer.lcut(piece)]
+        self.assertEqual(tokens, tokenizer.lcut(text))
+
+    def test_split_without_boundary(self):
+        # One long han run can't be cut; it is kept whole
+        self.assertEqual(split_text("学生" * 50, 10), ["学生" * 50])
+
+if __name__ == '__main__':
+    unittest.main()
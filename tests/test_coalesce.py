@@ -0,0 +1,64 @@
+import asyncio
+import sys
+import unittest
+# Add project root to path
+sys.path.append(".")
+from app.core.coalesce import Coalescer
+
+class TestCoalescer(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_calls_share_one_computation(self):
+        coalescer = Coalescer()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return {"total_tokens": 3}
+
+        results = await asyncio.gather(*(coalescer.run("key", compute) for _ in range(10)))
+        self.assertEqual(calls, 1)
+        self.assertTrue(all(result == {"total_tokens": 3} for result in results))
+        self.assertEqual(coalescer.stats, {"started": 1, "coalesced": 9})
+        self.assertEqual(coalescer.inflight, 0)
+
+        # Finished computations are not remembered
+        await coalescer.run("key", compute)
+        self.assertEqual(calls, 2)
+
+    async def test_different_keys_run_separately(self):
+        coalescer = Coalescer()
+        results = await asyncio.gather(
+            coalescer.run("a", lambda: asyncio.sleep(0.01, result="a")),
+            coalescer.run("b", lambda: asyncio.sleep(0.01, result="b")),
+        )
+        self.assertEqual(results, ["a", "b"])
+        self.assertEqual(coalescer.stats["coalesced"], 0)
+
+    async def test_errors_reach_every_waiter(self):
+        coalescer = Coalescer()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("origin down")
+
+        results = await asyncio.gather(*(coalescer.run("key", fail) for _ in range(3)), return_exceptions=True)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(coalescer.inflight, 0)
+
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        coalescer = Coalescer()
+
+        async def compute():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.create_task(coalescer.run("key", compute))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(coalescer.run("key", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        self.assertEqual(await second, "done")
+
+if __name__ == '__main__':
+    unittest.main()
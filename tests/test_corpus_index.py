@@ -0,0 +1,95 @@
+import os
+import sys
+import tempfile
+import unittest
+# Add project root to path
+sys.path.append(".")
+from app.core.corpus_index import CorpusIndex
+
+class TestCorpusIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "corpus.sqlite3")
+        self.index = CorpusIndex(self.path)
+        # counts: [unknown, hsk_1 .. hsk_6]
+        self.easy = self.index.add("text:easy", [0, 90, 8, 2, 0, 0, 0], ["我", "是", "学生", "环境"], "A1",
+                                   "v1")
+        self.medium = self.index.add("url:http://example.com/b", [2, 50, 20, 20, 8, 0, 0], ["经济", "环境"], "B1",
+                                     "v1", url="http://example.com/b", title="B")
+        self.hard = self.index.add("text:hard", [30, 20, 10, 10, 10, 10, 10], ["全球化", "经济"], "Unknown (>20%)",
+                                   "v1")
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def ids(self, found):
+        return [document["id"] for document in found["documents"]]
+
+    def test_coverage_threshold(self):
+        # HSK 1-3 covers 100% / 90% / 40%
+        found = self.index.query(max_level=3, min_coverage=0.95)
+        self.assertEqual((found["total"], self.ids(found)), (1, [self.easy]))
+        found = self.index.query(max_level=3, min_coverage=0.85)
+        self.assertEqual(self.ids(found), [self.easy, self.medium])
+        self.assertEqual(found["documents"][1]["target_coverage"], 0.9)
+        self.assertEqual(found["documents"][1]["title"], "B")
+        self.assertEqual(found["documents"][1]["hsk_4_coverage"], 0.08)
+
+        found = self.index.query(max_unknown=0.1)
+        self.assertEqual(self.ids(found), [self.easy, self.medium])
+
+    def test_ranking_and_paging(self):
+        # HSK 1 coverage: 0.9, 0.5, 0.2
+        found = self.index.query(target_level=1, limit=2)
+        self.assertEqual((found["total"], self.ids(found)), (3, [self.easy, self.medium]))
+        found = self.index.query(target_level=1, limit=2, offset=2)
+        self.assertEqual(self.ids(found), [self.hard])
+
+    def test_include_words(self):
+        self.assertEqual(self.ids(self.index.query(include_words=["环境"])), [self.easy, self.medium])
+        self.assertEqual(self.ids(self.index.query(include_words=["环境", "经济"])), [self.medium])
+        self.assertEqual(self.index.query(include_words=["环境", "从来没有"])["total"], 0)
+
+    def test_replace_and_other_workers(self):
+        other = CorpusIndex(self.path)
+        try:
+            self.assertEqual(other.query()["total"], 3)
+            # Another worker re-indexes the page after it changed
+            self.assertEqual(other.add("url:http://example.com/b", [0, 100, 0, 0, 0, 0, 0], ["天气"], "A1",
+                                       "v1"), self.medium)
+            found = self.index.query(max_level=1, min_coverage=1.0)
+            self.assertEqual(self.ids(found), [self.medium])
+            self.assertEqual(self.index.query(include_words=["经济"])["total"], 1)
+            self.assertEqual(self.index.query(include_words=["天气"])["total"], 1)
+            self.assertTrue(self.index.contains("text:hard"))
+            self.assertFalse(self.index.contains("text:missing"))
+            self.assertEqual(self.index.stats()["documents"], 3)
+        finally:
+            other.close()
+
+    def test_evicts_least_recently_indexed(self):
+        other = CorpusIndex(self.path, max_documents=3)
+        try:
+            self.assertEqual(self.index.query()["total"], 3)
+            # Re-indexing "easy" makes "medium" the oldest; a fourth document evicts it
+            other.add("text:easy", [0, 90, 8, 2, 0, 0, 0], ["我", "是", "学生", "环境"], "A1", "v1")
+            newest = other.add("text:new", [0, 10, 0, 0, 0, 0, 0], ["天气"], "A1", "v1")
+            self.assertEqual(other.stats()["documents"], 3)
+            self.assertFalse(other.contains("url:http://example.com/b"))
+
+            # A worker that mirrored the evicted document drops it too
+            found = self.index.query(target_level=1)
+            self.assertEqual(sorted(self.ids(found)), sorted([self.easy, self.hard, newest]))
+            self.assertEqual(self.index.query(include_words=["经济"])["total"], 1)
+
+            # Evicting "hard" leaves 经济 and 全球化 in no document: the words go too
+            other.add("text:newer", [0, 10, 0, 0, 0, 0, 0], ["天气"], "A1", "v1")
+            words = {row[0] for row in other.db.execute("SELECT word FROM words")}
+            self.assertEqual(words, {"我", "是", "学生", "环境", "天气"})
+            self.assertEqual(other.stats(), {"documents": 3, "words": 5})
+        finally:
+            other.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+import asyncio
+import gzip
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+# Add project root to path
+sys.path.append(".")
+from app.core.crawler import CrawlState, Crawler, HostRateLimiter, parse_feed, site_summary
+from app.core.scraper import WebScraper
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>News</title>
+  <item><title>One</title><link>http://example.com/a/1</link></item>
+  <item><title>Two</title><link> /a/2 </link></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>News</title>
+  <entry><link rel="self" href="http://example.com/api/1"/><link rel="alternate" href="http://example.com/a/1"/></entry>
+  <entry><link href="http://example.com/a/2"/></entry>
+</feed>"""
+
+SITEMAP_INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>/sitemap-1.xml</loc></sitemap>
+</sitemapindex>"""
+
+ARTICLE = "<html><head><title>文章{n}</title></head><body><nav>Menu</nav><article><h1>文章{n}</h1><p>{text}</p></article></body></html>"
+
+class MockSite(BaseHTTPRequestHandler):
+    """Sitemap index -> sitemap -> 4 articles, in the style of verify_url_flow.py; page 4 is missing."""
+    requests = []
+
+    def do_GET(self):
+        MockSite.requests.append((time.monotonic(), self.path))
+        if self.path == "/sitemap.xml":
+            body, content_type = SITEMAP_INDEX, "application/xml"
+        elif self.path == "/sitemap-1.xml":
+            urls = "".join(f"<url><loc>/article/{n}</loc></url>" for n in range(1, 5))
+            body = gzip.compress(f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'.encode())
+            content_type = "application/x-gzip"
+        elif self.path in ("/article/1", "/article/2", "/article/3"):
+            text = "我是学生。今天天气很好，我们去公园散步吧。" * 5
+            if self.path == "/article/3":
+                text = "经济全球化对发展中国家既是机遇也是挑战。" * 5
+            body, content_type = ARTICLE.format(n=self.path[-1], text=text).encode("utf-8"), "text/html; charset=utf-8"
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestParseFeed(unittest.TestCase):
+    def test_rss(self):
+        pages, sitemaps = parse_feed(RSS, base_url="http://example.com/feed")
+        self.assertEqual(pages, ["http://example.com/a/1", "http://example.com/a/2"])
+        self.assertEqual(sitemaps, [])
+
+    def test_atom_prefers_alternate_link(self):
+        pages, _ = parse_feed(ATOM)
+        self.assertEqual(pages, ["http://example.com/a/1", "http://example.com/a/2"])
+
+    def test_gzipped_sitemap_index(self):
+        pages, sitemaps = parse_feed(gzip.compress(SITEMAP_INDEX), base_url="http://example.com/sitemap.xml")
+        self.assertEqual((pages, sitemaps), ([], ["http://example.com/sitemap-1.xml"]))
+
+    def test_image_sitemap_locs_are_not_pages(self):
+        sitemap = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+  <url><loc>http://example.com/article</loc>
+    <image:image><image:loc>http://example.com/pic.jpg</image:loc></image:image></url>
+</urlset>"""
+        self.assertEqual(parse_feed(sitemap), (["http://example.com/article"], []))
+
+    def test_gzip_expansion_is_capped(self):
+        with patch("app.core.crawler.config.SCRAPER_MAX_BYTES", 1000):
+            with self.assertRaises(ValueError):
+                parse_feed(gzip.compress(b"<urlset>" + b" " * 100_000 + b"</urlset>"))
+            self.assertEqual(parse_feed(gzip.compress(SITEMAP_INDEX)), ([], ["/sitemap-1.xml"]))
+
+    def test_not_a_feed(self):
+        with self.assertRaises(ValueError):
+            parse_feed(b"<html><body>hi</body></html>")
+        with self.assertRaises(ValueError):
+            parse_feed(b"not xml")
+
+class TestSiteSummary(unittest.TestCase):
+    def test_distribution_and_weighted_coverage(self):
+        pages = [
+            {"status": "done", "result": {"difficulty_score": "A1", "total_tokens": 30, "hsk_1_coverage": 1.0}},
+            {"status": "done", "result": {"difficulty_score": "A1", "total_tokens": 10, "hsk_1_coverage": 0.5,
+                                          "unknown_coverage": 0.5}},
+            {"status": "done", "result": {"difficulty_score": "C1", "total_tokens": 60, "hsk_5_coverage": 1.0}},
+            {"status": "failed", "result": None},
+        ]
+        site = site_summary(pages)
+        self.assertEqual((site["articles"], site["failed"], site["total_tokens"]), (3, 1, 100))
+        self.assertEqual(site["difficulty_distribution"]["A1"], {"count": 2, "share": 0.6667})
+        self.assertEqual(site["median_difficulty"], "A1")
+        self.assertEqual(site["coverage"]["hsk_1_coverage"], 0.35)
+        self.assertEqual(site["coverage"]["hsk_5_coverage"], 0.6)
+        self.assertEqual(site["coverage"]["unknown_coverage"], 0.05)
+
+class TestHostRateLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_spaces_requests_per_host(self):
+        limiter = HostRateLimiter(0.05)
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.wait("http://a.example/x") for _ in range(3)))
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+        start = time.monotonic()
+        await limiter.wait("http://b.example/x")
+        self.assertLess(time.monotonic() - start, 0.04)
+
+class TestCrawler(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), MockSite)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    async def asyncSetUp(self):
+        from app.core.analyzer import TextAnalyzer
+        MockSite.requests = []
+        self.tmp = tempfile.TemporaryDirectory()
+        self.state = CrawlState(os.path.join(self.tmp.name, "crawl.sqlite3"))
+        self.scraper = WebScraper()
+        self.analyzer = TextAnalyzer()
+
+    async def asyncTearDown(self):
+        await self.scraper.aclose()
+        self.state.close()
+        self.tmp.cleanup()
+
+    def crawler(self, **kwargs):
+        return Crawler(self.scraper, lambda text: asyncio.to_thread(self.analyzer.analyze, text), self.state,
+                       concurrency=4, **kwargs)
+
+    async def test_crawl_sitemap(self):
+        seen = []
+        report = await self.crawler(host_interval=0.02).run(
+            f"{self.base}/sitemap.xml", on_page=lambda url, result, error: seen.append(url))
+
+        self.assertEqual(len(seen), 4)
+        pages = report["pages"]
+        self.assertEqual([page["url"] for page in pages], [f"{self.base}/article/{n}" for n in range(1, 5)])
+        self.assertEqual([page["status"] for page in pages], ["done", "done", "done", "failed"])
+        self.assertEqual(pages[0]["result"]["title"], "文章1")
+        self.assertEqual(pages[0]["result"]["url"], f"{self.base}/article/1")
+        self.assertGreater(pages[0]["result"]["total_tokens"], 0)
+        self.assertEqual(pages[3]["error"], "Scraping failed: Failed to download content.")
+        self.assertEqual((report["site"]["articles"], report["site"]["failed"]), (3, 1))
+
+        # Article requests to the one host were spaced out
+        starts = sorted(at for at, path in MockSite.requests if path.startswith("/article/"))
+        self.assertGreaterEqual(starts[-1] - starts[0], 0.05)
+
+    async def test_resume_after_interruption(self):
+        source = f"{self.base}/sitemap.xml"
+        # An earlier run got through the first two articles before it was stopped
+        self.state.add(source, [f"{self.base}/article/{n}" for n in range(1, 5)])
+        for n in (1, 2):
+            self.state.finish(source, f"{self.base}/article/{n}", {"difficulty_score": "A1", "total_tokens": 1})
+
+        report = await self.crawler(host_interval=0).run(source)
+        fetched = sorted(path for _, path in MockSite.requests if path.startswith("/article/"))
+        self.assertEqual(fetched, ["/article/3", "/article/4"])
+        self.assertEqual(report["site"]["articles"], 3)
+
+        # Failed pages are only retried on request
+        MockSite.requests = []
+        await self.crawler(host_interval=0).run(source)
+        self.assertFalse([path for _, path in MockSite.requests if path.startswith("/article/")])
+        await self.crawler(host_interval=0).run(source, retry_failed=True)
+        self.assertEqual([path for _, path in MockSite.requests if path.startswith("/article/")], ["/article/4"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+import sys
+import threading
+import time
+import unittest
+# Add project root to path
+sys.path.append(".")
+from app.core import metrics
+from app.core.executor import AnalysisExecutor, ExecutorSaturated
+
+class TestAnalysisExecutor(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.executor = AnalysisExecutor(max_workers=1, max_queue=1)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    async def test_runs_off_the_event_loop(self):
+        loop_thread = threading.get_ident()
+        worker_thread = await self.executor.run(threading.get_ident)
+        self.assertNotEqual(worker_thread, loop_thread)
+        self.assertEqual(self.executor.stats["completed"], 1)
+        self.assertEqual(self.executor.pending, 0)
+
+    async def test_event_loop_stays_responsive(self):
+        task = asyncio.create_task(self.executor.run(time.sleep, 0.3))
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        self.assertLess(time.perf_counter() - start, 0.2)
+        await task
+
+    async def test_rejects_when_full(self):
+        release = threading.Event()
+        running = asyncio.create_task(self.executor.run(release.wait))
+        queued = asyncio.create_task(self.executor.run(release.wait))
+        await asyncio.sleep(0.05)
+
+        with self.assertRaises(ExecutorSaturated) as ctx:
+            await self.executor.run(release.wait)
+        self.assertGreaterEqual(ctx.exception.retry_after, 1)
+        with self.assertRaises(ExecutorSaturated):
+            self.executor.check_capacity()
+        self.assertEqual(self.executor.stats["rejected"], 2)
+
+        # Follow-up work of an admitted request still queues
+        admitted = asyncio.create_task(self.executor.run(release.wait, admitted=True))
+        release.set()
+        await asyncio.gather(running, queued, admitted)
+        self.executor.check_capacity()
+
+    async def test_errors_propagate(self):
+        with self.assertRaises(ZeroDivisionError):
+            await self.executor.run(lambda: 1 / 0)
+        self.assertEqual(self.executor.pending, 0)
+
+    async def test_cancelled_caller_keeps_slot_until_done(self):
+        release = threading.Event()
+        running = asyncio.create_task(self.executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        # The client went away, but the thread is still busy with the work
+        running.cancel()
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.executor.pending, 1)
+        release.set()
+        for _ in range(100):
+            if self.executor.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(self.executor.pending, 0)
+
+    async def test_request_context_is_kept(self):
+        stages = {}
+        token = metrics._request_stages.set(stages)
+        try:
+            def work():
+                with metrics.stage("segment"):
+                    pass
+            await self.executor.run(work)
+        finally:
+            metrics._request_stages.reset(token)
+        self.assertIn("segment", stages)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+# Add project root to path
+sys.path.append(".")
+
+# Libraries only some endpoints need; importing the API must not pull them in
+LAZY_MODULES = ("pandas", "trafilatura", "lxml", "httpx")
+
+class TestFootprint(unittest.TestCase):
+    def test_api_import_is_lean(self):
+        # A fresh interpreter: this test process has imported most of these already
+        code = (
+            "import json, sys\n"
+            "import app.main\n"
+            f"print(json.dumps([name for name in {LAZY_MODULES!r} if name in sys.modules]))\n"
+            "print(json.dumps(app.main.analyzer._state is None))\n"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                    env=dict(os.environ, HANZ_CACHE_DIR=tmp)).stdout
+        imported, lazy_state = [json.loads(line) for line in output.strip().splitlines()[-2:]]
+        self.assertEqual(imported, [])
+        # Vocabulary and tokenizer are loaded at startup, not at import
+        self.assertTrue(lazy_state)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+# Add project root to path
+sys.path.append(".")
+from app.core.jobs import JobRunner, JobStore
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestJobStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "jobs.sqlite3")
+        self.clock = FakeClock()
+        self.store = JobStore(self.path, lease_seconds=60, ttl=3600, clock=self.clock)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_lifecycle(self):
+        job_id = self.store.create([("url", "http://example.com"), ("text", "我是学生")])
+        job = self.store.get(job_id)
+        self.assertEqual((job["status"], job["total"], job["completed"]), ("queued", 2, 0))
+        self.assertEqual(job["items"][0]["url"], "http://example.com")
+        self.assertIsNone(job["items"][1]["url"])
+
+        first = self.store.claim()
+        self.assertEqual((first["index"], first["kind"]), (0, "url"))
+        self.store.finish(job_id, 0, error="Scraping failed")
+        second = self.store.claim()
+        self.assertEqual(self.store.get(job_id)["status"], "running")
+        self.store.finish(job_id, second["index"], result={"total_tokens": 3})
+        self.assertIsNone(self.store.claim())
+
+        job = self.store.get(job_id)
+        self.assertEqual((job["status"], job["completed"], job["failed"]), ("completed", 1, 1))
+        self.assertEqual(job["items"][0]["error"], "Scraping failed")
+        self.assertEqual(job["items"][1]["result"], {"total_tokens": 3})
+        self.assertIsNone(self.store.get("unknown"))
+
+    def test_expired_lease_is_reclaimed_after_restart(self):
+        job_id = self.store.create([("text", "我是学生")])
+        self.assertIsNotNone(self.store.claim())
+        self.store.close()
+
+        # A new process opening the same file: the claim is still leased
+        store = JobStore(self.path, lease_seconds=60, clock=self.clock)
+        self.assertIsNone(store.claim())
+        self.clock.now += 61
+        item = store.claim()
+        self.assertEqual(item["job_id"], job_id)
+        store.close()
+
+    def test_item_fails_after_max_attempts(self):
+        job_id = self.store.create([("text", "崩溃")])
+        store = JobStore(self.path, lease_seconds=60, max_attempts=2, clock=self.clock)
+        try:
+            # Two claims whose workers never finish
+            for _ in range(2):
+                self.assertIsNotNone(store.claim())
+                self.clock.now += 61
+            self.assertIsNone(store.claim())
+            job = store.get(job_id)
+            self.assertEqual((job["status"], job["failed"]), ("completed", 1))
+            self.assertIn("2 attempts", job["items"][0]["error"])
+        finally:
+            store.close()
+
+    def test_purge(self):
+        old = self.store.create([("text", "a")])
+        item = self.store.claim()
+        self.store.finish(item["job_id"], item["index"], {"total_tokens": 1}, None)
+        backlogged = self.store.create([("text", "b"), ("text", "c")])
+        item = self.store.claim()
+        self.store.finish(item["job_id"], item["index"], {"total_tokens": 1}, None)
+        self.clock.now += 3601
+        new = self.store.create([("text", "d")])
+
+        # Only the job that finished more than `ttl` ago; "c" of the other one is still pending
+        self.assertEqual(self.store.purge(), 1)
+        self.assertIsNone(self.store.get(old))
+        self.assertEqual(self.store.get(backlogged)["completed"], 1)
+        self.assertIsNotNone(self.store.get(new))
+
+        # Finished now: kept for another `ttl`
+        item = self.store.claim()
+        self.store.finish(item["job_id"], item["index"], {"total_tokens": 1}, None)
+        self.assertEqual(self.store.purge(), 0)
+        self.clock.now += 3601
+        self.assertEqual(self.store.purge(), 1)
+        self.assertIsNone(self.store.get(backlogged))
+
+class TestJobRunner(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = JobStore(os.path.join(self.tmp.name, "jobs.sqlite3"))
+
+    async def asyncTearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    async def test_processes_all_items(self):
+        active, peak = 0, 0
+
+        async def process(kind, value):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            if value == "bad":
+                raise ValueError("bad input")
+            return {"kind": kind, "length": len(value)}
+
+        runner = JobRunner(self.store, process, concurrency=2, poll_interval=0.05)
+        runner.start()
+        try:
+            job_id = self.store.create([("text", "我是学生")] * 5 + [("text", "bad")])
+            runner.notify()
+            for _ in range(200):
+                job = self.store.get(job_id)
+                if job["status"] == "completed":
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await runner.stop()
+
+        self.assertEqual((job["status"], job["completed"], job["failed"]), ("completed", 5, 1))
+        self.assertEqual(job["items"][0]["result"], {"kind": "text", "length": 4})
+        self.assertEqual(job["items"][5]["error"], "bad input")
+        self.assertLessEqual(peak, 2)
+
+    async def test_worker_survives_store_errors(self):
+        store = self.store
+        claims = 0
+        real_claim = store.claim
+
+        def flaky_claim():
+            nonlocal claims
+            claims += 1
+            if claims == 1:
+                raise sqlite3.OperationalError("database is locked")
+            return real_claim()
+
+        async def process(kind, value):
+            # A result that can't be stored: finish() raises, the item stays claimed
+            return {"value": object()} if value == "unstorable" else {"length": len(value)}
+
+        runner = JobRunner(store, process, concurrency=1, poll_interval=0.01)
+        with patch.object(store, "claim", side_effect=flaky_claim), self.assertLogs("app.core.jobs") as logs:
+            runner.start()
+            try:
+                job_id = store.create([("text", "unstorable"), ("text", "我是学生")])
+                for _ in range(200):
+                    job = store.get(job_id)
+                    if job["completed"]:
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                await runner.stop()
+
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(job["items"][1]["result"], {"length": 4})
+        self.assertEqual(job["items"][0]["status"], "running")
+
+if __name__ == '__main__':
+    unittest.main()
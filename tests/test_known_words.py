@@ -0,0 +1,109 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+# Add project root to path
+sys.path.append(".")
+import numpy as np
+from app.core.known_words import KnownWordStore, _known_block as score_block, known_coverage
+
+VOCABULARY = ["我", "是", "学生", "老师", "天气", "经济", "全球化"]
+
+class TestKnownWordStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "known.sqlite3")
+        self.store = KnownWordStore(self.path)
+        self.store.assign_ids(VOCABULARY)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_update_modes(self):
+        count, unrecognized = self.store.update("u1", ["我", "是", "学生", "火星文"])
+        self.assertEqual((count, unrecognized), (3, ["火星文"]))
+        self.assertEqual(self.store.update("u1", ["老师"], mode="add")[0], 4)
+        self.assertEqual(self.store.update("u1", ["是"], mode="remove")[0], 3)
+        self.assertEqual(self.store.words(self.store.get("u1")), ["我", "学生", "老师"])
+        self.assertEqual(self.store.update("u1", ["经济"])[0], 1)
+        with self.assertRaises(ValueError):
+            self.store.update("u1", [], mode="merge")
+
+        self.assertIsNone(self.store.get("nobody"))
+        self.assertTrue(self.store.delete("u1"))
+        self.assertFalse(self.store.delete("u1"))
+
+    def test_ids_are_stable(self):
+        self.store.update("u1", ["全球化"])
+        ids = dict(self.store.word_ids())
+        # Another worker appends new words (e.g. after an HSK data reload)
+        other = KnownWordStore(self.path)
+        try:
+            other.assign_ids(["瞎掰"] + VOCABULARY)
+            self.assertEqual(other.word_ids()["瞎掰"], len(VOCABULARY))
+            self.store.update("u2", ["瞎掰"])
+        finally:
+            other.close()
+        for word, word_id in ids.items():
+            self.assertEqual(self.store.word_ids()[word], word_id)
+        # A bitset stored before the vocabulary grew still reads the same
+        self.assertEqual(self.store.words(self.store.get("u1")), ["全球化"])
+        self.assertEqual(self.store.words(self.store.get("u2")), ["瞎掰"])
+
+    def test_coverage(self):
+        self.store.update("beginner", ["我", "是", "学生"])
+        self.store.update("economist", ["经济", "全球化", "我"])
+        bitsets, missing = self.store.get_many(["beginner", "economist", "ghost"])
+        self.assertEqual(missing, ["ghost"])
+
+        profiles = [
+            # 我 x2, 是, 学生, 王明 (no id: never known) -> 5 words
+            self.store.profile({"我": 2, "是": 1, "学生": 1, "王明": 1}),
+            self.store.profile({"经济": 1, "全球化": 1}),
+            self.store.profile({}),
+            self.store.profile({"王明": 3}),
+        ]
+        coverage, known = known_coverage(bitsets, profiles)
+        self.assertEqual(coverage.shape, (4, 3))
+        self.assertEqual(known[0].tolist(), [4, 2, 0])
+        self.assertEqual(coverage[0].tolist(), [0.8, 0.4, 0.0])
+        self.assertEqual(coverage[1].tolist(), [0.0, 1.0, 0.0])
+        self.assertEqual(coverage[2].tolist(), [0.0, 0.0, 0.0])
+        self.assertEqual(coverage[3].tolist(), [0.0, 0.0, 0.0])
+
+    def test_batched_matches_one_by_one(self):
+        rng = random.Random(7)
+        words = [f"w{i}" for i in range(3000)]
+        self.store.assign_ids(words)
+        users = [f"user{i}" for i in range(50)]
+        for user in users:
+            self.store.update(user, rng.sample(words, rng.randint(0, 2000)))
+        texts = [{word: rng.randint(1, 5) for word in rng.sample(words, 200)} for _ in range(30)]
+        bitsets, _ = self.store.get_many(users)
+        coverage, known = known_coverage(bitsets, [self.store.profile(text) for text in texts])
+
+        for t, text in enumerate(texts):
+            for u, user in enumerate(users):
+                user_words = set(self.store.words(self.store.get(user)))
+                expected = sum(count for word, count in text.items() if word in user_words)
+                self.assertEqual(known[t, u], expected)
+        self.assertTrue(np.all((coverage >= 0) & (coverage <= 1)))
+
+        # A small element budget: users are scored a few at a time, with the same result
+        shapes = []
+        def record(block, byte, *args):
+            shapes.append((len(block), len(byte)))
+            return score_block(block, byte, *args)
+        with patch("app.core.known_words.COVERAGE_BLOCK_ELEMENTS", 20_000), \
+                patch("app.core.known_words._known_block", side_effect=record):
+            _, blocked = known_coverage(bitsets, [self.store.profile(text) for text in texts])
+        np.testing.assert_array_equal(blocked, known)
+        # 30 texts x 200 words: 3 users per block
+        self.assertEqual(len(shapes), 17)
+        self.assertLessEqual(max(users * occurrences for users, occurrences in shapes), 20_000)
+
+if __name__ == '__main__':
+    unittest.main()
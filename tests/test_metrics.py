@@ -0,0 +1,75 @@
+import sys
+import unittest
+# Add project root to path
+sys.path.append(".")
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core import metrics
+from app.core.metrics import Counter, Histogram, MetricsMiddleware
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("test_seconds", "Test.", ("stage",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value, "segment")
+        lines = histogram.render()
+        self.assertIn('test_seconds_bucket{stage="segment",le="0.1"} 2', lines)
+        self.assertIn('test_seconds_bucket{stage="segment",le="1.0"} 3', lines)
+        self.assertIn('test_seconds_bucket{stage="segment",le="+Inf"} 4', lines)
+        self.assertIn('test_seconds_count{stage="segment"} 4', lines)
+        self.assertEqual(histogram.count("segment"), 4)
+
+    def test_counter(self):
+        counter = Counter("test_total", "Test.")
+        counter.inc(3)
+        counter.inc()
+        self.assertEqual(counter.value(), 4)
+        self.assertIn("test_total 4", counter.render())
+
+    def test_registered_stats_are_rendered(self):
+        metrics.register_stats("test_cache", lambda: {"hits": 2, "misses": 1})
+        try:
+            text = metrics.render()
+        finally:
+            metrics._collectors.pop("test_cache")
+        self.assertIn('hanz_test_cache_events_total{event="hits"} 2', text)
+        self.assertIn("# TYPE hanz_stage_duration_seconds histogram", text)
+
+    def test_stage_outside_request(self):
+        before = metrics.STAGE_SECONDS.count("test_stage")
+        with metrics.stage("test_stage"):
+            pass
+        self.assertEqual(metrics.STAGE_SECONDS.count("test_stage"), before + 1)
+
+    def test_middleware_adds_server_timing(self):
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/items/{item_id}")
+        def item(item_id: int):
+            with metrics.stage("segment"):
+                pass
+            metrics.observe_stage("fetch", 0.012)
+            return {"id": item_id}
+
+        @app.get("/plain")
+        def plain():
+            return {}
+
+        client = TestClient(app)
+        response = client.get("/items/7")
+        self.assertEqual(response.status_code, 200)
+        timing = response.headers["server-timing"]
+        self.assertIn("segment;dur=", timing)
+        self.assertIn("fetch;dur=12.00", timing)
+
+        # No stages recorded, no header
+        self.assertNotIn("server-timing", client.get("/plain").headers)
+
+        # Requests are labelled by route template, not by raw path
+        self.assertEqual(metrics.REQUEST_SECONDS.count("GET", "/items/{item_id}", "200"), 1)
+        client.get("/missing")
+        self.assertEqual(metrics.REQUEST_SECONDS.count("GET", "unmatched", "404"), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+# Add project root to path
+sys.path.append(".")
+from app.core import config, reference_loader
+from app.core.analysis_cache import AnalysisCache
+from app.core.analyzer import TextAnalyzer
+from app.core.storage import file_lock
+from app.core.streaming import StreamingAnalysis
+
+NEW_WORD = "瞎掰"
+
+class TestHotReload(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.tmp.name, "hsk_levels")
+        shutil.copytree(reference_loader.HSK_LEVELS_DIR, self.data_dir)
+        patches = [
+            mock.patch.object(reference_loader, "HSK_LEVELS_DIR", type(reference_loader.HSK_LEVELS_DIR)(self.data_dir)),
+            mock.patch.object(config, "VOCAB_ARTIFACT", os.path.join(self.tmp.name, "hsk_vocab.bin")),
+            mock.patch.object(config, "TOKENIZER_SNAPSHOT", os.path.join(self.tmp.name, "jieba_hsk.marshal")),
+            mock.patch.object(config, "REFERENCE_BUILD_LOCK", os.path.join(self.tmp.name, "build.lock")),
+            mock.patch.object(reference_loader, "_store_cache", None),
+            mock.patch.object(reference_loader, "_hsk_cache", None),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.cache = AnalysisCache(os.path.join(self.tmp.name, "analysis.sqlite3"))
+        self.analyzer = TextAnalyzer(cache=self.cache)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def add_word(self, word: str, level: int):
+        # The CSVs may not end with a newline
+        with open(os.path.join(self.data_dir, f"hsk{level}.csv"), "a", encoding="utf-8") as f:
+            f.write(f"\n{word},xiā bāi,to talk nonsense\n")
+
+    def test_reload_waits_for_other_workers_build(self):
+        self.analyzer.warmup()
+        self.add_word(NEW_WORD, 1)
+        done = threading.Event()
+        # Another worker is rebuilding the artifact and snapshot
+        with file_lock(config.REFERENCE_BUILD_LOCK):
+            thread = threading.Thread(target=lambda: (self.analyzer.reload(), done.set()))
+            thread.start()
+            self.assertFalse(done.wait(0.3))
+        thread.join(60)
+        self.assertTrue(done.is_set())
+        self.assertEqual(self.analyzer.vocabulary.levels.get(NEW_WORD), 1)
+
+    def test_reload_swaps_vocabulary(self):
+        text = f"我是学生，{NEW_WORD}。"
+        before = self.analyzer.analyze(text)
+        old_state = self.analyzer.state
+        self.assertEqual(before["vocabulary_version"], old_state.version)
+        self.assertNotIn(NEW_WORD, reference_loader.get_hsk_dataframe().index)
+
+        # Nothing changed yet
+        self.assertFalse(self.analyzer.reload())
+
+        self.add_word(NEW_WORD, 1)
+        self.assertTrue(self.analyzer.reload())
+        self.assertNotEqual(self.analyzer.version, old_state.version)
+
+        after = self.analyzer.analyze(text)
+        self.assertEqual(after["vocabulary_version"], self.analyzer.version)
+        self.assertEqual(after["unknown_coverage"], 0.0)
+        self.assertGreater(before["unknown_coverage"], 0.0)
+        self.assertIn(NEW_WORD, self.analyzer.tokenizer.lcut(text))
+        self.assertEqual(reference_loader.get_hsk_dataframe().loc[NEW_WORD, "level"], 1)
+        self.assertEqual(reference_loader.get_word_level(NEW_WORD), 1)
+
+        # Work that started on the old state keeps it
+        self.assertEqual(old_state.vocabulary.classify(NEW_WORD), 0)
+
+    def test_inflight_work_finishes_on_old_version(self):
+        text = "我是学生。" * 10
+        stream = StreamingAnalysis(self.analyzer, segment_chars=16)
+        stream.feed(text[:25])
+        old_version = self.analyzer.version
+
+        self.add_word(NEW_WORD, 2)
+        self.assertTrue(self.analyzer.reload())
+        stream.feed(text[25:])
+        stream.close()
+        self.assertEqual(stream.result()["vocabulary_version"], old_version)
+
+        # A result computed on the old data is not cached under the new version
+        stale = dict(stream.result())
+        self.analyzer.remember(text, stale)
+        self.assertIsNone(self.analyzer.cached(text))
+        self.assertEqual(self.analyzer.analyze(text)["vocabulary_version"], self.analyzer.version)
+
+if __name__ == '__main__':
+    unittest.main()
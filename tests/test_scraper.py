@@ -1,5 +1,8 @@
+import asyncio
 import sys
+import time
 import unittest
+import httpx
 from unittest.mock import patch, MagicMock
 # Add project root to path
 sys.path.append(".")
@@ -9,14 +12,12 @@ class TestWebScraper(unittest.TestCase):
     def setUp(self):
         self.scraper = WebScraper()
 
-    @patch('app.core.scraper.trafilatura.fetch_url')
-    @patch('app.core.scraper.trafilatura.extract')
+    @patch('app.core.scraper.WebScraper._download_sync')
     @patch('app.core.scraper.trafilatura.bare_extraction')
-    def test_fetch_and_extract_success(self, mock_bare, mock_extract, mock_fetch):
+    def test_fetch_and_extract_success(self, mock_bare, mock_fetch):
         # Setup mocks
         mock_fetch.return_value = "<html>Mock HTML</html>"
-        mock_extract.return_value = "Mock extracted content."
-        mock_bare.return_value = {'title': 'Mock Title'}
+        mock_bare.return_value = {'title': 'Mock Title', 'text': 'Mock extracted content.', 'author': 'Mock Author'}
         
         url = "http://example.com"
         result = self.scraper.fetch_and_extract(url)
@@ -24,9 +25,37 @@ class TestWebScraper(unittest.TestCase):
         self.assertEqual(result["content"], "Mock extracted content.")
         self.assertEqual(result["title"], "Mock Title")
         self.assertEqual(result["url"], url)
+        self.assertEqual(result["metadata"]["author"], "Mock Author")
         self.assertIsNone(result["error"])
+        # Text and metadata come from a single extraction pass
+        self.assertEqual(mock_bare.call_count, 1)
+        self.assertEqual(set(result["timings"]), {"fetch_ms", "parse_ms", "extract_ms"})
 
-    @patch('app.core.scraper.trafilatura.fetch_url')
+    @patch('app.core.scraper.WebScraper._download_sync')
+    def test_title_tag_preferred(self, mock_fetch):
+        mock_fetch.return_value = "<html><head><title>Test Article</title></head><body><h1>标题</h1><p>你好, 我是学生. 这是一个测试.</p></body></html>"
+
+        result = self.scraper.fetch_and_extract("http://example.com")
+
+        self.assertEqual(result["title"], "Test Article")
+        self.assertIn("我是学生", result["content"])
+
+    @patch('app.core.scraper.WebScraper._download_sync')
+    @patch('app.core.scraper.trafilatura.bare_extraction')
+    def test_extraction_profiles(self, mock_bare, mock_fetch):
+        mock_fetch.return_value = "<html>Mock HTML</html>"
+        mock_bare.return_value = {'text': 'Mock extracted content.'}
+
+        WebScraper(profile="fast").fetch_and_extract("http://example.com")
+        self.assertTrue(mock_bare.call_args.kwargs["no_fallback"])
+
+        WebScraper(profile="precision").fetch_and_extract("http://example.com")
+        self.assertTrue(mock_bare.call_args.kwargs["favor_precision"])
+
+        with self.assertRaises(ValueError):
+            WebScraper(profile="nonsense")
+
+    @patch('app.core.scraper.WebScraper._download_sync')
     def test_fetch_failure(self, mock_fetch):
         # Simulate download failure
         mock_fetch.return_value = None
@@ -35,19 +64,167 @@ class TestWebScraper(unittest.TestCase):
         result = self.scraper.fetch_and_extract(url)
         
         self.assertEqual(result["error"], "Failed to download content.")
+        self.assertEqual(result["error_code"], "download_failed")
         self.assertEqual(result["content"], "")
 
-    @patch('app.core.scraper.trafilatura.fetch_url')
-    @patch('app.core.scraper.trafilatura.extract')
-    def test_extract_failure(self, mock_extract, mock_fetch):
+    def test_non_200_is_download_failure(self):
+        # Same error shape as fetch_and_extract_async (see TestWebScraperAsync)
+        client = httpx.Client
+        transport = httpx.MockTransport(lambda request: httpx.Response(404))
+        with patch('app.core.scraper.httpx.Client', lambda **kwargs: client(transport=transport, **kwargs)):
+            result = self.scraper.fetch_and_extract("http://bad-url.com")
+
+        self.assertEqual(result["error"], "Failed to download content.")
+        self.assertEqual(result["error_code"], "download_failed")
+
+    @patch('app.core.scraper.WebScraper._download_sync')
+    @patch('app.core.scraper.trafilatura.bare_extraction')
+    def test_extract_failure(self, mock_bare, mock_fetch):
         # Simulate fetch success but extract failure (no content)
         mock_fetch.return_value = "<html>Empty/Ads</html>"
-        mock_extract.return_value = None # No content found
+        mock_bare.return_value = None # No content found
         
         url = "http://empty.com"
         result = self.scraper.fetch_and_extract(url)
         
         self.assertEqual(result["error"], "No main content found.")
 
+class TestWebScraperAsync(unittest.IsolatedAsyncioTestCase):
+    PAGE = "<html><head><title>Test Article</title></head><body><p>你好, 我是学生. 这是一个测试.</p></body></html>"
+
+    def make_scraper(self, handler, **kwargs):
+        return WebScraper(transport=httpx.MockTransport(handler), **kwargs)
+
+    async def asyncTearDown(self):
+        if hasattr(self, "scraper"):
+            await self.scraper.aclose()
+
+    @patch('app.core.scraper.trafilatura.bare_extraction')
+    async def test_fetch_and_extract_async_success(self, mock_bare):
+        mock_bare.return_value = {'title': 'Mock Title', 'text': 'Mock extracted content.'}
+        self.scraper = self.make_scraper(lambda request: httpx.Response(200, content=self.PAGE.encode("utf-8")))
+
+        result = await self.scraper.fetch_and_extract_async("http://example.com")
+
+        self.assertIsNone(result["error"])
+        self.assertEqual(result["content"], "Mock extracted content.")
+        self.assertEqual(result["title"], "Test Article")
+
+    async def test_non_200_is_download_failure(self):
+        self.scraper = self.make_scraper(lambda request: httpx.Response(404))
+
+        result = await self.scraper.fetch_and_extract_async("http://bad-url.com")
+
+        self.assertEqual(result["error"], "Failed to download content.")
+        self.assertEqual(result["error_code"], "download_failed")
+
+    async def test_conditional_revalidation(self):
+        seen = {}
+        def handler(request):
+            seen.update(request.headers)
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, content=self.PAGE.encode("utf-8"), headers={"ETag": '"v1"'})
+        self.scraper = self.make_scraper(handler)
+
+        first = await self.scraper.fetch_and_extract_async("http://example.com")
+        self.assertEqual(first["etag"], '"v1"')
+        self.assertFalse(first["not_modified"])
+
+        with patch('app.core.scraper.trafilatura.bare_extraction') as mock_bare:
+            second = await self.scraper.fetch_and_extract_async("http://example.com", etag=first["etag"])
+        self.assertTrue(second["not_modified"])
+        self.assertIsNone(second["error"])
+        # 304 skips extraction entirely
+        mock_bare.assert_not_called()
+
+    async def test_total_deadline(self):
+        async def slow(request):
+            await asyncio.sleep(5)
+            return httpx.Response(200, content=b"late")
+        self.scraper = self.make_scraper(slow, timeout=0.1)
+
+        result = await self.scraper.fetch_and_extract_async("http://slow.com")
+
+        self.assertIn("Timed out", result["error"])
+
+    async def test_oversized_body_is_cut_off(self):
+        async def chunks():
+            for _ in range(100):
+                yield b"x" * 1000
+        self.scraper = self.make_scraper(lambda request: httpx.Response(200, content=chunks()), max_bytes=10_000)
+
+        result = await self.scraper.fetch_and_extract_async("http://big.com")
+
+        self.assertEqual(result["error_code"], "too_large")
+
+    async def test_declared_length_refused_before_reading(self):
+        read = []
+        async def chunks():
+            read.append(True)
+            yield b"x"
+        def handler(request):
+            return httpx.Response(200, content=chunks(), headers={"Content-Length": "50000000"})
+        self.scraper = self.make_scraper(handler, max_bytes=10_000)
+
+        result = await self.scraper.fetch_and_extract_async("http://big.com")
+
+        self.assertEqual(result["error_code"], "too_large")
+        self.assertEqual(read, [])
+
+    async def test_non_html_refused(self):
+        self.scraper = self.make_scraper(lambda request: httpx.Response(
+            200, content=b"%PDF-1.4", headers={"Content-Type": "application/pdf"}))
+
+        result = await self.scraper.fetch_and_extract_async("http://example.com/paper.pdf")
+
+        self.assertEqual(result["error_code"], "unsupported_content_type")
+        # Feeds and sitemaps take any type
+        self.assertEqual(await self.scraper.fetch_bytes("http://example.com/paper.pdf"), b"%PDF-1.4")
+
+    async def test_declared_charset(self):
+        page = "<html><body><p>你好世界</p></body></html>"
+        self.scraper = self.make_scraper(lambda request: httpx.Response(
+            200, content=page.encode("gbk"), headers={"Content-Type": "text/html; charset=GBK"}))
+        self.assertEqual(await self.scraper.fetch("http://example.com"), page)
+
+    async def test_slow_body_hits_deadline(self):
+        async def drip():
+            for _ in range(50):
+                await asyncio.sleep(0.05)
+                yield b"x"
+        self.scraper = self.make_scraper(lambda request: httpx.Response(200, content=drip()), timeout=0.2)
+
+        result = await self.scraper.fetch_and_extract_async("http://slow.com")
+
+        self.assertEqual(result["error_code"], "timeout")
+
+    async def test_concurrent_fetches_overlap(self):
+        async def handler(request):
+            await asyncio.sleep(0.2)
+            return httpx.Response(200, content=b"<html></html>")
+        self.scraper = self.make_scraper(handler, max_connections_per_host=20)
+
+        start = time.perf_counter()
+        pages = await asyncio.gather(*(self.scraper.fetch(f"http://example.com/{i}") for i in range(20)))
+
+        self.assertEqual(len(pages), 20)
+        # Roughly the slowest fetch, not the sum (20 * 0.2s)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    async def test_per_host_limit(self):
+        in_flight = {"now": 0, "max": 0}
+        async def handler(request):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.05)
+            in_flight["now"] -= 1
+            return httpx.Response(200, content=b"<html></html>")
+        self.scraper = self.make_scraper(handler, max_connections_per_host=2)
+
+        await asyncio.gather(*(self.scraper.fetch(f"http://example.com/{i}") for i in range(6)))
+
+        self.assertEqual(in_flight["max"], 2)
+
 if __name__ == '__main__':
     unittest.main()
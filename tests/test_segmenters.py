@@ -0,0 +1,82 @@
+import os
+import sys
+import tempfile
+import unittest
+# Add project root to path
+sys.path.append(".")
+from app.core.analysis_cache import AnalysisCache
+from app.core.analyzer import TextAnalyzer
+from app.core.segmenters import SEGMENTERS, MaxMatchSegmenter, check_segmenter
+from app.core.streaming import StreamingAnalysis
+
+class TestMaxMatchSegmenter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.analyzer = TextAnalyzer()
+        cls.tokenizer = cls.analyzer.tokenizer
+
+    def test_longest_dictionary_words(self):
+        segmenter = MaxMatchSegmenter(self.tokenizer)
+        self.assertEqual(segmenter.lcut("我是学生"), ["我", "是", "学生"])
+        # "这是" is only a prefix in the dictionary, not a word
+        self.assertEqual(segmenter.lcut("这是书"), ["这", "是", "书"])
+
+    def test_directions(self):
+        text = "研究生命起源"
+        forward = MaxMatchSegmenter(self.tokenizer, "forward").lcut(text)
+        backward = MaxMatchSegmenter(self.tokenizer, "backward").lcut(text)
+        self.assertEqual(forward, ["研究生", "命", "起源"])
+        self.assertEqual(backward, ["研究", "生命", "起源"])
+        # Same number of tokens, fewer single characters wins
+        self.assertEqual(MaxMatchSegmenter(self.tokenizer).lcut(text), backward)
+        with self.assertRaises(ValueError):
+            MaxMatchSegmenter(self.tokenizer, "sideways")
+
+    def test_non_han_text_split_like_jieba(self):
+        segmenter = MaxMatchSegmenter(self.tokenizer)
+        for text in ("StrangeWord 123 !!", "我有3个iPhone12。", "  \n\t我是 学生  ", "你好，world！"):
+            self.assertEqual(segmenter.lcut(text), self.tokenizer.lcut(text, HMM=False), text)
+        self.assertEqual(list(segmenter.cut("我是学生")), segmenter.lcut("我是学生"))
+
+class TestSegmenterSelection(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = AnalysisCache(os.path.join(self.tmp.name, "analysis.sqlite3"))
+        self.analyzer = TextAnalyzer(cache=self.cache)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_every_backend_analyzes(self):
+        text = "今天天气很好，我们去公园散步吧。"
+        for name in SEGMENTERS:
+            result = self.analyzer.analyze(text, segmenter=name)
+            self.assertGreater(result["total_tokens"], 0, name)
+            self.assertEqual(result["vocabulary_version"], self.analyzer.version)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            self.analyzer.analyze("我是学生", segmenter="nope")
+        with self.assertRaises(ValueError):
+            check_segmenter("nope")
+        self.assertIsNone(check_segmenter(None))
+
+    def test_results_cached_per_backend(self):
+        text = "研究生命起源"
+        jieba_result = self.analyzer.analyze(text)
+        self.assertIsNone(self.analyzer.cached(text, "maxmatch_forward"))
+        forward = self.analyzer.analyze(text, segmenter="maxmatch_forward")
+        self.assertEqual(self.analyzer.cached(text, "maxmatch_forward"), forward)
+        self.assertEqual(self.analyzer.cached(text), jieba_result)
+        self.assertEqual(self.analyzer.cached(text, "jieba"), jieba_result)
+
+    def test_streaming_matches_analyze(self):
+        text = "我是学生。他每天早上七点起床，然后坐地铁去公司上班。" * 20
+        stream = StreamingAnalysis(self.analyzer, segment_chars=64, segmenter="maxmatch")
+        stream.feed(text)
+        stream.close()
+        self.assertEqual(stream.result(), self.analyzer.analyze(text, segmenter="maxmatch"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import sys
+import unittest
+# Add project root to path
+sys.path.append(".")
+from app.core.analyzer import TextAnalyzer
+from app.core.streaming import StreamingAnalysis
+
+class TestStreamingAnalysis(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.analyzer = TextAnalyzer()
+
+    def stream(self, text, chunk_bytes, **kwargs):
+        stream = StreamingAnalysis(self.analyzer, **kwargs)
+        data = text.encode("utf-8")
+        segmented = 0
+        # Odd chunk sizes split multi-byte characters across chunks
+        for i in range(0, len(data), chunk_bytes):
+            segmented += stream.feed_bytes(data[i:i + chunk_bytes])
+        segmented += stream.close()
+        self.assertEqual(segmented, len(text))
+        return stream
+
+    def test_matches_analyze(self):
+        text = "我是学生。王明：这是？今天天气很好，我们去公园散步吧！3.14 StrangeWord 123 !!\n" * 50
+        for chunk_bytes in (1, 7, 100, 4096):
+            stream = self.stream(text, chunk_bytes, segment_chars=64)
+            self.assertEqual(stream.result(), self.analyzer.analyze(text))
+
+    def test_cuts_without_sentence_ends(self):
+        # Only commas and spaces: cuts fall back to any non-han character
+        text = "我是学生，今天天气很好 我们去公园散步吧，" * 50
+        stream = self.stream(text, 13, segment_chars=32)
+        self.assertEqual(stream.result(), self.analyzer.analyze(text))
+
+    def test_progress_records(self):
+        stream = StreamingAnalysis(self.analyzer, segment_chars=10)
+        self.assertEqual(stream.feed("我是学生"), 0)  # still buffering
+        self.assertGreater(stream.feed("。我是学生。"), 0)
+
+        progress = stream.progress()
+        self.assertEqual(progress["type"], "progress")
+        self.assertEqual(progress["total_tokens"], 6)
+        self.assertEqual(progress["hsk_1_coverage"], 1.0)
+
+    def test_empty(self):
+        stream = self.stream("", 10)
+        self.assertEqual(stream.result(), self.analyzer.analyze(""))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import sys
+import tempfile
+import unittest
+# Add project root to path
+sys.path.append(".")
+from jieba import finalseg
+from app.core.reference_loader import get_hsk_words
+from app.core.tokenizer import build_tokenizer, get_tokenizer, load_snapshot, save_snapshot
+
+class TestTokenizerSnapshot(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.words = get_hsk_words()
+        cls.built = build_tokenizer(cls.words)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "jieba_hsk.marshal")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_snapshot_roundtrip(self):
+        save_snapshot(self.built, "fp1", self.path)
+        loaded = load_snapshot("fp1", self.path)
+
+        self.assertIsNotNone(loaded)
+        for text in ["王明：这是？", "我是学生", "今天天气很好，我们去公园散步吧。"]:
+            self.assertEqual(loaded.lcut(text), self.built.lcut(text))
+        # Forced split survives the snapshot
+        self.assertEqual(loaded.lcut("王明：这是？"), ["王明", "：", "这", "是", "？"])
+
+    def test_forced_splits_stay_local(self):
+        loaded_from = os.path.join(self.tmp.name, "other.marshal")
+        save_snapshot(self.built, "fp1", loaded_from)
+        load_snapshot("fp1", loaded_from)
+
+        # Neither building nor loading touches jieba's process-wide HMM state
+        self.assertEqual(finalseg.Force_Split_Words, set())
+        self.assertEqual(list(finalseg.cut("这是")), ["这是"])
+        self.assertEqual(self.built.force_split, {"这是"})
+        self.assertEqual(list(self.built._hmm_cut("这是")), ["这", "是"])
+
+    def test_stale_or_missing_snapshot(self):
+        self.assertIsNone(load_snapshot("fp1", self.path))
+        save_snapshot(self.built, "fp1", self.path)
+        self.assertIsNone(load_snapshot("fp2", self.path))
+
+    def test_get_tokenizer_saves_snapshot(self):
+        tokenizer = get_tokenizer(lambda: self.words, "vocab-v1", self.path)
+
+        self.assertTrue(os.path.exists(self.path))
+        self.assertEqual(tokenizer.lcut("我是学生"), self.built.lcut("我是学生"))
+
+if __name__ == '__main__':
+    unittest.main()
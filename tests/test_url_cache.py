@@ -0,0 +1,103 @@
+import os
+import sys
+import tempfile
+import unittest
+# Add project root to path
+sys.path.append(".")
+from app.core.url_cache import UrlCache, normalize_url
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestUrlCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "url_cache.sqlite3")
+        self.clock = FakeClock()
+        self.cache = UrlCache(path=self.path, ttl=60, clock=self.clock)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def scrape(self, content="你好, 我是学生.", etag='"v1"'):
+        return {"content": content, "title": "Test Article", "metadata": {}, "etag": etag, "last_modified": None}
+
+    def test_normalize_url(self):
+        self.assertEqual(normalize_url("HTTP://Example.COM#top"), "http://example.com/")
+        self.assertEqual(normalize_url("http://example.com/a?b=1"), "http://example.com/a?b=1")
+
+    def test_put_and_get(self):
+        self.assertIsNone(self.cache.get("http://example.com/a"))
+        self.cache.put("http://example.com/a", self.scrape(), {"total_tokens": 3})
+
+        entry = self.cache.get("http://example.com/a#section")
+        self.assertEqual(entry["analysis"], {"total_tokens": 3})
+        self.assertEqual(entry["etag"], '"v1"')
+        self.assertTrue(self.cache.is_fresh(entry))
+        self.assertEqual(self.cache.get_content("http://example.com/a")["title"], "Test Article")
+        self.assertEqual(self.cache.stats["misses"], 1)
+        self.assertEqual(self.cache.stats["hits"], 1)
+
+    def test_ttl_and_revalidation(self):
+        self.cache.put("http://example.com/a", self.scrape(), {"total_tokens": 3})
+        self.clock.now += 61
+        entry = self.cache.get("http://example.com/a")
+        self.assertFalse(self.cache.is_fresh(entry))
+
+        self.cache.touch("http://example.com/a")
+        self.assertTrue(self.cache.is_fresh(self.cache.get("http://example.com/a")))
+
+    def test_persists_across_instances(self):
+        self.cache.put("http://example.com/a", self.scrape(), {"total_tokens": 3})
+        other = UrlCache(path=self.path, ttl=60, clock=self.clock)
+        try:
+            self.assertEqual(other.get("http://example.com/a")["analysis"], {"total_tokens": 3})
+        finally:
+            other.close()
+
+    def test_lru_eviction_by_size(self):
+        cache = UrlCache(path=os.path.join(self.tmp.name, "small.sqlite3"), max_bytes=1000, clock=self.clock)
+        try:
+            for name in ("a", "b", "c"):
+                self.clock.now += 100
+                cache.put(f"http://example.com/{name}", self.scrape(content="字" * 100), {"total_tokens": 1})
+                if name == "b":
+                    # Touch "a" so "b" becomes the least recently used
+                    self.clock.now += 100
+                    cache._memory.clear()
+                    cache.get("http://example.com/a")
+
+            self.assertEqual(cache.stats["evictions"], 1)
+            cache._memory.clear()
+            self.assertIsNone(cache.get("http://example.com/b"))
+            self.assertIsNotNone(cache.get("http://example.com/a"))
+            self.assertIsNotNone(cache.get("http://example.com/c"))
+        finally:
+            cache.close()
+
+    def test_evicts_several_pages_at_once(self):
+        cache = UrlCache(path=os.path.join(self.tmp.name, "small.sqlite3"), max_bytes=2000, clock=self.clock)
+        try:
+            for name in ("a", "b", "c", "d"):
+                self.clock.now += 100
+                cache.put(f"http://example.com/{name}", self.scrape(content="字" * 100), {"total_tokens": 1})
+            self.assertEqual(cache.stats["evictions"], 0)
+            # Needs the space of the three least recently used pages
+            self.clock.now += 100
+            cache.put("http://example.com/big", self.scrape(content="字" * 400), {"total_tokens": 1})
+
+            self.assertEqual(cache.stats["evictions"], 3)
+            self.assertEqual([url for url in "abcd" if cache.get(f"http://example.com/{url}")], ["d"])
+            total = cache.db.execute("SELECT SUM(size) FROM pages").fetchone()[0]
+            self.assertLessEqual(total, 2000)
+            self.assertEqual(cache._bytes, total)
+        finally:
+            cache.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import pathlib
+import shutil
+import sys
+import tempfile
+import unittest
+# Add project root to path
+sys.path.append(".")
+from app.core.reference_loader import HSK_LEVELS_DIR, load_hsk_data
+from app.core.vocab_store import VocabularyStore, build_artifact, open_store
+from app.core.vocabulary import VocabularyIndex
+
+class TestVocabularyStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "hsk_vocab.bin")
+        build_artifact(HSK_LEVELS_DIR, self.path)
+        self.store = VocabularyStore(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_matches_csv_loader(self):
+        df = load_hsk_data()
+        self.assertEqual(len(self.store), len(df))
+        self.assertEqual(dict(self.store.items()), {str(w): int(l) for w, l in zip(df.index, df['level'])})
+
+        i = self.store.find("学生")
+        self.assertEqual(self.store.gloss(i), (df.at["学生", 'pinyin'], df.at["学生", 'meaning']))
+
+    def test_lookup(self):
+        self.assertEqual(self.store.level("我"), 1)
+        self.assertEqual(self.store.level("unknown_word"), 0)
+        self.assertEqual(self.store.find(""), -1)
+        self.assertEqual(self.store.levels().tolist(), [level for _, level in self.store.items()])
+
+    def test_version_matches_index(self):
+        index = VocabularyIndex(dict(self.store.items()))
+        self.assertEqual(self.store.version, index.version)
+
+    def test_stale_artifact_is_rebuilt(self):
+        csv_dir = pathlib.Path(self.tmp.name) / "hsk_levels"
+        shutil.copytree(HSK_LEVELS_DIR, csv_dir)
+        path = os.path.join(self.tmp.name, "copy.bin")
+        self.assertEqual(open_store(csv_dir, path).level("苹果"), 1)
+
+        with open(csv_dir / "hsk1.csv", "a", encoding="utf-8") as f:
+            f.write("\n新词,xīn cí,new word\n")
+        self.assertEqual(open_store(csv_dir, path).level("新词"), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import sys
+import unittest
+# Add project root to path
+sys.path.append(".")
+from app.core.reference_loader import get_hsk_dataframe
+from app.core.vocabulary import VocabularyIndex, PUNCTUATION, UNKNOWN_LEVEL
+
+class TestVocabularyIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = VocabularyIndex.from_dataframe(get_hsk_dataframe())
+
+    def test_classify(self):
+        # HSK1 word
+        self.assertEqual(self.index.classify("我"), 1)
+        # Alphanumeric tokens are words, but not in HSK
+        self.assertEqual(self.index.classify("StrangeWord"), UNKNOWN_LEVEL)
+        self.assertEqual(self.index.classify("123"), UNKNOWN_LEVEL)
+        # Punctuation and whitespace are dropped
+        self.assertEqual(self.index.classify("，"), PUNCTUATION)
+        self.assertEqual(self.index.classify("!!"), PUNCTUATION)
+        self.assertEqual(self.index.classify(" "), PUNCTUATION)
+
+    def test_count_levels(self):
+        # 我 (1), 是 (1), 学生 (1), "。" dropped, 王明 unknown, 我 repeated
+        counts, unique = self.index.count_levels(["我", "是", "学生", "。", "王明", "我"])
+        self.assertEqual(counts[1], 4)
+        self.assertEqual(counts[UNKNOWN_LEVEL], 1)
+        self.assertEqual(sum(counts), 5)
+        self.assertEqual(unique, {"我", "是", "学生", "王明"})
+
+    def test_count_characters(self):
+        index = VocabularyIndex({"我": 1, "学生": 1, "学习": 2, "生日": 3, "日本": 2})
+        # 学 and 生 first appear at level 1; 日 at level 2 (日本), not 3
+        self.assertEqual(index.char_levels[ord("日")], 2)
+        # 我 学 生 (1), 日 (2), 王 明 not in any word; latin, digits and punctuation left out
+        counts = index.count_characters("我学生日，王明 Hi 123！")
+        self.assertEqual(counts, [2, 3, 1, 0, 0, 0, 0])
+        # Supplementary-plane ideographs are counted as unknown characters
+        self.assertEqual(index.count_characters("𠀀"), [1, 0, 0, 0, 0, 0, 0])
+        self.assertEqual(index.count_characters(""), [0] * 7)
+        # A lone surrogate (valid in JSON) is not a character of any level
+        self.assertEqual(index.count_characters("\ud800我"), index.count_characters("我"))
+
+    def test_memo_is_bounded(self):
+        index = VocabularyIndex({"我": 1})
+        index.MAX_EXTRA_TOKENS = 10
+        for i in range(25):
+            index.classify(f"word{i}")
+        self.assertLessEqual(len(index._classes), 1 + 10)
+        self.assertEqual(index.classify("我"), 1)
+
+if __name__ == '__main__':
+    unittest.main()